@@ -0,0 +1,13 @@
+# 五支搖桿程式的效能基準測試（在 sim 模擬器上執行）
+#
+# 每支程式都有一段固定的輸入訊號，量測：
+#   - 每幀各階段（input、update、render、flush、output）的耗時
+#   - 搖桿改變到 LED、PWM 或 OLED 畫面真的改變的延遲
+#   - 每幀配置的記憶體
+# 結果輸出成 JSON，可以和之前的結果比較：
+#   python -m bench --output before.json
+#   python -m bench --compare before.json
+#
+# 另外 python -m bench.levels 在主機上直接量測馬里奧碰撞（mario.py）和捲動載入（levelfile.py）
+# 的成本和關卡物件數、關卡長度的關係
+# python -m bench.entities 比較會動的物件用 array 欄位（entities.py）和每個一個物件的成本和記憶體
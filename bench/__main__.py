@@ -0,0 +1,143 @@
+# 命令列：
+#   python -m bench                         量測全部五支程式，摘要印到 stderr
+#   python -m bench extra crea --output out.json
+#   python -m bench --compare before.json   和之前的結果比較，有退步時回傳 1
+import argparse
+import json
+import platform
+import subprocess
+import sys
+
+from bench import runner
+from bench.scenarios import SCENARIOS
+
+# 比較時看的數值（路徑結尾）
+COMPARED = ("frame_host_us.mean", "frame_host_us.p95", "host_us.mean", "host_us.p95",
+            "virtual_us.mean", "frame_period_ms.mean", "alloc_bytes.mean", "alloc_bytes.max",
+            "latency_ms.mean", "latency_ms.max", "oled.bus_bytes_per_show",
+            "boot_ms.frame", "boot_ms.output")
+HOST_NOISE_US = 2  # 主機時間相差不到幾微秒就當成雜訊
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=runner.ROOT,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def flatten(value, prefix=""):
+    if isinstance(value, dict):
+        items = {}
+        for key, child in value.items():
+            items.update(flatten(child, prefix + key + "."))
+        return items
+    if isinstance(value, (int, float)):
+        return {prefix[:-1]: value}
+    return {}
+
+def compare(old, new, tolerance, host_tolerance):
+    """印出變化超過容許範圍的數值，回傳退步的個數
+    主機時間先依兩次的校準時間換算，並使用較寬的 host_tolerance；
+    其他數值（虛擬時間、延遲、配置、傳輸量）每次執行都一樣，用 tolerance，
+    但把計算時間算進虛擬時間的程式（deterministic 為 False）只有延遲是固定的"""
+    old_values = flatten(old.get("apps", {}))
+    new_values = flatten(new.get("apps", {}))
+    scale = 1.0
+    if old.get("calibration_us") and new.get("calibration_us"):
+        scale = new["calibration_us"] / old["calibration_us"]
+    regressions = 0
+    for key, value in new_values.items():
+        if not key.endswith(COMPARED) or key not in old_values:
+            continue
+        before = old_values[key]
+        limit = tolerance
+        app = new["apps"].get(key.split(".", 1)[0], {})
+        if not app.get("deterministic", True) and "latency_ms" not in key:
+            limit = host_tolerance
+        if "host_us" in key:
+            before *= scale
+            limit = host_tolerance
+            if abs(value - before) < HOST_NOISE_US:
+                continue
+        if before == value:
+            continue
+        change = (value - before) * 100 / before if before else float("inf")
+        if abs(change) < limit:
+            continue
+        worse = value > before
+        regressions += worse
+        print("%-5s %-45s %10.1f -> %10.1f  %+7.1f%%" % (
+            "退步" if worse else "進步", key, before, value, change), file=sys.stderr)
+    return regressions
+
+def print_summary(apps):
+    print("%-6s %6s %16s %9s %9s %9s %9s %9s %9s %14s %14s" % (
+        "程式", "幀數", "每幀us p50/p95", "input", "update", "render", "flush", "output",
+        "配置B", "延遲ms 平均/最大", "開機ms 畫面/輸出"), file=sys.stderr)
+    for name, result in apps.items():
+        stages = result["stages"]
+        cols = ["%9.1f" % stages[s]["host_us"]["mean"] if s in stages else "%9s" % "-"
+                for s in ("input", "update", "render", "flush", "output")]
+        latency = result.get("latency_ms")
+        boot = result.get("boot_ms", {})
+        print("%-6s %6d %16s %s %9s %14s %14s" % (
+            name, result["frames"],
+            "%.0f/%.0f" % (result["frame_host_us"]["p50"], result["frame_host_us"]["p95"]),
+            " ".join(cols),
+            "%.0f" % result["alloc_bytes"]["mean"] if "alloc_bytes" in result else "-",
+            "%.1f/%.1f" % (latency["mean"], latency["max"]) if latency else "-",
+            "%s/%s" % (boot.get("frame", "-"), boot.get("output", "-"))), file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="搖桿程式的效能基準測試")
+    parser.add_argument("apps", nargs="*", metavar="APP",
+                        help="要量測的程式：" + "、".join(SCENARIOS) + "（預設全部）")
+    parser.add_argument("--duration", type=int, default=10000, help="每次量測的虛擬時間（毫秒）")
+    parser.add_argument("--repeat", type=int, default=3, help="耗時量測重複幾次，取最快的一次")
+    parser.add_argument("--probes", type=int, default=5, help="延遲量測的次數，0 表示不量")
+    parser.add_argument("--no-allocs", action="store_true", help="不量測記憶體配置")
+    parser.add_argument("--output", metavar="FILE", help="把結果存成 JSON（- 表示 stdout）")
+    parser.add_argument("--compare", metavar="FILE", help="和之前存的 JSON 比較")
+    parser.add_argument("--tolerance", type=float, default=10,
+                        help="延遲、配置等固定數值變化超過幾 %% 才列出")
+    parser.add_argument("--host-tolerance", type=float, default=50,
+                        help="主機耗時變化超過幾 %% 才列出（主機時間雜訊較大）")
+    args = parser.parse_args(argv)
+    for name in args.apps:
+        if name not in SCENARIOS:
+            parser.error("沒有這支程式：" + name)
+
+    calibration = runner.calibrate()
+    apps = {}
+    for name in args.apps or SCENARIOS:
+        print("量測 %s ..." % name, file=sys.stderr)
+        apps[name] = runner.run(name, SCENARIOS[name], args.duration, args.probes,
+                                not args.no_allocs, args.repeat)
+    result = {
+        "schema": 1,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "calibration_us": calibration,
+        "settings": {"duration_ms": args.duration, "probes": args.probes, "repeat": args.repeat},
+        "apps": apps,
+    }
+    print_summary(apps)
+
+    if args.output == "-":
+        json.dump(result, sys.stdout, indent=1, ensure_ascii=False)
+        print()
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=1, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        print("--- 和 %s（%s）比較 ---" % (args.compare, old.get("revision")), file=sys.stderr)
+        if compare(old, result, args.tolerance, args.host_tolerance):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+# 會動的物件（敵人）數量和每幀成本、記憶體的關係（在主機上執行）
+#   python -m bench.entities
+#   python -m bench.entities --counts 10 100 400 --output entities.json
+# 同樣的敵人分別用 entities.Entities（array 欄位）和每個敵人一個物件（ObjectEnemies，原本的寫法）
+# 各跑一次，量測每幀更新（移動、落到平台、和馬里奧的碰撞）的時間和每個敵人佔的記憶體。
+# 主機上的記憶體是 CPython 的數字，板子上 Entities 每個敵人固定 entities.BYTES_PER_ENTITY bytes
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from time import perf_counter_ns
+
+from bench.runner import ROOT, calibrate
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import entities  # noqa: E402  （要先把專案根目錄加進 sys.path）
+import mario as game  # noqa: E402
+from bench.levels import build_level  # noqa: E402
+from bench.probe import summarize  # noqa: E402
+
+COUNTS = (10, 50, 100, 200, 400, 800)
+PLATFORMS = 100  # 關卡的平台數（關卡寬度跟著變）
+
+class Enemy(game.GameObject):
+    def __init__(self, kind, x, y, vx, lo, hi):
+        super().__init__(x, y, entities.ENEMY_SIZE, entities.ENEMY_SIZE)
+        self.kind = kind
+        self.fy = y << game.FP_SHIFT
+        self.vx = vx
+        self.vy = 0
+        self.lo = lo
+        self.hi = hi
+        self.alive = True
+
+class ObjectEnemies:
+    """對照組：每個敵人一個物件放在 list 裡，規則和 Entities 相同"""
+    def __init__(self, capacity):
+        self.items = []
+
+    def spawn(self, kind, x, y, vx, lo, hi):
+        self.items.append(Enemy(kind, x, y, vx, lo, hi))
+
+    def step(self, level):
+        left, right = level.active()
+        S = game.FP_SHIFT
+        for e in self.items:
+            if not e.alive or e.x < left or e.x + e.width > right:
+                continue
+            x = e.x + e.vx
+            if x < e.lo:
+                x = e.lo
+                e.vx = -e.vx
+            elif x + e.width > e.hi:
+                x = e.hi - e.width
+                e.vx = -e.vx
+            e.x = x
+            if e.kind != entities.WALKER:
+                continue
+            height = e.height << S
+            fy = e.fy
+            vy = e.vy + game.GRAVITY
+            new_y = fy + vy
+            ground = (game.GROUND_HEIGHT << S) - height
+            if new_y > ground:
+                new_y = ground
+                vy = 0
+            if vy > 0:
+                for platform in level.solid.query(x, fy >> S, e.width, ((new_y - fy) >> S) + e.height + 1):
+                    if x + e.width > platform.x and x < platform.x + platform.width:
+                        py = platform.y << S
+                        if fy + height <= py and new_y + height > py:
+                            new_y = py - height
+                            vy = 0
+            e.fy = new_y
+            e.vy = vy
+            e.y = new_y >> S
+
+    def hit(self, mario):
+        for i, e in enumerate(self.items):
+            if e.alive and mario.collides_with(e):
+                return i
+        return -1
+
+def spawn_all(store, count, width, seed=2):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        kind = entities.WALKER if rnd.random() < 0.7 else entities.FLYER
+        lo = rnd.randrange(0, width - 64)
+        hi = lo + rnd.randrange(16, 64)
+        x = rnd.randrange(lo, hi - entities.ENEMY_SIZE)
+        y = rnd.randrange(0, game.GROUND_HEIGHT - entities.ENEMY_SIZE)
+        store.spawn(kind, x, y, rnd.choice((-1, 1)), lo, hi)
+
+def memory(factory, count, width):
+    """建立並放入 count 個敵人用掉的記憶體（bytes）"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = factory(count)
+    spawn_all(store, count, width)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used
+
+def run(factory, count, frames):
+    """每幀更新全部敵人並檢查碰撞，回傳每幀時間（us）的 list"""
+    level = build_level(PLATFORMS, game.Grid)
+    store = factory(count)
+    spawn_all(store, count, level.width)
+    mario = game.Mario()
+    times = []
+    for _ in range(frames):
+        start = perf_counter_ns()
+        store.step(level)
+        store.hit(mario)
+        times.append((perf_counter_ns() - start) / 1000)
+    return times
+
+def measure(count, frames, repeat):
+    width = build_level(PLATFORMS, game.Grid).width
+    result = {"entities": count}
+    for name, factory in (("array", entities.Entities), ("object", ObjectEnemies)):
+        best = None
+        for _ in range(repeat):
+            stats = summarize(run(factory, count, frames))
+            if best is None or stats["mean"] < best["mean"]:
+                best = stats
+        result[name + "_us_per_frame"] = best
+        result[name + "_bytes_per_entity"] = round(memory(factory, count, width) / count, 1)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.entities",
+                                     description="會動的物件數量和每幀成本、記憶體的關係")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(COUNTS), help="敵人數")
+    parser.add_argument("--frames", type=int, default=500, help="每次模擬的幀數")
+    parser.add_argument("--repeat", type=int, default=3, help="重複幾次取最快的一次")
+    parser.add_argument("--output", help="把結果寫成 JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(count, args.frames, args.repeat) for count in args.counts]
+    print("%6s %14s %15s %14s %15s" % ("敵人數", "array us/幀", "object us/幀",
+                                       "array B/個", "object B/個"))
+    for r in results:
+        print("%6d %14.1f %15.1f %14.1f %15.1f" % (
+            r["entities"], r["array_us_per_frame"]["mean"], r["object_us_per_frame"]["mean"],
+            r["array_bytes_per_entity"], r["object_bytes_per_entity"]))
+    print("板子上 Entities 每個敵人 %d bytes" % entities.BYTES_PER_ENTITY)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"calibration_us": calibrate(), "frames": args.frames,
+                       "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# 馬里奧碰撞的主機基準測試：關卡物件越來越多、關卡越來越長時，每一步要花多少時間
+#   python -m bench.levels
+#   python -m bench.levels --counts 10 100 400 --widths 1 16 256 --output levels.json
+# 1. 同樣的關卡和動作分別用空間索引（Grid）和逐一檢查（ListIndex）各跑一次；
+#    關卡寬度和物件數成正比（密度固定），Grid 的成本應該幾乎不隨物件數增加
+# 2. 不同畫面數的關卡寫成關卡檔，用 levelfile 邊走邊載入段落，
+#    每幀（物理、鏡頭、載入段落、找出要畫的物件）的成本和常駐記憶體應該和關卡長度無關
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter_ns
+
+from bench.runner import ROOT, calibrate
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import levelfile  # noqa: E402  （要先把專案根目錄加進 sys.path）
+import mario as game  # noqa: E402
+from bench.probe import summarize  # noqa: E402
+from tools import levels as leveltool  # noqa: E402
+
+COUNTS = (5, 25, 100, 200, 400, 800)
+WIDTHS = (1, 4, 16, 64, 256)  # 關卡有幾個畫面寬
+PER_SCREEN = 5  # 每個畫面的平台數（金幣數相同）
+SPACING = 16  # 每個平台（和金幣）平均佔的關卡寬度
+
+class ListIndex:
+    """對照組：不分格子，每次查詢都回傳全部物件（原本逐一檢查的做法）"""
+    def __init__(self, width, height):
+        self.items = []
+
+    def insert(self, obj):
+        self.items.append(obj)
+
+    def remove(self, obj):
+        self.items.remove(obj)
+
+    def query(self, x, y, width, height):
+        return self.items
+
+def build_level(count, index, seed=1):
+    rnd = random.Random(seed)
+    width = max(game.SCREEN_WIDTH, count * SPACING)
+    platforms = []
+    coins = []
+    for _ in range(count):
+        x = rnd.randrange(0, width - 30)
+        y = rnd.randrange(12, game.GROUND_HEIGHT - 8)
+        platforms.append(game.Platform(x, y, rnd.randrange(10, 30)))
+        coins.append(game.Coin(rnd.randrange(0, width - game.COIN_SIZE),
+                               rnd.randrange(0, game.GROUND_HEIGHT - game.COIN_SIZE)))
+    return game.Level(platforms, coins, width, game.SCREEN_HEIGHT, index)
+
+def play(level, steps):
+    """馬里奧來回跑過整個關卡、每 40 步跳一次，回傳每一步的平均時間（us）"""
+    mario = game.Mario()
+    direction = 1
+    start = perf_counter_ns()
+    for step in range(steps):
+        if step % 40 == 0 and not mario.is_jumping:
+            # 不用 jump()：它的冷卻時間看的是真實時間，結果會不固定
+            mario.vy = game.JUMP_FORCE
+            mario.is_jumping = True
+        if mario.x + mario.width + game.MOVE_SPEED > level.width or mario.x - game.MOVE_SPEED < 0:
+            direction = -direction
+        mario.move(direction, level.width)
+        mario.update(level)
+        mario.score += 100 * level.collect(mario)
+    elapsed = perf_counter_ns() - start
+    return elapsed / steps / 1000, mario.score
+
+def measure(count, steps, repeat):
+    result = {"objects": count * 2}
+    for name, index in (("grid", game.Grid), ("list", ListIndex)):
+        best = None
+        for _ in range(repeat):
+            us, score = play(build_level(count, index), steps)
+            best = us if best is None else min(best, us)
+        result[name + "_us_per_step"] = round(best, 2)
+        result[name + "_score"] = score
+    return result
+
+def build_file(screens, path, seed=1):
+    """寫一個只有一關、screens 個畫面寬的關卡檔"""
+    rnd = random.Random(seed)
+    level = leveltool.LevelDef(1, screens * game.SCREEN_WIDTH)
+    for _ in range(screens * PER_SCREEN):
+        x = rnd.randrange(0, level.width - 30)
+        level.platforms.append((x, rnd.randrange(12, game.GROUND_HEIGHT - 8),
+                                rnd.randrange(10, 30), 0))
+        level.coins.append((rnd.randrange(0, level.width - game.COIN_SIZE),
+                            rnd.randrange(0, game.GROUND_HEIGHT - game.COIN_SIZE), 0))
+    with open(path, "wb") as f:
+        f.write(leveltool.pack([level]))
+
+def scroll(path):
+    """馬里奧從頭跑到尾，回傳 (每幀時間 us 的 list, 載入段落次數, 常駐記憶體 bytes)"""
+    tracemalloc.start()
+    reader = levelfile.LevelFile(path)
+    level = reader.load(1)
+    resident = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    mario = game.Mario()
+    camera = game.Camera()
+    times = []
+    step = 0
+    while mario.x + mario.width + game.MOVE_SPEED <= level.width:
+        start = perf_counter_ns()
+        if step % 40 == 0 and not mario.is_jumping:
+            mario.vy = game.JUMP_FORCE
+            mario.is_jumping = True
+        mario.move(1, level.width)
+        mario.update(level)
+        mario.score += 100 * level.collect(mario)
+        level.follow(camera.follow(mario, level.width))
+        platforms, coins = level.visible(camera.x, game.SCREEN_WIDTH)
+        times.append((perf_counter_ns() - start) / 1000)
+        step += 1
+    return times, level.loads, resident
+
+def measure_width(screens, repeat):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "levels.bin")
+        build_file(screens, path)
+        best = None
+        for _ in range(repeat):
+            times, loads, resident = scroll(path)
+            stats = summarize(times)
+            if best is None or stats["mean"] < best["us_per_frame"]["mean"]:
+                best = {"screens": screens, "objects": screens * PER_SCREEN * 2,
+                        "file_bytes": os.path.getsize(path), "us_per_frame": stats,
+                        "segment_loads": loads, "resident_bytes": resident}
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.levels",
+                                     description="關卡物件數、關卡長度和每一步成本的關係")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(COUNTS),
+                        help="每關的平台數（金幣數相同）")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(WIDTHS),
+                        help="捲動測試的關卡寬度（畫面數）")
+    parser.add_argument("--steps", type=int, default=3000, help="每次模擬的物理步數")
+    parser.add_argument("--repeat", type=int, default=3, help="重複幾次取最快的一次")
+    parser.add_argument("--output", help="把結果寫成 JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(count, args.steps, args.repeat) for count in args.counts]
+    print("%8s %12s %12s %8s" % ("物件數", "grid us/步", "list us/步", "倍數"))
+    for r in results:
+        if r["grid_score"] != r["list_score"]:
+            print("警告：%d 個物件時兩種索引的結果不同" % r["objects"], file=sys.stderr)
+        print("%8d %12.2f %12.2f %8.1f" % (r["objects"], r["grid_us_per_step"],
+                                          r["list_us_per_step"],
+                                          r["list_us_per_step"] / r["grid_us_per_step"]))
+
+    widths = [measure_width(screens, args.repeat) for screens in args.widths]
+    print()
+    print("%6s %8s %10s %12s %10s %10s" % ("畫面數", "物件數", "us/幀", "p95 us/幀", "載入段落", "常駐bytes"))
+    for r in widths:
+        print("%6d %8d %10.2f %12.2f %10d %10d" % (
+            r["screens"], r["objects"], r["us_per_frame"]["mean"], r["us_per_frame"]["p95"],
+            r["segment_loads"], r["resident_bytes"]))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"calibration_us": calibrate(), "steps": args.steps,
+                       "levels": results, "widths": widths}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
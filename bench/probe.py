@@ -0,0 +1,210 @@
+# 量測工具：把模擬器的 I/O 和腳本裡指定的函式包起來，依「階段」累計耗時
+#
+# 同一時間只會有一個階段在計時，巢狀呼叫時計到最內層
+# （例如 draw_game 裡的 oled.show() 算 flush，不算 render）。
+# 主機時間是電腦上實際花的時間，只適合拿來和之前的結果比較；
+# 虛擬時間是模擬器的時鐘，包含 sleep 和 I2C 傳輸的時間。
+import os
+import sys
+import time
+import tracemalloc
+import zlib
+from time import perf_counter_ns
+
+from sim.machine import board
+
+# background：模擬的 _thread 執行緒（在板子上和主程式同時執行，不算進每幀的忙碌時間）
+STAGES = ("input", "update", "render", "flush", "output", "ai", "idle", "background")
+
+class StageProbe:
+    def __init__(self, script, hooks, marker, allocs=False):
+        # hooks：{"函式名稱" 或 "類別.方法": 階段}，腳本執行到一半才包上去
+        # marker：每次呼叫這個函式就算開始新的一幀
+        self.script = os.path.abspath(script)
+        self.hooks = dict(hooks)
+        self.marker = marker
+        self.allocs = allocs
+        self.attached = False
+        self.missing = list(self.hooks)
+        self.stage = "update"
+        self.stack = []
+        self.host = {}      # 本幀各階段的主機時間（ns）
+        self.virtual = {}   # 本幀各階段的虛擬時間（us）
+        self.calls = {}
+        self.frames = []    # (host, virtual, 幀週期 us, 配置 bytes)
+        self.last_ns = perf_counter_ns()
+        self.last_us = 0
+        self.mark_us = None
+        self.alloc_base = 0
+        self.boot = None    # 腳本用 boottime 記下的開機時間（ms）
+
+    def _charge(self):
+        ns = perf_counter_ns()
+        us = board.clock.now_us
+        stage = self.stage
+        self.host[stage] = self.host.get(stage, 0) + ns - self.last_ns
+        self.virtual[stage] = self.virtual.get(stage, 0) + us - self.last_us
+        self.last_ns = ns
+        self.last_us = us
+
+    def enter(self, stage):
+        self._charge()
+        self.stack.append(self.stage)
+        self.stage = stage
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+
+    def leave(self):
+        self._charge()
+        self.stage = self.stack.pop()
+
+    def mark(self):
+        # 結束上一幀；配置量是這一幀期間 tracemalloc 的峰值增加量
+        self._charge()
+        if self.mark_us is not None:
+            alloc = 0
+            if self.allocs:
+                alloc = max(0, tracemalloc.get_traced_memory()[1] - self.alloc_base)
+            self.frames.append((self.host, self.virtual, self.last_us - self.mark_us, alloc))
+        # 先放好所有階段，量測本身在幀內就不會讓 dict 變大而配置記憶體
+        self.host = dict.fromkeys(STAGES, 0)
+        self.virtual = dict.fromkeys(STAGES, 0)
+        self.mark_us = self.last_us
+        if self.allocs:
+            tracemalloc.reset_peak()
+            self.alloc_base = tracemalloc.get_traced_memory()[0]
+
+    def wrap(self, func, stage, marker=False):
+        probe = self
+
+        def wrapper(*args, **kwargs):
+            if marker:
+                probe.mark()
+            if not probe.attached:
+                probe.attach(sys._getframe(1))
+            probe.enter(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                probe.leave()
+        wrapper.probe_original = func
+        return wrapper
+
+    def attach(self, frame):
+        # 從呼叫堆疊找到腳本的全域變數，把還沒包上的函式換掉
+        while frame is not None:
+            path = frame.f_globals.get("__file__")
+            if path and os.path.abspath(path) == self.script:
+                break
+            frame = frame.f_back
+        if frame is None:
+            return
+        g = frame.f_globals
+        missing = []
+        for name, stage in self.hooks.items():
+            owner_name, _, attr = name.rpartition(".")
+            owner = g.get(owner_name) if owner_name else g
+            if owner is None:
+                missing.append(name)
+                continue
+            func = getattr(owner, attr, None) if owner_name else owner.get(attr)
+            if func is None:
+                missing.append(name)
+                continue
+            if hasattr(func, "probe_original"):
+                continue
+            wrapped = self.wrap(func, stage, name == self.marker)
+            if owner_name:
+                setattr(owner, attr, wrapped)
+            else:
+                g[attr] = wrapped
+        # 腳本自己的顯示驅動（SSD1306 的子類別）覆寫的 show() 也算 flush
+        from sim.ssd1306 import SSD1306
+        for value in list(g.values()):
+            if (isinstance(value, type) and issubclass(value, SSD1306)
+                    and "show" in value.__dict__
+                    and not hasattr(value.__dict__["show"], "probe_original")):
+                value.show = self.wrap(value.__dict__["show"], "flush")
+        self.missing = missing
+        self.attached = not missing
+
+def _pin_value(probe, original):
+    def value(self, v=None):
+        if not probe.attached:
+            probe.attach(sys._getframe(1))
+        probe.enter("input" if v is None and self.mode != self.OUT else "output")
+        try:
+            return original(self, v)
+        finally:
+            probe.leave()
+    return value
+
+def instrument(probe):
+    """把模擬器的 I/O 包上量測，回傳還原用的清單"""
+    import sim._thread as threads
+    import sim.machine as machine
+    import sim.ssd1306 as ssd1306
+    import sim.uasyncio as uasyncio
+    targets = (
+        (machine.ADC, "read", "input"),
+        (machine.ADC, "read_u16", "input"),
+        (machine.PWM, "freq", "output"),
+        (machine.PWM, "duty", "output"),
+        (machine.PWM, "duty_u16", "output"),
+        (ssd1306.SSD1306, "show", "flush"),
+        (machine.Timer, "fire", "update"),
+        (threads.SimThread, "fire", "background"),
+        (uasyncio.Loop, "_step", "update"),
+        (uasyncio.Loop, "run_until_complete", "idle"),
+        (machine, "idle", "idle"),
+        (machine, "lightsleep", "idle"),
+        (time, "sleep", "idle"),
+        (time, "sleep_ms", "idle"),
+        (time, "sleep_us", "idle"),
+    )
+    saved = []
+    for owner, name, stage in targets:
+        original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+        saved.append((owner, name, original))
+        setattr(owner, name, probe.wrap(original, stage))
+    value = machine.Pin.__dict__["value"]
+    saved.append((machine.Pin, "value", value))
+    saved.append((machine.Pin, "__call__", machine.Pin.__dict__["__call__"]))
+    machine.Pin.value = machine.Pin.__call__ = _pin_value(probe, value)
+    return saved
+
+def restore(saved):
+    for owner, name, original in reversed(saved):
+        setattr(owner, name, original)
+
+def record_frames():
+    """把畫面內容有改變的 OLED 更新也記到 board.events，和 LED、PWM 一起比較"""
+    last = [None]
+
+    def on_frame(panel):
+        crc = zlib.crc32(panel.ram)
+        if crc != last[0]:
+            last[0] = crc
+            board.events.append((board.clock.now_us, "oled", 0, crc))
+    board.on_frame = on_frame
+
+def first_divergence(base, probe, after_us):
+    """兩次執行的輸出第一次不同的時間（us）；完全相同則回傳 None"""
+    for i, event in enumerate(probe):
+        if i < len(base) and base[i] == event:
+            continue
+        if event[0] < after_us:
+            raise RuntimeError("輸入改變前輸出就不同了，模擬結果不固定：%r" % (event,))
+        return event[0]
+    return None
+
+def summarize(values):
+    if not values:
+        return {"mean": 0, "p50": 0, "p95": 0, "max": 0}
+    ordered = sorted(values)
+    n = len(ordered)
+    return {
+        "mean": round(sum(ordered) / n, 1),
+        "p50": round(ordered[n // 2], 1),
+        "p95": round(ordered[min(n - 1, n * 95 // 100)], 1),
+        "max": round(ordered[-1], 1),
+    }
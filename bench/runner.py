@@ -0,0 +1,138 @@
+# 在模擬器裡執行一支程式並整理量測結果
+import contextlib
+import io
+import os
+import sys
+import tracemalloc
+from time import perf_counter_ns
+
+import sim
+from sim import signals
+from bench import probe as probes
+from bench.probe import STAGES, StageProbe, summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def calibrate(rounds=5):
+    """固定的一段 Python 計算要花幾微秒（取最快的一次），用來換算不同電腦或負載下的主機時間"""
+    best = None
+    for _ in range(rounds):
+        start = perf_counter_ns()
+        total = 0
+        for i in range(100000):
+            total += i * i & 0xFF
+        elapsed = perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best / 1000, 1)
+
+def _apply(inputs):
+    for pin, signal in inputs.get("adc", {}).items():
+        sim.board.set_adc(pin, signal)
+    for pin, signal in inputs.get("pin", {}).items():
+        sim.board.set_pin(pin, signal)
+
+def boot_times():
+    """腳本裡 boottime 記下的開機時間（虛擬 ms），沒有用 boottime 的腳本回傳 None"""
+    module = sys.modules.get("boottime")
+    if module is None:
+        return None
+    return {name: module.marks[i] for i, name in enumerate(module.NAMES) if module.marks[i] >= 0}
+
+def execute(scenario, limit_ms, inputs, allocs=False, cpu_scale=0, events=False):
+    """執行一次，回傳 (StageProbe, board)；腳本的 print 輸出會被丟掉
+    開機時間存在 probe.boot"""
+    script = os.path.join(ROOT, scenario["script"])
+    sim.install(limit_ms=limit_ms, cpu_scale=cpu_scale)
+    board = sim.board
+    board.record_events = events
+    if events:
+        probes.record_frames()
+    _apply(inputs)
+    probe = StageProbe(script, scenario["hooks"], scenario["marker"], allocs)
+    saved = probes.instrument(probe)
+    if allocs:
+        tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            sim.run_script(script)
+        probe.boot = boot_times()
+    finally:
+        if allocs:
+            tracemalloc.stop()
+        probes.restore(saved)
+        sim.uninstall()
+    if probe.missing:
+        raise RuntimeError("%s 裡找不到：%s" % (scenario["script"], ", ".join(probe.missing)))
+    return probe, board
+
+def measure_stages(scenario, duration_ms):
+    probe, board = execute(scenario, duration_ms, scenario["workload"],
+                           cpu_scale=scenario.get("cpu_scale", 0))
+    frames = probe.frames
+    stages = {}
+    for stage in STAGES:
+        if stage not in probe.calls and not any(f[0].get(stage) for f in frames):
+            continue
+        stages[stage] = {
+            "calls": probe.calls.get(stage, 0),
+            "host_us": summarize([f[0].get(stage, 0) / 1000 for f in frames]),
+            "virtual_us": summarize([f[1].get(stage, 0) for f in frames]),
+        }
+    busy = [sum(ns for stage, ns in f[0].items() if stage not in ("idle", "background")) / 1000
+            for f in frames]
+    result = {
+        "frames": len(frames),
+        "frame_period_ms": summarize([f[2] / 1000 for f in frames]),
+        "frame_host_us": summarize(busy),
+        "stages": stages,
+        "io": dict(sorted(board.counts.items())),
+    }
+    if probe.boot:
+        result["boot_ms"] = probe.boot
+    shows = probe.calls.get("flush", 0)
+    if shows:
+        # 每次 show() 在 I2C 上實際送出的位元組（含位址、控制和命令）
+        result["oled"] = {
+            "shows": shows,
+            "bus_bytes_per_show": round(board.counts.get("i2c_bytes", 0) / shows, 1),
+        }
+    return result
+
+def measure_allocs(scenario, duration_ms):
+    probe, _ = execute(scenario, duration_ms, scenario["workload"], allocs=True,
+                       cpu_scale=scenario.get("cpu_scale", 0))
+    return summarize([f[3] for f in probe.frames])
+
+def measure_latency(scenario, count, start_ms=3000, stride_ms=37, window_ms=800):
+    """輸入在不同的時間點改變，和沒有改變的那次比較，找出輸出第一次不同的時間"""
+    kind, pin, neutral, pushed = scenario["probe"]
+    times = [start_ms + i * stride_ms for i in range(count)]
+    base_inputs = {kind: {pin: signals.const(neutral)}}
+    _, board = execute(scenario, times[-1] + window_ms, base_inputs, events=True)
+    base = list(board.events)
+    samples = []
+    missed = 0
+    for at in times:
+        inputs = {kind: {pin: signals.step(neutral, pushed, at)}}
+        _, board = execute(scenario, at + window_ms, inputs, events=True)
+        changed = probes.first_divergence(base, board.events, at * 1000)
+        if changed is None:
+            missed += 1
+        else:
+            samples.append((changed - at * 1000) / 1000)
+    result = summarize(samples)
+    result["samples"] = [round(s, 1) for s in samples]
+    result["missed"] = missed
+    return result
+
+def run(name, scenario, duration_ms=10000, probes_count=5, allocs=True, repeat=3):
+    result = {"script": scenario["script"], "duration_ms": duration_ms,
+              "deterministic": not scenario.get("cpu_scale")}
+    # 主機時間受其他程式影響，重複幾次取每幀平均最短的一次
+    stages = [measure_stages(scenario, duration_ms) for _ in range(max(1, repeat))]
+    result.update(min(stages, key=lambda r: r["frame_host_us"]["mean"]))
+    if allocs:
+        result["alloc_bytes"] = measure_allocs(scenario, duration_ms)
+    if probes_count:
+        result["latency_ms"] = measure_latency(scenario, probes_count)
+    return result
@@ -0,0 +1,57 @@
+# 每支程式的量測設定
+#   script：要執行的腳本
+#   hooks：腳本裡要計時的函式和它們屬於的階段（其他 I/O 由 probe.instrument 自動分類）
+#   marker：每呼叫一次算一幀
+#   workload：量測各階段耗時用的輸入訊號 {"adc": {腳位: 訊號}, "pin": {...}}
+#   probe：量測延遲用的輸入變化 (種類, 腳位, 原本的值, 改變後的值)
+#   cpu_scale：量測耗時時把電腦上的計算時間乘上多少倍算進虛擬時間
+#             （五子棋電腦思考有時間預算，不算進去會永遠想不完）
+from sim import signals
+
+SCENARIOS = {
+    "x": {
+        "script": "初二信37賴承熹_joystick_X.py",
+        "hooks": {"clear_leds": "output"},
+        "marker": "clear_leds",
+        "workload": {"adc": {34: signals.sine(2048, 2000, 1500)}},
+        "probe": ("adc", 34, 2048, 0),
+    },
+    "xy": {
+        "script": "初二信37賴承熹_joystick_Xy.py",
+        "hooks": {"get_smooth_value": "input", "control_leds": "output"},
+        "marker": "control_leds",
+        "workload": {"adc": {34: signals.sine(2048, 2000, 1500),
+                             35: signals.sine(2048, 2000, 2300)}},
+        "probe": ("adc", 34, 2048, 4095),
+    },
+    "extra": {
+        "script": "初二信37賴承熹_joystick_extra.py",
+        "hooks": {"get_input": "input", "draw_game": "render"},
+        "marker": "get_input",
+        # 先往右走一段再往左，每 0.9 秒往上推一下跳躍
+        "workload": {"adc": {34: signals.square(0, 4095, 4000, 0.7),
+                             35: signals.square(2048, 0, 900, 0.2)}},
+        "probe": ("adc", 34, 2048, 4095),
+    },
+    "final": {
+        "script": "joystickfinal.py",
+        "hooks": {"control_tick": "update", "update_display": "render"},
+        "marker": "control_tick",
+        "workload": {"adc": {35: signals.sine(2000, 2000, 3000),
+                             15: signals.sine(2000, 2000, 2200)}},
+        "probe": ("adc", 35, 2000, 4095),
+    },
+    "crea": {
+        "script": "joystickcrea.py",
+        "hooks": {"get_joystick_input": "input", "Gomoku.draw_board": "render",
+                  "GomokuAI.think": "ai"},
+        "marker": "Gomoku.draw_board",
+        # 開機時按住玩家2的按鈕進入單人模式；搖桿繞圈移動光標，每 2 秒按一下按鈕落子，電腦接著下
+        "workload": {"adc": {34: signals.sine(2048, 2000, 1700),
+                             35: signals.sine(2048, 2000, 2900)},
+                     "pin": {27: signals.square(1, 0, 2000, 0.05),
+                             4: signals.trace([(0, 0), (500, 1)])}},
+        "probe": ("adc", 34, 2048, 4095),
+        "cpu_scale": 10,
+    },
+}
@@ -0,0 +1,38 @@
+# 開機時間量測（五支程式共用）
+# ESP32 重開機後 ticks_ms() 從 0 開始算，所以記下 ticks_ms() 就是開機到現在的時間
+# （不含 bootloader；import 這個模組的時間記成 START，看得出直譯器啟動和 import 花了多久）
+# - mark(READY)：硬體都設定好了
+# - mark(FRAME)：第一個畫面送出
+# - mark(OUTPUT)：第一次依搖桿做出反應（LED、馬達、遊戲或游標）
+# 每種只記第一次，之後的呼叫只比較一次就返回，可以放在主迴圈或計時器回調裡
+# report() 印出一行結果；模擬器和 python -m bench 也會讀 marks 算開機時間
+from array import array
+from compat import ticks_ms
+
+START = 0
+READY = 1
+FRAME = 2
+OUTPUT = 3
+NAMES = ("start", "ready", "frame", "output")
+
+marks = array('l', [-1] * len(NAMES))
+marks[START] = ticks_ms()
+_reported = False
+
+def mark(event):
+    if marks[event] < 0:
+        marks[event] = ticks_ms()
+
+def done():
+    """已經記到第一次輸出（開機完成）"""
+    return marks[OUTPUT] >= 0
+
+def report():
+    """依時間順序印出各個時間點（ms），只印一次；還沒有第一次輸出時不印，回傳是否印了"""
+    global _reported
+    if _reported or not done():
+        return False
+    _reported = True
+    events = sorted((marks[i], name) for i, name in enumerate(NAMES) if marks[i] >= 0)
+    print("開機時間(ms): " + ", ".join("%s %d" % (name, ms) for ms, name in events))
+    return True
@@ -0,0 +1,112 @@
+# 中斷驅動的按鈕
+# - Pin.irq 在電位改變時記下時間，依時間戳去彈跳，不必在主迴圈 sleep
+# - 事件放進固定大小的環形佇列：寫入只改 tail、主迴圈讀取只改 head，不需要上鎖
+# - 中斷裡不配置記憶體；長按事件和漏掉的放開由主迴圈的 update() 補上
+# - PRESS 在按下時立刻送出（例如跳躍）；同一個按鈕要分短按和長按時改用 CLICK 和 LONG_PRESS：
+#   每次按下放開只會有其中一個，放開時沒到長按時間送 CLICK
+from array import array
+from machine import Pin, disable_irq, enable_irq
+from compat import ticks_ms, ticks_diff
+
+PRESS = 1
+RELEASE = 2
+LONG_PRESS = 3
+CLICK = 4
+
+NAMES = {PRESS: "PRESS", RELEASE: "RELEASE", LONG_PRESS: "LONG_PRESS", CLICK: "CLICK"}
+
+class ButtonQueue:
+    """多個按鈕共用的事件佇列"""
+    def __init__(self, size=16):
+        self.size = size
+        self.kinds = bytearray(size)
+        self.ids = bytearray(size)
+        self.times = array('l', [0] * size)
+        self.head = 0  # 下一個要讀的位置，只有主迴圈會改
+        self.tail = 0  # 下一個要寫的位置，只有中斷（或 update）會改
+        self.dropped = 0
+        self.buttons = []
+
+    def put(self, button_id, kind, now):
+        tail = self.tail
+        nxt = (tail + 1) % self.size
+        if nxt == self.head:
+            self.dropped += 1  # 佇列滿了，丟掉最新的事件
+            return
+        self.kinds[tail] = kind
+        self.ids[tail] = button_id
+        self.times[tail] = now
+        self.tail = nxt
+
+    def add(self, button):
+        self.buttons.append(button)
+
+    def update(self, now=None):
+        """主迴圈定期呼叫：產生長按事件，補上彈跳時漏掉的電位變化"""
+        if now is None:
+            now = ticks_ms()
+        for button in self.buttons:
+            button.update(now)
+
+    def get(self):
+        """取出一個事件 (按鈕編號, 種類, 時間)；沒有事件時回傳 None"""
+        head = self.head
+        if head == self.tail:
+            return None
+        event = (self.ids[head], self.kinds[head], self.times[head])
+        self.head = (head + 1) % self.size
+        return event
+
+    def clear(self):
+        self.head = self.tail
+
+    def __len__(self):
+        return (self.tail - self.head) % self.size
+
+class Button:
+    """一個按鈕；預設接上拉電阻，按下時為低電位"""
+    def __init__(self, pin, queue, button_id, debounce_ms=20, long_ms=1000, active_low=True):
+        self.pin = pin
+        self.queue = queue
+        self.id = button_id
+        self.debounce_ms = debounce_ms
+        self.long_ms = long_ms
+        self.active_level = 0 if active_low else 1
+        self.pressed = pin.value() == self.active_level
+        self.changed = ticks_ms()  # 上一次接受電位變化的時間
+        self.long_sent = False
+        queue.add(self)
+        pin.irq(handler=self._irq, trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
+
+    def _irq(self, pin):
+        now = ticks_ms()
+        pressed = pin.value() == self.active_level
+        if pressed == self.pressed or ticks_diff(now, self.changed) < self.debounce_ms:
+            return  # 彈跳
+        self._change(pressed, now)
+
+    def _change(self, pressed, now):
+        held = ticks_diff(now, self.changed)
+        self.pressed = pressed
+        self.changed = now
+        if pressed:
+            self.long_sent = False
+            self.queue.put(self.id, PRESS, now)
+            return
+        self.queue.put(self.id, RELEASE, now)
+        if not self.long_sent:
+            # 按住夠久但 update() 還沒來得及送出長按時，放開時補送
+            self.long_sent = True
+            self.queue.put(self.id, LONG_PRESS if held >= self.long_ms else CLICK, now)
+
+    def update(self, now):
+        # 彈跳時間內最後一次的變化會被中斷忽略，這裡確認電位是否和狀態一致；
+        # 關中斷再寫入，佇列同一時間只會有一個寫入者
+        pressed = self.pin.value() == self.active_level
+        state = disable_irq()
+        if pressed != self.pressed and ticks_diff(now, self.changed) >= self.debounce_ms:
+            self._change(pressed, now)
+        elif self.pressed and not self.long_sent and ticks_diff(now, self.changed) >= self.long_ms:
+            self.long_sent = True
+            self.queue.put(self.id, LONG_PRESS, now)
+        enable_irq(state)
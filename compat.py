@@ -0,0 +1,18 @@
+# MicroPython 和電腦上的 CPython 共用的計時函式
+# 在板子上直接用 time 模組的 ticks_*，在電腦上用 perf_counter_ns 補上
+try:
+    from time import ticks_ms, ticks_us, ticks_diff, ticks_add
+except ImportError:
+    from time import perf_counter_ns
+
+    def ticks_ms():
+        return perf_counter_ns() // 1000000
+
+    def ticks_us():
+        return perf_counter_ns() // 1000
+
+    def ticks_diff(a, b):
+        return a - b
+
+    def ticks_add(a, b):
+        return a + b
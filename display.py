@@ -0,0 +1,232 @@
+# SSD1306 差異更新
+# 保留上一次送出的畫面（shadow），show() 只傳送有變化的頁和欄：
+# - 每一頁找出第一個和最後一個不同的位元組，得到要重送的欄範圍
+# - 相鄰的頁合併成一個視窗比分開送更省時就合併，每個視窗只用一次 I2C 傳輸
+#   （命令和資料用 Co 位元接在同一次傳輸裡）
+# - 統計每幀實際送出的位元組數，可以看出省下多少匯流排時間
+# - 開機時只送初始化命令，不先送一張空白畫面，第一次 show() 才整個送出
+#
+# ThreadedSSD1306 再把傳輸移到背景執行緒（_thread）：
+# - 程式照常畫在 buffer 上，show() 只把畫面複製到待送緩衝區就返回
+# - 背景執行緒在鎖裡交換待送和傳送中兩個緩衝區，再在鎖外做上面的差異更新
+# - ESP32 的 MicroPython 執行緒共用一把 GIL，不會真的平行執行：
+#   只有硬體 I2C 在等傳輸完成時會放開 GIL，主程式才能在這段時間繼續算下一幀；
+#   SoftI2C 用程式送每一個位元，整個傳輸都占著 GIL，背景執行緒只是把傳輸挪到別的時間
+# - 背景還沒拿走的畫面會被新的一幀覆蓋（記在 dropped），永遠只送最新的畫面
+# - 沒有 _thread 的板子自動退回直接送出
+import micropython
+from ssd1306 import SSD1306_I2C
+import log
+
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+try:
+    ptr8  # viper 的型別名稱，只有 MicroPython 編譯器認得
+except NameError:
+    ptr8 = None
+
+SET_COL_ADDR = 0x21
+SET_PAGE_ADDR = 0x22
+WINDOW_OVERHEAD = 15  # 每個視窗的額外成本：位址、6 個命令各帶控制位元組、資料控制位元組
+
+@micropython.viper
+def _dirty_span(buf: ptr8, shadow: ptr8, start: int, end: int) -> int:
+    # 回傳 (第一個不同的位置 << 16) | (最後一個不同的位置 + 1)，完全相同時回傳 -1
+    i = start
+    while i < end and buf[i] == shadow[i]:
+        i += 1
+    if i == end:
+        return -1
+    j = end - 1
+    while buf[j] == shadow[j]:
+        j -= 1
+    return (i << 16) | (j + 1)
+
+class DiffSSD1306(SSD1306_I2C):
+    """和 SSD1306_I2C 用法相同，但 show() 只傳送有變化的部分"""
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
+        pages = height // 8
+        self.shadow = bytearray(width * pages)
+        self.scratch = bytearray(width * pages)  # 跨多頁的視窗先收集到這裡再送
+        self.header = bytearray((0x80, SET_COL_ADDR, 0x80, 0, 0x80, 0,
+                                 0x80, SET_PAGE_ADDR, 0x80, 0, 0x80, 0, 0x40))
+        self.vector = [self.header, None]
+        self.col_offset = (128 - width) // 2 if width != 128 else 0
+        self.views = None
+        self.sources = []  # (來源緩衝區, 它的 memoryview)
+        self.view = None
+        self.full_pending = True
+        self.frames = 0        # 實際更新面板的次數
+        self.bytes_sent = 0    # 送出的總位元組數（含位址、控制和命令）
+        self.last_bytes = 0    # 上一次 show() 送出的位元組數
+        self.transactions = 0
+        self.starting = False  # init_display() 期間不送畫面
+        super().__init__(width, height, i2c, addr, external_vcc)
+
+    def init_display(self):
+        # 只送初始化命令，不送 SSD1306_I2C 原本接著送的空白畫面（整個 1 KB，400 kHz 約 25 ms）；
+        # 面板內容等第一次 show() 整個送出
+        self.starting = True
+        try:
+            super().init_display()
+        finally:
+            self.starting = False
+        self.full_pending = True
+
+    def invalidate(self):
+        """下一次 show() 送出整個畫面（例如面板重新上電之後）"""
+        self.full_pending = True
+
+    def show(self, full=False):
+        self._flush(self.buffer, full)
+
+    def _flush(self, source, full):
+        # 把 source（和 buffer 一樣大小的畫面）和 shadow 比較後送出
+        if self.starting:
+            return
+        if self.views is None:
+            self.views = [memoryview(self.shadow), memoryview(self.scratch)]
+        for pair in self.sources:
+            if pair[0] is source:
+                self.view = pair[1]
+                break
+        else:
+            # 每個來源緩衝區只建一次 memoryview
+            self.view = memoryview(source)
+            self.sources.append((source, self.view))
+        self.frames += 1
+        self.last_bytes = 0
+        width = self.width
+        if full or self.full_pending:
+            self.full_pending = False
+            self._send(0, self.pages - 1, 0, width)
+            return
+        pending = False
+        p0 = p1 = c0 = c1 = 0
+        for page in range(self.pages):
+            base = page * width
+            span = _dirty_span(source, self.shadow, base, base + width)
+            if span < 0:
+                continue
+            a = (span >> 16) - base
+            b = (span & 0xFFFF) - base
+            if pending:
+                lo = a if a < c0 else c0
+                hi = b if b > c1 else c1
+                merged = (page - p0 + 1) * (hi - lo)
+                separate = (p1 - p0 + 1) * (c1 - c0) + (b - a) + WINDOW_OVERHEAD
+                if merged <= separate:
+                    p1 = page
+                    c0 = lo
+                    c1 = hi
+                    continue
+                self._send(p0, p1, c0, c1)
+            p0 = p1 = page
+            c0 = a
+            c1 = b
+            pending = True
+        if pending:
+            self._send(p0, p1, c0, c1)
+
+    def _send(self, p0, p1, c0, c1):
+        # 送出頁 p0~p1、欄 c0~c1-1 的視窗，並更新 shadow
+        buffer = self.view
+        shadow, scratch = self.views
+        width = self.width
+        span = c1 - c0
+        header = self.header
+        header[3] = c0 + self.col_offset
+        header[5] = c1 - 1 + self.col_offset
+        header[9] = p0
+        header[11] = p1
+        if p0 == p1:
+            start = p0 * width + c0
+            data = buffer[start:start + span]
+            shadow[start:start + span] = data
+        else:
+            n = 0
+            for page in range(p0, p1 + 1):
+                start = page * width + c0
+                scratch[n:n + span] = buffer[start:start + span]
+                shadow[start:start + span] = buffer[start:start + span]
+                n += span
+            data = scratch[:n]
+        self.vector[1] = data
+        self.i2c.writevto(self.addr, self.vector)
+        sent = len(header) + len(data) + 1
+        self.last_bytes += sent
+        self.bytes_sent += sent
+        self.transactions += 1
+
+    def bytes_per_frame(self):
+        return self.bytes_sent // self.frames if self.frames else 0
+
+class ThreadedSSD1306(DiffSSD1306):
+    """和 DiffSSD1306 相同，但由背景執行緒送出；threaded=False 或沒有 _thread 時直接送出"""
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False, threaded=True):
+        self.running = False  # 初始化時的 show() 還是直接送出
+        self.presented = 0    # show() 次數
+        self.dropped = 0      # 還沒送出就被新畫面蓋掉的幀數
+        super().__init__(width, height, i2c, addr, external_vcc)
+        self.pending = bytearray(len(self.buffer))  # 最新一幀，等背景拿走
+        self.sending = bytearray(len(self.buffer))  # 背景正在送的畫面
+        self.ready = False        # pending 裡有還沒送的畫面
+        self.full_request = False
+        if threaded and _thread is not None:
+            self.lock = _thread.allocate_lock()
+            # 當號誌用：ready 為 False 時一定是鎖住的，show() 放開就叫醒背景
+            self.signal = _thread.allocate_lock()
+            self.signal.acquire()
+            self.exited = _thread.allocate_lock()  # 背景結束時放開，stop() 等它
+            self.exited.acquire()
+            self.running = True
+            _thread.start_new_thread(self._worker, ())
+
+    def show(self, full=False):
+        self.presented += 1
+        if not self.running:
+            self._flush(self.buffer, full)
+            return
+        with self.lock:
+            self.pending[:] = self.buffer
+            if full:
+                self.full_request = True
+            if self.ready:
+                self.dropped += 1
+            else:
+                self.ready = True
+                self.signal.release()
+
+    def _worker(self):
+        try:
+            while True:
+                self.signal.acquire()
+                with self.lock:
+                    running = self.running
+                    if not self.ready:
+                        return  # stop() 叫醒，沒有待送的畫面
+                    self.pending, self.sending = self.sending, self.pending
+                    self.ready = False
+                    full = self.full_request
+                    self.full_request = False
+                self._flush(self.sending, full)
+                if not running:
+                    return  # stop() 之前的最後一幀已經送出
+        except Exception as e:
+            log.exception(e, "顯示執行緒錯誤")
+            self.running = False
+        finally:
+            self.exited.release()
+
+    def stop(self):
+        """停止背景執行緒；還沒送出的最後一幀送完才返回，之後的 show() 直接送出"""
+        if not self.running:
+            return
+        with self.lock:
+            self.running = False
+            if not self.ready:
+                self.signal.release()  # 只是叫醒背景讓它結束
+        self.exited.acquire()
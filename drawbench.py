@@ -0,0 +1,60 @@
+# 比較馬里奧畫面兩種畫法每幀的繪圖時間（不含傳送到 OLED）：
+#   原本的 rect/fill_rect 外框，和 sprites.py 的點陣圖 blit
+# 在板子上執行：mpremote run drawbench.py（需要先上傳 mario.py、entities.py、levelfile.py、sprites.py、levels.bin）
+# 在電腦上：python -m sim drawbench.py --cpu-scale 1（模擬器的 framebuf 是 Python 寫的，只能看相對值）
+import framebuf
+from time import ticks_us, ticks_diff
+from mario import Mario, Camera, SCREEN_WIDTH, SCREEN_HEIGHT, GROUND_HEIGHT
+from levelfile import LevelFile
+from sprites import GameSprites, TRANSPARENT
+
+ROUNDS = 200
+
+buf = bytearray(SCREEN_WIDTH * SCREEN_HEIGHT // 8)
+screen = framebuf.FrameBuffer(buf, SCREEN_WIDTH, SCREEN_HEIGHT, framebuf.MONO_VLSB)
+art = GameSprites()
+
+def draw_rects(mario, level, camera_x, tick):
+    screen.fill(0)
+    screen.hline(0, GROUND_HEIGHT, SCREEN_WIDTH, 1)
+    platforms, coins = level.visible(camera_x, SCREEN_WIDTH)
+    for platform in platforms:
+        screen.rect(platform.x - camera_x, platform.y, platform.width, platform.height, 1)
+    for coin in coins:
+        if not coin.collected:
+            screen.rect(coin.x - camera_x, coin.y, coin.width, coin.height, 1)
+    if mario.facing_right:
+        screen.rect(mario.x - camera_x, mario.y, mario.width, mario.height, 1)
+    else:
+        screen.fill_rect(mario.x - camera_x, mario.y, mario.width, mario.height, 1)
+
+def draw_sprites(mario, level, camera_x, tick):
+    screen.fill(0)
+    screen.hline(0, GROUND_HEIGHT, SCREEN_WIDTH, 1)
+    platforms, coins = level.visible(camera_x, SCREEN_WIDTH)
+    for platform in platforms:
+        screen.blit(art.platform(platform.width), platform.x - camera_x, platform.y, TRANSPARENT)
+    coin_image = art.coin(tick)
+    for coin in coins:
+        if not coin.collected:
+            screen.blit(coin_image, coin.x - camera_x, coin.y, TRANSPARENT)
+    screen.blit(art.mario(mario), mario.x - camera_x, mario.y, TRANSPARENT)
+
+def measure(draw, level, mario, camera):
+    draw(mario, level, camera.x, 0)  # 先畫一次，平台圖的快取不算在內
+    start = ticks_us()
+    for tick in range(ROUNDS):
+        draw(mario, level, camera.x, tick)
+    return ticks_diff(ticks_us(), start) // ROUNDS
+
+levels = LevelFile("levels.bin")
+mario = Mario()
+camera = Camera()
+print("關卡  物件  rect us/幀  sprite us/幀")
+for number in range(1, levels.count + 1):
+    level = levels.load(number)
+    platforms, coins = level.visible(camera.x, SCREEN_WIDTH)
+    count = len(platforms) + len(coins) + 1
+    rects = measure(draw_rects, level, mario, camera)
+    blits = measure(draw_sprites, level, mario, camera)
+    print("%4d  %4d  %10d  %12d" % (number, count, rects, blits))
@@ -0,0 +1,173 @@
+# 馬里奧遊戲裡會動的物件（敵人、投射物）
+# 物件不是一個個 Python 物件，而是預先配置好的 array 欄位（每個欄位一個 array，第 i 個物件是每個欄位的第 i 格）：
+# - 開關卡時依關卡檔頭的最大數量配置一次，遊戲中生成和消失只是改欄位、進出空位堆疊，不配置記憶體
+# - MicroPython 的物件每個都有自己的屬性字典（約 100 bytes 以上），這裡每個物件只佔 BYTES_PER_ENTITY bytes
+# - 垂直位置和速度和馬里奧一樣用定點數，全部是整數運算
+from array import array
+from mario import FP_SHIFT, GRAVITY, GROUND_HEIGHT
+
+FREE = 0    # 空位
+WALKER = 1  # 走路的敵人：受重力影響、會落在平台上，走到巡邏範圍 lo~hi 的邊界就回頭
+FLYER = 2   # 飛行的敵人：不受重力，在巡邏範圍 lo~hi 之間來回
+SHOT = 3    # 投射物：直線前進，離開 lo~hi 就消失
+
+ENEMY_SIZE = 8
+STOMP_MARGIN = 4  # 馬里奧的腳在敵人頭頂這麼多像素以內、而且往下掉，算踩到
+# kind、w、h 各 1 byte；x、fy、vx、vy、lo、hi 和空位堆疊各 2 bytes
+BYTES_PER_ENTITY = 17
+
+def _column(code, capacity):
+    return array(code, [0] * capacity)
+
+class Entities:
+    """最多 capacity 個會動的物件；spawn() 回傳編號，之後用編號讀欄位（x、fy、kind ...）"""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.kind = bytearray(capacity)
+        self.w = bytearray(capacity)
+        self.h = bytearray(capacity)
+        self.x = _column("h", capacity)   # 像素
+        self.fy = _column("h", capacity)  # 定點數
+        self.vx = _column("h", capacity)  # 像素/步
+        self.vy = _column("h", capacity)  # 定點數/步
+        self.lo = _column("h", capacity)  # 活動範圍（像素）
+        self.hi = _column("h", capacity)
+        self.free = _column("H", capacity)  # 空位的編號（堆疊）
+        self.clear()
+
+    def clear(self):
+        """移除所有物件；欄位全部歸零，同樣的關卡載入後狀態完全一樣（world.World.hash()）"""
+        free = self.free
+        n = self.capacity
+        for column in (self.kind, self.w, self.h, self.x, self.fy, self.vx, self.vy, self.lo, self.hi):
+            for i in range(n):
+                column[i] = 0
+        for i in range(n):
+            free[i] = n - 1 - i  # 先用編號小的空位
+        self.nfree = n
+        self.top = 0  # 用過的最大編號 + 1，更新時只掃到這裡
+        self.count = 0
+
+    def spawn(self, kind, x, y, vx, lo, hi, w=ENEMY_SIZE, h=ENEMY_SIZE):
+        """加入一個物件，回傳編號；滿了回傳 -1"""
+        if not self.nfree:
+            return -1
+        self.nfree -= 1
+        i = self.free[self.nfree]
+        self.kind[i] = kind
+        self.w[i] = w
+        self.h[i] = h
+        self.x[i] = x
+        self.fy[i] = y << FP_SHIFT
+        self.vx[i] = vx
+        self.vy[i] = 0
+        self.lo[i] = lo
+        self.hi[i] = hi
+        if i >= self.top:
+            self.top = i + 1
+        self.count += 1
+        return i
+
+    def kill(self, i):
+        if self.kind[i] != FREE:
+            self.kind[i] = FREE
+            self.free[self.nfree] = i
+            self.nfree += 1
+            self.count -= 1
+
+    def step(self, level):
+        """level.active() 範圍內的物件前進一個物理步，範圍外的停著不動
+        （那裡的平台可能沒載入，敵人會掉下去）"""
+        left, right = level.active()
+        solid = level.solid
+        kind = self.kind
+        ws = self.w
+        hs = self.h
+        xs = self.x
+        fys = self.fy
+        vxs = self.vx
+        vys = self.vy
+        los = self.lo
+        his = self.hi
+        ground = GROUND_HEIGHT << FP_SHIFT
+        for i in range(self.top):
+            k = kind[i]
+            if k == FREE:
+                continue
+            x = xs[i]
+            w = ws[i]
+            if x < left or x + w > right:
+                continue
+            x += vxs[i]
+            if k == SHOT:
+                if x < los[i] or x + w > his[i]:
+                    self.kill(i)
+                else:
+                    xs[i] = x
+                continue
+            # 巡邏範圍的邊界回頭
+            if x < los[i]:
+                x = los[i]
+                vxs[i] = -vxs[i]
+            elif x + w > his[i]:
+                x = his[i] - w
+                vxs[i] = -vxs[i]
+            xs[i] = x
+            if k != WALKER:
+                continue
+            # 和 Mario.update 一樣：重力、地面和從上方落到平台上
+            height = hs[i] << FP_SHIFT
+            fy = fys[i]
+            vy = vys[i] + GRAVITY
+            new_y = fy + vy
+            if new_y > ground - height:
+                new_y = ground - height
+                vy = 0
+            if vy > 0:
+                sweep = ((new_y - fy) >> FP_SHIFT) + hs[i] + 1
+                for platform in solid.query(x, fy >> FP_SHIFT, w, sweep):
+                    if x + w > platform.x and x < platform.x + platform.width:
+                        py = platform.y << FP_SHIFT
+                        if fy + height <= py and new_y + height > py:
+                            new_y = py - height
+                            vy = 0
+            fys[i] = new_y
+            vys[i] = vy
+
+    def hit(self, mario):
+        """和馬里奧重疊的第一個物件編號，沒有就回傳 -1"""
+        kind = self.kind
+        ws = self.w
+        hs = self.h
+        xs = self.x
+        fys = self.fy
+        mx = mario.x
+        my = mario.y
+        mw = mario.width
+        mh = mario.height
+        for i in range(self.top):
+            if kind[i] == FREE:
+                continue
+            x = xs[i]
+            y = fys[i] >> FP_SHIFT
+            if x < mx + mw and x + ws[i] > mx and y < my + mh and y + hs[i] > my:
+                return i
+        return -1
+
+    def stomped(self, i, mario):
+        """馬里奧往下掉、腳在物件頭頂附近：算踩到"""
+        return mario.vy > 0 and mario.y + mario.height <= (self.fy[i] >> FP_SHIFT) + STOMP_MARGIN
+
+    def draw(self, target, images, camera_x, width, key=0):
+        """把鏡頭範圍 camera_x~camera_x+width 內的物件 blit 到 target；images[kind] 是那種物件的圖"""
+        kind = self.kind
+        xs = self.x
+        fys = self.fy
+        right = camera_x + width
+        for i in range(self.top):
+            k = kind[i]
+            if k == FREE:
+                continue
+            x = xs[i]
+            if x + self.w[i] > camera_x and x < right:
+                target.blit(images[k], x - camera_x, fys[i] >> FP_SHIFT, key)
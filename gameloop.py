@@ -0,0 +1,127 @@
+# 固定時間步長的遊戲迴圈
+# - 物理每一步固定 step_ms，遊戲速度和畫面花多少時間無關
+# - 用累加器記錄還沒模擬的時間，畫面慢了就在同一幀多跑幾步追上
+# - 落後太多（超過 max_steps 步）時丟掉多出來的時間，避免越追越慢
+# - 物理跑完還是落後時跳過這一幀的繪圖（最多連續 max_skip 幀），把時間留給物理
+# - 每幀記一次 gc.mem_alloc()：MicroPython 的 heap 只有垃圾回收時才會變小，
+#   所以變小就算一次 GC，變大的量就是這一幀配置的記憶體
+#   （電腦上的 CPython 會立刻釋放物件，這兩個數字只在板子上有意義）
+from compat import ticks_ms, ticks_diff
+import gc
+import time
+
+_mem_alloc = getattr(gc, "mem_alloc", None)
+
+class FixedStep:
+    """用法：
+        steps = loop.begin()          # 這一幀要跑幾個物理步
+        for _ in range(steps): 更新物理
+        if loop.render_due(): 繪圖
+        loop.wait()                   # 等到下一步的時間"""
+    def __init__(self, step_ms=20, max_steps=5, max_skip=3, window_ms=1000):
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.max_skip = max_skip
+        self.window_ms = window_ms
+        # 累計計數
+        self.frames = 0      # 有繪圖的幀數
+        self.steps = 0       # 物理步數
+        self.skipped = 0     # 為了追上物理而跳過繪圖的幀數
+        self.overruns = 0    # 一幀花的時間超過 step_ms
+        self.dropped_ms = 0  # 落後太多而丟掉的時間
+        self.allocated = 0   # 配置的記憶體（bytes）
+        self.collections = 0  # 看到的垃圾回收次數
+        self.heap = _mem_alloc() if _mem_alloc else 0
+        # 最近一個統計區間的結果
+        self.fps = 0
+        self.steps_per_s = 0
+        self.window_overruns = 0
+        self.alloc_per_frame = 0  # 平均每幀配置的 bytes
+        self.gc_per_s = 0         # 每秒垃圾回收次數（乘 100，整數）
+        self.reset()
+
+    def reset(self):
+        """從現在重新開始計時（例如顯示關卡畫面、sleep 了一段時間之後）"""
+        now = ticks_ms()
+        self.last = now
+        self.accumulator = 0
+        self.skip_run = 0
+        self.window_start = now
+        self.window_frames = self.frames
+        self.window_steps = self.steps
+        self.window_overrun_base = self.overruns
+        self.window_allocated = self.allocated
+        self.window_collections = self.collections
+        self.window_loops = 0
+        if _mem_alloc:
+            self.heap = _mem_alloc()
+
+    def begin(self):
+        """開始新的一幀，回傳要跑幾個物理步（0~max_steps）"""
+        now = ticks_ms()
+        self.accumulator += ticks_diff(now, self.last)
+        self.last = now
+        steps = self.accumulator // self.step_ms
+        if steps > self.max_steps:
+            self.dropped_ms += (steps - self.max_steps) * self.step_ms
+            steps = self.max_steps
+            self.accumulator %= self.step_ms
+        else:
+            self.accumulator -= steps * self.step_ms
+        self.steps += steps
+        return steps
+
+    def _behind(self):
+        # 還沒模擬的時間（含這一幀到目前為止花的）
+        return self.accumulator + ticks_diff(ticks_ms(), self.last)
+
+    def render_due(self):
+        """物理跑完之後呼叫：要畫這一幀就回傳 True"""
+        if self._behind() >= self.step_ms and self.skip_run < self.max_skip:
+            self.skip_run += 1
+            self.skipped += 1
+            return False
+        self.skip_run = 0
+        self.frames += 1
+        return True
+
+    def wait(self):
+        """睡到下一個物理步的時間；已經超過就直接返回並記一次 overrun
+        統計區間剛結束（fps 等數值更新了）時回傳 True"""
+        remaining = self.step_ms - self._behind()
+        if remaining > 0:
+            time.sleep_ms(remaining)
+        else:
+            self.overruns += 1
+        self.window_loops += 1
+        if _mem_alloc:
+            self._count_heap()
+        return self._update_window()
+
+    def _count_heap(self):
+        heap = _mem_alloc()
+        if heap < self.heap:
+            self.collections += 1
+        else:
+            self.allocated += heap - self.heap
+        self.heap = heap
+
+    def _update_window(self):
+        now = ticks_ms()
+        elapsed = ticks_diff(now, self.window_start)
+        if elapsed < self.window_ms:
+            return False
+        self.fps = (self.frames - self.window_frames) * 1000 // elapsed
+        self.steps_per_s = (self.steps - self.window_steps) * 1000 // elapsed
+        self.window_overruns = self.overruns - self.window_overrun_base
+        loops = self.window_loops
+        self.alloc_per_frame = (self.allocated - self.window_allocated) // loops if loops else 0
+        self.gc_per_s = (self.collections - self.window_collections) * 100000 // elapsed
+        self.window_start = now
+        self.window_frames = self.frames
+        self.window_steps = self.steps
+        self.window_overrun_base = self.overruns
+        self.window_allocated = self.allocated
+        self.window_collections = self.collections
+        self.window_loops = 0
+        return True
@@ -0,0 +1,332 @@
+# 五子棋電腦對手
+# 迭代加深 alpha-beta 搜尋，只考慮已有棋子附近的空格，
+# 用 Zobrist 雜湊的置換表（固定大小）記住搜過的局面，並有每步的時間上限
+# 在電腦上可以直接執行：python3 gomoku_ai.py [每步毫秒數]
+from array import array
+from compat import ticks_ms, ticks_diff, ticks_add
+from gomoku_board import BitBoard
+
+WIN = 1000000
+INF = WIN * 2
+NO_MOVE = 255
+
+# 置換表條目類型
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# 棋型分數：SCORES[連子數][兩端空位數]
+SCORES = (
+    (0, 0, 0),
+    (0, 1, 10),
+    (0, 10, 100),
+    (0, 100, 1000),
+    (0, 1000, 10000),
+)
+
+def make_zobrist(n, seed=0x2545F491):
+    # xorshift32 產生固定的亂數，取 30 位元讓 MicroPython 保持小整數
+    keys = []
+    x = seed
+    for _ in range(n):
+        x ^= (x << 13) & 0xFFFFFFFF
+        x ^= x >> 17
+        x ^= (x << 5) & 0xFFFFFFFF
+        keys.append(x & 0x3FFFFFFF)
+    return keys
+
+class GomokuAI:
+    """有時間上限的五子棋 AI，board 必須是 BitBoard"""
+    def __init__(self, board, budget_ms=1500, max_depth=8, tt_size=2048, width=8):
+        self.board = board
+        self.budget_ms = budget_ms
+        self.max_depth = max_depth
+        self.width = width  # 每層最多展開幾步
+
+        size = board.size
+        lines = 2 * size - 1
+        self.full = (1 << size) - 1
+        # 斜線上哪些位元落在棋盤內
+        self.diag_valid = array('H', [0] * lines)
+        self.anti_valid = array('H', [0] * lines)
+        for y in range(size):
+            for x in range(size):
+                self.diag_valid[x - y + size - 1] |= 1 << y
+                self.anti_valid[x + y] |= 1 << x
+
+        # 格子編號 y * 16 + x
+        self.zobrist = make_zobrist(2 * 256)
+        self.hash = 0
+
+        # 置換表：每條約 11 bytes，tt_size 必須是 2 的次方
+        self.tt_mask = tt_size - 1
+        self.tt_key = array('l', [-1] * tt_size)
+        self.tt_score = array('l', [0] * tt_size)
+        self.tt_depth = array('b', [0] * tt_size)
+        self.tt_flag = array('b', [0] * tt_size)
+        self.tt_move = array('B', [NO_MOVE] * tt_size)
+
+        # 每層的候選步和排序分數，預先配置避免搜尋中配置記憶體
+        self.ply_moves = [array('B', [0] * width) for _ in range(max_depth + 1)]
+        self.ply_keys = [array('l', [0] * width) for _ in range(max_depth + 1)]
+
+        self.nodes = 0
+        self.depth_reached = 0
+        self.best_move = NO_MOVE
+        self.root_move = NO_MOVE
+        self.attack_move = NO_MOVE
+        self.player = 2
+        self.aborted = False
+        self.deadline = 0
+        self.move_deadline = 0
+        self.next_depth = 1
+
+    def tt_bytes(self):
+        return (self.tt_mask + 1) * 11
+
+    def start(self, player):
+        # 開始為 player 思考下一步
+        board = self.board
+        self.player = player
+        self.hash = 0
+        for y in range(board.size):
+            for x in range(board.size):
+                stone = board.get(x, y)
+                if stone:
+                    self.hash ^= self.zobrist[(stone - 1) * 256 + y * 16 + x]
+        self.nodes = 0
+        self.depth_reached = 0
+        self.best_move = NO_MOVE
+        self.root_move = NO_MOVE  # 沒有候選步時 search() 不會改它，不能留著上一步
+        self.next_depth = 1
+        self.move_deadline = ticks_add(ticks_ms(), self.budget_ms)
+
+    def think(self, slice_ms):
+        # 最多想 slice_ms 毫秒就返回，讓主迴圈可以更新畫面
+        # 還沒想完回傳 None，想完回傳 (x, y)；棋盤滿了沒有地方下時回傳 NO_MOVE
+        now = ticks_ms()
+        self.deadline = ticks_add(now, slice_ms)
+        if ticks_diff(self.move_deadline, self.deadline) < 0:
+            self.deadline = self.move_deadline
+
+        while self.next_depth <= self.max_depth:
+            self.aborted = False
+            score = self.search(self.next_depth, -INF, INF, self.player, 0)
+            if self.aborted:
+                # 這一層沒搜完；置換表保留了進度，下次從同一層繼續
+                if ticks_diff(ticks_ms(), self.move_deadline) < 0:
+                    return None
+                break
+            self.best_move = self.root_move
+            self.depth_reached = self.next_depth
+            self.next_depth += 1
+            if score >= WIN - 100 or score <= -WIN + 100:
+                break  # 已經看到勝負
+
+        if self.best_move == NO_MOVE:
+            # 連第一層都沒搜完，用排序最好的一步；沒有候選步表示棋盤是空的或已經下滿
+            if self.generate(0, self.player, NO_MOVE)[0]:
+                self.best_move = self.ply_moves[0][0]
+            else:
+                center = self.board.size // 2
+                if self.board.get(center, center):
+                    self.next_depth = self.max_depth + 1
+                    return NO_MOVE
+                self.best_move = center * 17
+        self.next_depth = self.max_depth + 1
+        return self.best_move & 15, self.best_move >> 4
+
+    def choose_move(self, player):
+        # 一次想完，不分段
+        self.start(player)
+        move = None
+        while move is None:
+            move = self.think(self.budget_ms)
+        return move
+
+    def play(self, x, y, player):
+        self.board.place_stone(x, y, player)
+        self.hash ^= self.zobrist[(player - 1) * 256 + y * 16 + x]
+
+    def undo(self, x, y, player):
+        self.board.remove(x, y)
+        self.hash ^= self.zobrist[(player - 1) * 256 + y * 16 + x]
+
+    def line_score(self, own, opp, valid, pos):
+        # 在 pos 下子後，這條線上的連子數和兩端空位
+        empty = valid & ~(own | opp)
+        count = 1
+        ends = 0
+        bit = 2 << pos
+        while own & bit:
+            count += 1
+            bit <<= 1
+        if empty & bit:
+            ends += 1
+        bit = (1 << pos) >> 1
+        while own & bit:
+            count += 1
+            bit >>= 1
+        if empty & bit:
+            ends += 1
+        if count >= 5:
+            return WIN
+        return SCORES[count][ends]
+
+    def cell_score(self, x, y, player):
+        # 玩家在 (x, y) 下子能形成的棋型分數
+        board = self.board
+        opp = 3 - player
+        d = x - y + board.size - 1
+        a = x + y
+        return (self.line_score(board.rows[player][y], board.rows[opp][y], self.full, x) +
+                self.line_score(board.cols[player][x], board.cols[opp][x], self.full, y) +
+                self.line_score(board.diag[player][d], board.diag[opp][d], self.diag_valid[d], y) +
+                self.line_score(board.anti[player][a], board.anti[opp][a], self.anti_valid[a], x))
+
+    def generate(self, ply, player, tt_move):
+        # 找出已有棋子周圍一格內的空格，評分後只留下最好的 width 步
+        # 回傳 (步數, 自己最好的進攻分, 對手最好的進攻分)
+        board = self.board
+        size = board.size
+        rows1 = board.rows[1]
+        rows2 = board.rows[2]
+        moves = self.ply_moves[ply]
+        keys = self.ply_keys[ply]
+        width = self.width
+        opp = 3 - player
+        n = 0
+        self.attack_move = NO_MOVE
+        best_attack = 0
+        best_threat = 0
+
+        prev = 0
+        cur = rows1[0] | rows2[0]
+        for y in range(size):
+            nxt = (rows1[y + 1] | rows2[y + 1]) if y + 1 < size else 0
+            near = prev | cur | nxt
+            near = (near | (near << 1) | (near >> 1)) & self.full & ~cur
+            prev = cur
+            cur = nxt
+            x = 0
+            while near:
+                if near & 1:
+                    attack = self.cell_score(x, y, player)
+                    threat = self.cell_score(x, y, opp)
+                    move = y * 16 + x
+                    if attack > best_attack:
+                        best_attack = attack
+                        self.attack_move = move
+                    if threat > best_threat:
+                        best_threat = threat
+                    key = INF if move == tt_move else attack + threat
+                    # 插入排序，只保留前 width 名
+                    if n < width or key > keys[n - 1]:
+                        i = n if n < width else width - 1
+                        while i > 0 and keys[i - 1] < key:
+                            keys[i] = keys[i - 1]
+                            moves[i] = moves[i - 1]
+                            i -= 1
+                        keys[i] = key
+                        moves[i] = move
+                        if n < width:
+                            n += 1
+                near >>= 1
+                x += 1
+        return n, best_attack, best_threat
+
+    def search(self, depth, alpha, beta, player, ply):
+        self.nodes += 1
+        # 每個節點都檢查時間：一個節點要跑一次 generate()，在板子上就要好幾毫秒，
+        # 隔幾十個節點才檢查會超過時間片好幾百毫秒
+        if ticks_diff(ticks_ms(), self.deadline) >= 0:
+            self.aborted = True
+        if self.aborted:
+            return 0
+
+        h = self.hash
+        index = h & self.tt_mask
+        tt_move = NO_MOVE
+        if self.tt_key[index] == h:
+            tt_move = self.tt_move[index]
+            if self.tt_depth[index] >= depth and ply > 0:
+                score = self.tt_score[index]
+                flag = self.tt_flag[index]
+                if flag == EXACT:
+                    return score
+                if flag == LOWER and score >= beta:
+                    return score
+                if flag == UPPER and score <= alpha:
+                    return score
+
+        n, attack, threat = self.generate(ply, player, tt_move)
+        if n == 0:
+            return 0  # 沒有可下的空格
+        if attack >= WIN:
+            # 這一步就能連成五子
+            if ply == 0:
+                self.root_move = self.attack_move
+            return WIN - ply
+        if depth == 0:
+            return attack - threat // 2
+
+        moves = self.ply_moves[ply]
+        alpha_orig = alpha
+        best = -INF
+        best_move = NO_MOVE
+        for i in range(n):
+            move = moves[i]
+            x = move & 15
+            y = move >> 4
+            self.play(x, y, player)
+            score = -self.search(depth - 1, -beta, -alpha, 3 - player, ply + 1)
+            self.undo(x, y, player)
+            if self.aborted:
+                return 0
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store(index, h, depth, best, flag, best_move)
+        if ply == 0:
+            self.root_move = best_move
+        return best
+
+    def store(self, index, h, depth, score, flag, move):
+        self.tt_key[index] = h
+        self.tt_score[index] = score
+        self.tt_depth[index] = depth
+        self.tt_flag[index] = flag
+        self.tt_move[index] = move
+
+def benchmark(budget_ms=2000):
+    # 固定局面下，在時間預算內能搜多少節點、搜到第幾層
+    board = BitBoard(15)
+    opening = ((7, 7, 1), (8, 8, 2), (8, 6, 1), (6, 8, 2), (9, 5, 1),
+               (7, 9, 2), (6, 7, 1), (8, 7, 2))
+    for x, y, player in opening:
+        board.place_stone(x, y, player)
+    ai = GomokuAI(board, budget_ms=budget_ms, max_depth=12)
+    start = ticks_ms()
+    move = ai.choose_move(1)
+    elapsed = max(1, ticks_diff(ticks_ms(), start))
+    print("move:", move)
+    print("depth reached:", ai.depth_reached)
+    print("nodes:", ai.nodes, "in", elapsed, "ms")
+    print("nodes/sec:", ai.nodes * 1000 // elapsed)
+    print("tt bytes:", ai.tt_bytes())
+    return ai.nodes, ai.depth_reached, elapsed
+
+if __name__ == "__main__":
+    import sys
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,116 @@
+# 五子棋棋盤引擎
+# ListBoard：原本的二維串列寫法，逐格檢查連線
+# BitBoard：每個玩家的棋子按橫、直、兩條斜線各存一份位元，用位移和遮罩檢查五連
+from array import array
+
+class ListBoard:
+    def __init__(self, size=15):
+        self.size = size
+        self.grid = [[0] * size for _ in range(size)]
+
+    def clear(self):
+        for row in self.grid:
+            for x in range(self.size):
+                row[x] = 0
+
+    def get(self, x, y):
+        return self.grid[y][x]
+
+    def place_stone(self, x, y, player):
+        if self.grid[y][x] != 0:
+            return False
+        self.grid[y][x] = player
+        return True
+
+    def remove(self, x, y):
+        self.grid[y][x] = 0
+
+    def check_win(self, x, y, player):
+        size = self.size
+        grid = self.grid
+        for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):  # 水平、垂直、對角線
+            count = 1
+            # 正向檢查
+            cx, cy = x + dx, y + dy
+            while 0 <= cx < size and 0 <= cy < size and grid[cy][cx] == player:
+                count += 1
+                cx += dx
+                cy += dy
+            # 反向檢查
+            cx, cy = x - dx, y - dy
+            while 0 <= cx < size and 0 <= cy < size and grid[cy][cx] == player:
+                count += 1
+                cx -= dx
+                cy -= dy
+            if count >= 5:
+                return True
+        return False
+
+class BitBoard:
+    def __init__(self, size=15):
+        # 每條線一個 16 位元整數，棋盤最大 16x16
+        # rows[y] 第 x 位、cols[x] 第 y 位、diag[x-y+size-1] 第 y 位、anti[x+y] 第 x 位
+        self.size = size
+        lines = 2 * size - 1
+        self.rows = (None, array('H', [0] * size), array('H', [0] * size))
+        self.cols = (None, array('H', [0] * size), array('H', [0] * size))
+        self.diag = (None, array('H', [0] * lines), array('H', [0] * lines))
+        self.anti = (None, array('H', [0] * lines), array('H', [0] * lines))
+
+    def clear(self):
+        for lines in (self.rows, self.cols, self.diag, self.anti):
+            for player in (1, 2):
+                words = lines[player]
+                for i in range(len(words)):
+                    words[i] = 0
+
+    def get(self, x, y):
+        bit = 1 << x
+        if self.rows[1][y] & bit:
+            return 1
+        if self.rows[2][y] & bit:
+            return 2
+        return 0
+
+    def place_stone(self, x, y, player):
+        if (self.rows[1][y] | self.rows[2][y]) & (1 << x):
+            return False
+        d = x - y + self.size - 1
+        self.rows[player][y] |= 1 << x
+        self.cols[player][x] |= 1 << y
+        self.diag[player][d] |= 1 << y
+        self.anti[player][x + y] |= 1 << x
+        return True
+
+    def remove(self, x, y):
+        d = x - y + self.size - 1
+        for player in (1, 2):
+            self.rows[player][y] &= ~(1 << x)
+            self.cols[player][x] &= ~(1 << y)
+            self.diag[player][d] &= ~(1 << y)
+            self.anti[player][x + y] &= ~(1 << x)
+
+    def check_win(self, x, y, player):
+        # 每個方向：用位移和 AND 找出線上連續五顆的起點，
+        # 再用遮罩看有沒有一段的起點落在 (x, y) 往前四格之內
+        w = self.rows[player][y]  # 水平
+        w &= w >> 1
+        w &= w >> 2
+        if w & (w >> 1) & (0x1F << x >> 4):
+            return True
+        w = self.cols[player][x]  # 垂直
+        w &= w >> 1
+        w &= w >> 2
+        if w & (w >> 1) & (0x1F << y >> 4):
+            return True
+        w = self.diag[player][x - y + self.size - 1]  # 對角線（往右下）
+        w &= w >> 1
+        w &= w >> 2
+        if w & (w >> 1) & (0x1F << y >> 4):
+            return True
+        w = self.anti[player][x + y]  # 對角線（往右上）
+        w &= w >> 1
+        w &= w >> 2
+        if w & (w >> 1) & (0x1F << x >> 4):
+            return True
+        return False
@@ -0,0 +1,154 @@
+# 搖桿驅動（五支程式共用）
+# - 開機時把搖桿放著不動校準中心值，讀值的跳動幅度順便決定最小死區，
+#   中心偏掉（例如 1950 或 2100）也不會誤判成推動
+#   calibrate() 可以同時校準好幾個軸，開機只要等一個軸的時間
+# - 方向和比例值都在校準後算成整數查找表，每次讀值只要查表，不用 abs 和比較
+# - adc 也可以是 sampler.Channel（計時器背景取樣、濾波後的值），用法一樣
+from array import array
+import time
+
+ADC_MAX = 4095
+LUT_SHIFT = 4  # 查找表每格代表 16 個 ADC 單位，一個軸 256 格
+LUT_SIZE = (ADC_MAX >> LUT_SHIFT) + 1
+MAX_CENTER_ERROR = 600  # 校準出的中心和預設值相差超過這麼多，多半是校準時搖桿被推著
+
+def shape(x, curve="linear", expo=0.5):
+    """0~1 的推動量套上反應曲線"""
+    if curve == "linear":
+        return x
+    if curve == "sqrt":
+        return x ** 0.5
+    if curve == "expo":
+        return expo * x ** 3 + (1 - expo) * x
+    raise ValueError("unknown curve: " + curve)
+
+class Axis:
+    """一個 ADC 軸：讀值 -> 方向 (-1/0/1) 和比例值 (-limit~limit)
+    ADC 讀值越小方向越負（X 軸往左、Y 軸往上），invert=True 則相反"""
+    def __init__(self, adc, center=2048, dead_zone=300, threshold=1000, limit=100,
+                 curve="linear", expo=0.5, invert=False, low=0, high=ADC_MAX):
+        self.adc = adc
+        self.default_center = center
+        self.center = center
+        self.dead_zone = dead_zone
+        self.threshold = threshold
+        self.limit = limit
+        self.curve = curve
+        self.expo = expo
+        self.invert = invert
+        self.low = low
+        self.high = high
+        self.noise = 0
+        self.directions = array('b', bytes(LUT_SIZE))
+        self.values = array('h', bytes(2 * LUT_SIZE))
+        self.raw = center
+        self.direction = 0
+        self.value = 0
+        self.build()
+
+    def build(self):
+        """依目前的中心、範圍、死區和曲線重算查找表（只在初始化和校準時用浮點運算）"""
+        dead = max(self.dead_zone, self.noise)
+        for i in range(LUT_SIZE):
+            offset = (i << LUT_SHIFT) + (1 << LUT_SHIFT >> 1) - self.center
+            if offset > 0:
+                sign = 1
+                extent = self.high - self.center
+            else:
+                sign = -1
+                offset = -offset
+                extent = self.center - self.low
+            if self.invert:
+                sign = -sign
+            self.directions[i] = sign if offset > self.threshold else 0
+            if offset <= dead or extent <= dead:
+                self.values[i] = 0
+            else:
+                x = min(1.0, (offset - dead) / (extent - dead))
+                self.values[i] = sign * int(shape(x, self.curve, self.expo) * self.limit + 0.5)
+
+    def calibrate(self, samples=16, delay_ms=2):
+        """搖桿放著不動時呼叫：取中位數當中心，跳動幅度當最小死區
+        中心偏得太離譜時保留原本的中心並回傳 False"""
+        return calibrate((self,), samples, delay_ms)
+
+    def set_center(self, values):
+        """用校準時讀到的一串值設定中心和雜訊（values 會被排序），回傳中心是否合理"""
+        values.sort()
+        center = values[len(values) // 2]
+        ok = abs(center - self.default_center) <= MAX_CENTER_ERROR
+        if ok:
+            self.center = center
+            self.noise = values[-1] - values[0]
+        self.build()
+        return ok
+
+    def calibrate_range(self, duration_ms=3000, delay_ms=5):
+        """在 duration_ms 內把搖桿推到各個方向的盡頭，記錄實際的最小和最大讀值"""
+        low = high = self.adc.read()
+        deadline = time.ticks_add(time.ticks_ms(), duration_ms)
+        while time.ticks_diff(deadline, time.ticks_ms()) > 0:
+            raw = self.adc.read()
+            if raw < low:
+                low = raw
+            if raw > high:
+                high = raw
+            time.sleep_ms(delay_ms)
+        self.set_range(low, high)
+        return low, high
+
+    def set_range(self, low, high):
+        self.low = low
+        self.high = high
+        self.build()
+
+    def lookup(self, raw):
+        """用已經讀到的 ADC 值更新 raw、direction、value，回傳方向"""
+        i = raw >> LUT_SHIFT
+        self.raw = raw
+        self.value = self.values[i]
+        self.direction = self.directions[i]
+        return self.direction
+
+    def poll(self):
+        """讀一次 ADC，回傳方向；不配置記憶體，可以在計時器回調中使用"""
+        return self.lookup(self.adc.read())
+
+    def sample(self, count=5, delay_ms=10):
+        """讀 count 次取中位數（排除極端值），回傳方向"""
+        values = []
+        for _ in range(count):
+            values.append(self.adc.read())
+            time.sleep_ms(delay_ms)
+        values.sort()
+        return self.lookup(values[count // 2])
+
+def calibrate(axes, samples=16, delay_ms=2):
+    """同時校準好幾個軸：每次把每個軸各讀一次，花的時間和只校準一個軸一樣
+    回傳是否全部成功（失敗的軸保留原本的中心）"""
+    readings = [[] for _ in axes]
+    for _ in range(samples):
+        for values, axis in zip(readings, axes):
+            values.append(axis.adc.read())
+        time.sleep_ms(delay_ms)
+    ok = True
+    for values, axis in zip(readings, axes):
+        ok = axis.set_center(values) and ok
+    return ok
+
+class Joystick:
+    """兩軸搖桿，按鈕可有可無（按下時為低電位）；options 會傳給兩個 Axis"""
+    def __init__(self, adc_x, adc_y, button=None, **options):
+        self.x = Axis(adc_x, **options)
+        self.y = Axis(adc_y, **options)
+        self.button = button
+
+    def calibrate(self, samples=16, delay_ms=2):
+        return calibrate((self.x, self.y), samples, delay_ms)
+
+    def read(self):
+        """回傳 (dx, dy)，各為 -1、0 或 1"""
+        return self.x.poll(), self.y.poll()
+
+    def pressed(self):
+        return self.button is not None and not self.button.value()
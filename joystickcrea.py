@@ -1,15 +1,29 @@
+import boottime  # 最先 import，記下程式開始的時間
 from machine import Pin, ADC, I2C, PWM
-from time import sleep
-from ssd1306 import SSD1306_I2C
+from micropython import const
+from time import ticks_ms, ticks_us, ticks_diff, ticks_add
+from display import DiffSSD1306
+import framebuf
+from gomoku_board import BitBoard, ListBoard
+from gomoku_ai import GomokuAI, NO_MOVE
+from joystick import Joystick, calibrate
+from sampler import Sampler
+from button import Button, ButtonQueue, CLICK, LONG_PRESS
+from tone import ToneSequencer, MOVE_MELODY, WIN_MELODY
+from profiler import Profiler
+
+# 用 MicroPython 的 uasyncio（sleep_ms 是它才有的，電腦上用模擬器的 sim/uasyncio.py）
+import uasyncio as asyncio
 
 # 設定 OLED (I2C)
 i2c = I2C(0, scl=Pin(22), sda=Pin(21), freq=400000)
-oled = SSD1306_I2C(128, 64, i2c)
+oled = DiffSSD1306(128, 64, i2c)  # show() 只傳送和上一幀不同的部分
 
 # 設定蜂鳴器
 buzzer = PWM(Pin(16))
 buzzer.freq(1000)  # 設定初始頻率
 buzzer.duty(0)     # 初始靜音
+sound = ToneSequencer(buzzer)  # 音符由 asyncio 任務播放，不會卡住主迴圈
 
 # 設定搖桿輸入
 # 玩家1的搖桿
@@ -33,41 +47,208 @@ CELL_SIZE = 4    # 每個格子4像素
 BOARD_OFFSET_X = 4  # 棋盤左邊距
 BOARD_OFFSET_Y = 4  # 棋盤上邊距
 
+# 棋盤引擎：True 使用位元棋盤，False 使用原本的二維串列
+USE_BITBOARD = True
+
+# 預設是原本的雙人對戰；True 或開機時按住玩家2的按鈕進入單人模式，玩家2由電腦下（使用位元棋盤）
+VS_AI = False
+AI_PLAYER = 2
+AI_BUDGET_MS = 1500  # 每步最多思考時間
+AI_SLICE_MS = 50     # 每次最多連續思考多久就回主迴圈更新畫面
+
+# 繪製設置
+CACHED_RENDER = True  # True: 快取棋盤背景，每幀只重畫有變化的格子
+
 # 搖桿設置
 JOYSTICK_DEAD_ZONE = 300
-JOYSTICK_CENTER = 2048
+JOYSTICK_CENTER = 2048  # 預設中心值，開始時會重新校準
 JOYSTICK_THRESHOLD = 1000
+JOYSTICK_MEDIAN_SIZE = 1  # 中位數窗口長度；1 不濾波，游標跟著搖桿不延遲
+
+# 四個軸由計時器在背景取樣，搖桿讀到的是最新的值
+sampler = Sampler(period_ms=4)
+stick1 = Joystick(sampler.add(vrx1, JOYSTICK_MEDIAN_SIZE), sampler.add(vry1, JOYSTICK_MEDIAN_SIZE),
+                  center=JOYSTICK_CENTER, dead_zone=JOYSTICK_DEAD_ZONE, threshold=JOYSTICK_THRESHOLD)
+stick2 = Joystick(sampler.add(vrx2, JOYSTICK_MEDIAN_SIZE), sampler.add(vry2, JOYSTICK_MEDIAN_SIZE),
+                  center=JOYSTICK_CENTER, dead_zone=JOYSTICK_DEAD_ZONE, threshold=JOYSTICK_THRESHOLD)
+
+# 按鈕用中斷記錄按下和放開，讀取週期之間的短按也不會漏掉
+# 短按落子，長按重新開始
+buttons = ButtonQueue()
+Button(button1, buttons, 1)
+Button(button2, buttons, 2)
+
+# 各任務的更新頻率
+INPUT_PERIOD_MS = 20    # 搖桿和按鈕的讀取週期
+REPEAT_DELAY_MS = 300   # 推住搖桿多久後開始連續移動
+REPEAT_RATE_MS = 100    # 連續移動的間隔
+
+# 分階段計時：改成 const(1) 才會編進去；每 PROFILE_PERIOD_MS 印出一次統計，
+# 單人模式時按玩家2的按鈕切換 OLED 上的統計
+PROFILE = const(0)
+PROFILE_PERIOD_MS = 5000
+P_INPUT = const(0)
+P_AI = const(1)
+P_RENDER = const(2)
+if PROFILE:
+    prof = Profiler(("input", "ai", "render"))
 
 def play_tone(frequency, duration):
-    buzzer.freq(frequency)
-    buzzer.duty(512)  # 50% 音量
-    sleep(duration)
-    buzzer.duty(0)    # 停止發聲
+    # 不會等待：音符排進佇列後立刻返回
+    sound.play(((frequency, int(duration * 1000)),))
 
 def play_move_sound():
-    # 落子音效：上升的音階
-    play_tone(440, 0.05)  # A4
-    play_tone(523, 0.05)  # C5
-    play_tone(659, 0.05)  # E5
+    sound.play(MOVE_MELODY)  # 落子音效
 
 def play_win_sound():
-    # 獲勝音效：歡快的音階
-    play_tone(523, 0.1)  # C5
-    play_tone(659, 0.1)  # E5
-    play_tone(784, 0.1)  # G5
-    play_tone(1047, 0.2) # C6
-    sleep(0.1)
-    play_tone(1047, 0.2) # C6
-    play_tone(1047, 0.2) # C6
+    sound.play(WIN_MELODY)  # 獲勝音效
 
-class Gomoku:
+def make_sprite(rows):
+    # 由字串圖樣建立 5x5 單色精靈，"#" 為亮點
+    sprite = framebuf.FrameBuffer(bytearray(5), 5, 5, framebuf.MONO_HLSB)
+    for y, row in enumerate(rows):
+        for x, c in enumerate(row):
+            if c == "#":
+                sprite.pixel(x, y, 1)
+    return sprite
+
+STONE_SPRITES = (
+    None,
+    make_sprite(("#####", "#####", "#####", "#####", "#####")),  # 黑棋 - 實心方塊
+    make_sprite(("#...#", ".#.#.", "..#..", ".#.#.", "#...#")),  # 白棋 - X形狀
+)
+CURSOR_SPRITE = make_sprite(("#####", "#...#", "#...#", "#...#", "#####"))
+
+class BoardRenderer:
+    """快取棋盤背景，每幀只重畫有變化的格子"""
     def __init__(self):
-        self.board = [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        # 空棋盤只在這裡畫一次
+        self.background = framebuf.FrameBuffer(bytearray(128 * 64 // 8), 128, 64,
+                                               framebuf.MONO_VLSB)
+        for i in range(BOARD_SIZE):
+            self.background.hline(BOARD_OFFSET_X, BOARD_OFFSET_Y + i * CELL_SIZE,
+                                  BOARD_SIZE * CELL_SIZE, 1)
+            self.background.vline(BOARD_OFFSET_X + i * CELL_SIZE, BOARD_OFFSET_Y,
+                                  BOARD_SIZE * CELL_SIZE, 1)
+        # 每格 5x5 的背景圖樣，只有最上排和最左列的格子不同
+        self.patches = {}
+        for left in (True, False):
+            for top in (True, False):
+                patch = make_sprite(())
+                ox, oy = self.cell_origin(0 if left else 1, 0 if top else 1)
+                for py in range(5):
+                    for px in range(5):
+                        patch.pixel(px, py, self.background.pixel(ox + px, oy + py))
+                self.patches[(left, top)] = patch
+        self.reset()
+
+    def reset(self):
+        # 下一次 draw 會整個重畫
+        self.drawn_moves = -1
+        self.drawn_cursor = None
+        self.drawn_status = None
+
+    def cell_origin(self, x, y):
+        # 格子 5x5 區域的左上角
+        return (BOARD_OFFSET_X + x * CELL_SIZE - 2,
+                BOARD_OFFSET_Y + y * CELL_SIZE - 2)
+
+    def draw_stone(self, board, x, y):
+        player = board.get(x, y)
+        if player:
+            ox, oy = self.cell_origin(x, y)
+            oled.blit(STONE_SPRITES[player], ox, oy, 0)
+
+    def restore_cell(self, board, x, y):
+        # 用背景圖樣蓋掉該格，再補回本格和相鄰格的棋子（相鄰格的 5x5 區域重疊一列）
+        ox, oy = self.cell_origin(x, y)
+        oled.blit(self.patches[(x == 0, y == 0)], ox, oy)
+        for ny in range(max(0, y - 1), min(BOARD_SIZE, y + 2)):
+            for nx in range(max(0, x - 1), min(BOARD_SIZE, x + 2)):
+                self.draw_stone(board, nx, ny)
+
+    def draw_status(self, game):
+        oled.fill_rect(80, 0, 48, 8, 0)
+        if not game.game_over:
+            oled.text("P" + str(game.current_player), 100, 0)
+            if game.current_player == 1:
+                oled.fill_rect(90, 0, 3, 3, 1)
+            else:
+                oled.line(90, 0, 92, 2, 1)
+                oled.line(90, 2, 92, 0, 1)
+        elif game.winner:
+            oled.text("P" + str(game.winner) + " Win!", 80, 0)
+        else:
+            oled.text("Draw", 96, 0)
+
+    def draw(self, game):
+        board = game.board
+        moves = game.moves
+        cursor = (game.cursor_x, game.cursor_y)
+        status = (game.current_player, game.game_over, game.winner)
+        changed = False
+        redraw_cursor = False
+
+        if self.drawn_moves < 0 or len(moves) < self.drawn_moves:
+            # 整個重畫：背景一次 blit，再畫上所有棋子
+            oled.blit(self.background, 0, 0)
+            for x, y in moves:
+                self.draw_stone(board, x, y)
+            self.drawn_moves = len(moves)
+            self.drawn_cursor = None
+            self.drawn_status = None
+
+        # 新落下的棋子
+        while self.drawn_moves < len(moves):
+            x, y = moves[self.drawn_moves]
+            self.restore_cell(board, x, y)
+            self.drawn_moves += 1
+            redraw_cursor = True
+
+        # 光標：還原舊位置，畫上新位置
+        if cursor != self.drawn_cursor:
+            if self.drawn_cursor is not None:
+                self.restore_cell(board, *self.drawn_cursor)
+            redraw_cursor = True
+        if redraw_cursor:
+            ox, oy = self.cell_origin(*cursor)
+            oled.blit(CURSOR_SPRITE, ox, oy, 0)
+            self.drawn_cursor = cursor
+            changed = True
+
+        if status != self.drawn_status:
+            self.draw_status(game)
+            self.drawn_status = status
+            changed = True
+
+        # 沒有變化就不必再送一次畫面
+        if changed:
+            oled.show()
+
+renderer = BoardRenderer()
+
+class Gomoku:
+    def __init__(self, vs_ai=False):
+        if USE_BITBOARD or vs_ai:
+            self.board = BitBoard(BOARD_SIZE)
+        else:
+            self.board = ListBoard(BOARD_SIZE)
         self.current_player = 1  # 1代表黑棋，2代表白棋
         self.cursor_x = BOARD_SIZE // 2
         self.cursor_y = BOARD_SIZE // 2
         self.game_over = False
+        self.winner = 0  # 遊戲結束時 0 表示平手
+        self.moves = []  # 落子順序，繪製時用來找出新增的棋子
+
+    def reset(self):
+        # 重新開始：原地清空棋盤，電腦持有的棋盤物件不變
+        self.board.clear()
+        self.current_player = 1
+        self.cursor_x = BOARD_SIZE // 2
+        self.cursor_y = BOARD_SIZE // 2
+        self.game_over = False
         self.winner = 0
+        self.moves = []
 
     def move_cursor(self, dx, dy):
         new_x = self.cursor_x + dx
@@ -77,37 +258,27 @@ class Gomoku:
             self.cursor_y = new_y
 
     def place_stone(self):
-        if self.board[self.cursor_y][self.cursor_x] == 0 and not self.game_over:
-            self.board[self.cursor_y][self.cursor_x] = self.current_player
+        if not self.game_over and self.board.place_stone(self.cursor_x, self.cursor_y,
+                                                         self.current_player):
+            self.moves.append((self.cursor_x, self.cursor_y))
             play_move_sound()  # 播放落子音效
             if self.check_win():
                 self.game_over = True
                 self.winner = self.current_player
                 play_win_sound()  # 播放獲勝音效
+            elif len(self.moves) == BOARD_SIZE * BOARD_SIZE:
+                self.game_over = True  # 下滿了：平手
             else:
                 self.current_player = 3 - self.current_player  # 切換玩家
 
     def check_win(self):
-        directions = [(1,0), (0,1), (1,1), (1,-1)]  # 水平、垂直、對角線
-        for dx, dy in directions:
-            count = 1
-            # 正向檢查
-            x, y = self.cursor_x + dx, self.cursor_y + dy
-            while 0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE and self.board[y][x] == self.current_player:
-                count += 1
-                x += dx
-                y += dy
-            # 反向檢查
-            x, y = self.cursor_x - dx, self.cursor_y - dy
-            while 0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE and self.board[y][x] == self.current_player:
-                count += 1
-                x -= dx
-                y -= dy
-            if count >= 5:
-                return True
-        return False
+        return self.board.check_win(self.cursor_x, self.cursor_y, self.current_player)
 
     def draw_board(self):
+        if CACHED_RENDER:
+            renderer.draw(self)
+            return
+
         oled.fill(0)
         
         # 繪製棋盤
@@ -124,9 +295,10 @@ class Gomoku:
             for x in range(BOARD_SIZE):
                 center_x = BOARD_OFFSET_X + x * CELL_SIZE
                 center_y = BOARD_OFFSET_Y + y * CELL_SIZE
-                if self.board[y][x] == 1:  # 黑棋 - 使用實心圓形
+                stone = self.board.get(x, y)
+                if stone == 1:  # 黑棋 - 使用實心圓形
                     oled.fill_rect(center_x - 2, center_y - 2, 5, 5, 1)
-                elif self.board[y][x] == 2:  # 白棋 - 使用X形狀
+                elif stone == 2:  # 白棋 - 使用X形狀
                     # 繪製X形狀
                     oled.line(center_x - 2, center_y - 2, center_x + 2, center_y + 2, 1)
                     oled.line(center_x - 2, center_y + 2, center_x + 2, center_y - 2, 1)
@@ -147,49 +319,177 @@ class Gomoku:
                 # 白棋提示 - X形狀
                 oled.line(90, 0, 92, 2, 1)
                 oled.line(90, 2, 92, 0, 1)
-        else:
+        elif self.winner:
             oled.text("P" + str(self.winner) + " Win!", 80, 0)
+        else:
+            oled.text("Draw", 96, 0)
 
         oled.show()
 
-def get_joystick_input(adc_x, adc_y):
-    x = adc_x.read()
-    y = adc_y.read()
-    dx = dy = 0
-    
-    if abs(x - JOYSTICK_CENTER) > JOYSTICK_THRESHOLD:
-        dx = 1 if x > JOYSTICK_CENTER else -1
-    if abs(y - JOYSTICK_CENTER) > JOYSTICK_THRESHOLD:
-        dy = 1 if y > JOYSTICK_CENTER else -1
-    
-    return dx, dy
+def get_joystick_input(stick):
+    # 閾值在校準時已算進查找表
+    return stick.x.poll(), stick.y.poll()
 
-def main():
-    game = Gomoku()
-    last_move_time = 0
-    
+def benchmark_draw(frames=100):
+    # 量測每幀 draw_board 的平均耗時（微秒），比較整個重畫和快取繪製
+    global CACHED_RENDER
+    results = {}
+    saved = CACHED_RENDER
+    for cached in (False, True):
+        CACHED_RENDER = cached
+        renderer.reset()
+        game = Gomoku()
+        # 先擺幾顆棋子，模擬對局中途的畫面
+        for i in range(15):
+            game.board.place_stone((i * 4) % BOARD_SIZE, (i * 7) % BOARD_SIZE, 1 + i % 2)
+            game.moves.append(((i * 4) % BOARD_SIZE, (i * 7) % BOARD_SIZE))
+        game.draw_board()
+        start = ticks_us()
+        for i in range(frames):
+            # 光標每 5 幀移動一格，其餘為靜止畫面
+            if i % 5 == 0:
+                game.move_cursor(1 if (i // 5) % 28 < 14 else -1, 0)
+            game.draw_board()
+        results["cached" if cached else "full"] = ticks_diff(ticks_us(), start) // frames
+    CACHED_RENDER = saved
+    renderer.reset()
+    print("draw_board 每幀耗時(us):", results)
+    return results
+
+def ai_turn(game, ai):
+    return ai is not None and game.current_player == AI_PLAYER and not game.game_over
+
+async def input_task(game, ai, redraw):
+    # 固定週期讀取搖桿和處理按鈕事件；推住搖桿時依按住的時間自動連續移動
+    held_dx = held_dy = 0
+    next_repeat = 0
     while True:
+        if PROFILE:
+            t = prof.start()
+        now = ticks_ms()
+        buttons.update(now)
+        event = buttons.get()
+        while event is not None:
+            button_id, kind, _ = event
+            if kind == LONG_PRESS and not ai_turn(game, ai):
+                game.reset()
+                redraw.set()
+            elif PROFILE and kind == CLICK and button_id == AI_PLAYER and ai is not None:
+                if not prof.toggle():
+                    renderer.reset()  # 蓋掉統計
+                redraw.set()
+            elif kind == CLICK and button_id == game.current_player and not ai_turn(game, ai):
+                # 放置棋子：只有輪到的玩家短按才算（長按是重新開始，不會先下一子）
+                game.place_stone()
+                redraw.set()
+            event = buttons.get()
+
+        if ai_turn(game, ai):
+            held_dx = held_dy = 0
+            if PROFILE:
+                prof.stop(P_INPUT, t)
+            await asyncio.sleep_ms(INPUT_PERIOD_MS)
+            continue
+
         # 獲取當前玩家的搖桿輸入
-        if game.current_player == 1:
-            dx, dy = get_joystick_input(vrx1, vry1)
-            button_pressed = not button1.value()
-        else:
-            dx, dy = get_joystick_input(vrx2, vry2)
-            button_pressed = not button2.value()
+        stick = stick1 if game.current_player == 1 else stick2
+        dx, dy = get_joystick_input(stick)
+        boottime.mark(boottime.OUTPUT)
+        boottime.report()  # 只在第一次印出開機時間
 
-        # 移動光標
-        if dx != 0 or dy != 0:
+        # 移動光標：剛推動時立刻移一格，按住超過 REPEAT_DELAY_MS 後連續移動
+        if dx != held_dx or dy != held_dy:
+            held_dx, held_dy = dx, dy
+            if dx != 0 or dy != 0:
+                game.move_cursor(dx, dy)
+                next_repeat = ticks_add(now, REPEAT_DELAY_MS)
+                redraw.set()
+        elif (dx != 0 or dy != 0) and ticks_diff(now, next_repeat) >= 0:
             game.move_cursor(dx, dy)
-            sleep(0.1)  # 防止移動太快
+            next_repeat = ticks_add(now, REPEAT_RATE_MS)
+            redraw.set()
 
-        # 放置棋子
-        if button_pressed:
-            game.place_stone()
-            sleep(0.2)  # 防止重複觸發
+        if PROFILE:
+            prof.stop(P_INPUT, t)
+        await asyncio.sleep_ms(INPUT_PERIOD_MS)
+
+def think(ai):
+    # 想一小段；每一段記成一次 ai 階段
+    if PROFILE:
+        t = prof.start()
+        move = ai.think(AI_SLICE_MS)
+        prof.stop(P_AI, t)
+        return move
+    return ai.think(AI_SLICE_MS)
+
+async def ai_task(game, ai, redraw):
+    # 電腦思考：每次只想一小段時間就讓出，其他任務照常執行
+    while True:
+        if ai_turn(game, ai):
+            ai.start(AI_PLAYER)
+            move = think(ai)
+            while move is None:
+                await asyncio.sleep_ms(0)
+                move = think(ai)
+            if move == NO_MOVE:
+                game.game_over = True  # 沒有地方可下：平手，不再重新思考
+            else:
+                game.cursor_x, game.cursor_y = move
+                game.place_stone()
+            redraw.set()
+        await asyncio.sleep_ms(INPUT_PERIOD_MS)
 
-        # 更新顯示
+async def render_task(game, redraw):
+    # 狀態有變化才重畫，畫面靜止時不佔用 CPU
+    while True:
+        await redraw.wait()
+        redraw.clear()
+        if PROFILE:
+            t = prof.start()
         game.draw_board()
-        sleep(0.05)
+        if PROFILE:
+            prof.stop(P_RENDER, t)
+            if prof.overlay:
+                prof.draw(oled, 0, 8)
+                oled.show()
+                renderer.reset()  # 棋盤被統計蓋住，下一次整個重畫
+
+async def profile_task(redraw):
+    # 定期印出各階段的統計再歸零；OLED 上有統計時每秒更新一次
+    elapsed = 0
+    while True:
+        await asyncio.sleep_ms(1000)
+        if prof.overlay:
+            redraw.set()
+        elapsed += 1000
+        if elapsed >= PROFILE_PERIOD_MS:
+            prof.dump()
+            prof.reset()
+            elapsed = 0
+
+async def run_game():
+    vs_ai = VS_AI or button2.value() == 0  # 開機時按住玩家2的按鈕：和電腦下
+    # 先畫出空棋盤，再開始背景取樣，四個軸一起校準（不要碰搖桿）
+    game = Gomoku(vs_ai)
+    game.draw_board()
+    boottime.mark(boottime.FRAME)
+    sampler.start()
+    calibrate((stick1.x, stick1.y, stick2.x, stick2.y))
+    # 電腦要配置二十幾 KB 的置換表、算 512 個雜湊值，等第一個畫面出來之後才建
+    ai = GomokuAI(game.board, budget_ms=AI_BUDGET_MS) if vs_ai else None
+    boottime.mark(boottime.READY)
+    redraw = asyncio.Event()
+    redraw.set()
+    asyncio.create_task(sound.run())
+    asyncio.create_task(input_task(game, ai, redraw))
+    if ai is not None:
+        asyncio.create_task(ai_task(game, ai, redraw))
+    if PROFILE:
+        asyncio.create_task(profile_task(redraw))
+    await render_task(game, redraw)
+
+def main():
+    asyncio.run(run_game())
 
 if __name__ == "__main__":
-    main() 
+    main()
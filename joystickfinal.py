@@ -1,16 +1,19 @@
-from machine import Pin, ADC, PWM, I2C, SoftI2C
+import boottime  # 最先 import，记下程序开始的时间
+from machine import Pin, ADC, PWM, I2C, SoftI2C, Timer
+from micropython import const
 import time
-from ssd1306 import SSD1306_I2C
-
-# 初始化OLED
-try:
-    # 使用软件I2C，使用不同的引脚
-    i2c = SoftI2C(scl=Pin(22), sda=Pin(21), freq=100000)  # 改用GPIO 22和21
-    oled = SSD1306_I2C(128, 64, i2c)
-    print("OLED初始化成功")
-except Exception as e:
-    print(f"OLED初始化失败: {e}")
-    oled = None
+from display import ThreadedSSD1306
+from motor import Motor
+from joystick import Axis, calibrate
+from sampler import Sampler
+from profiler import Profiler
+import log
+
+# 日志等级：调试时用 log.DEBUG，正式使用改成 log.WARNING 就不会花时间在打印上
+log.set_level(log.INFO)
+
+# OLED 等马达控制开始之后才初始化（open_display），开机时先让马达能动
+oled = None
 
 # 初始化第一组摇杆引脚（控制第一个马达）
 joystick_x = ADC(Pin(34))  # X轴
@@ -43,6 +46,50 @@ for adc in [joystick_x, joystick_y, joystick2_x, joystick2_y]:
 
 # 定义阈值
 THRESHOLD = 500  # 摇杆阈值
+CENTER = 2000    # 摇杆预设中心值，启动时会重新校准
+SPEED_CURVE = "sqrt"  # 速度曲线：sqrt、linear 或 expo
+SLEW = 0         # 每次更新占空比最多变化多少，0 表示不限制
+
+# 更新周期
+CONTROL_PERIOD_MS = 5     # 马达控制（200 Hz）
+SAMPLE_PERIOD_MS = 2      # 摇杆背景采样（500 Hz）
+MEDIAN_SIZE = 1           # 中位数窗口长度，1 表示不滤波（马达要反应快）
+DISPLAY_PERIOD_MS = 200   # OLED 刷新
+REPORT_PERIOD_MS = 5000   # 打印控制频率统计
+
+# OLED 默认用软件I2C；改成 True 用硬件I2C(0)（同样是 GPIO 22和21），
+# 硬件传输时会放开 GIL，背景线程送画面的时间主循环和计时器回调才能继续执行
+HARDWARE_I2C = False
+
+# 分阶段计时：改成 const(1) 才会编进去；打开时 OLED 下方显示统计，并和控制频率一起打印
+PROFILE = const(0)
+P_CTRL = const(0)
+P_DISP = const(1)
+if PROFILE:
+    prof = Profiler(("ctrl", "disp"))
+    prof.overlay = True
+
+# 马达通道（L298N）：方向引脚、PWM 使能引脚
+motors = [
+    Motor(IN1, IN2, ENA, center=CENTER, threshold=THRESHOLD, curve=SPEED_CURVE, slew=SLEW),
+    Motor(IN3, IN4, ENB, center=CENTER, threshold=THRESHOLD, curve=SPEED_CURVE, slew=SLEW),
+]
+
+def open_display():
+    """初始化OLED，失败时 oled 保持 None（没有屏幕也能控制马达）"""
+    global oled
+    try:
+        if HARDWARE_I2C:
+            i2c = I2C(0, scl=Pin(22), sda=Pin(21), freq=100000)
+        else:
+            # 使用软件I2C，使用不同的引脚
+            i2c = SoftI2C(scl=Pin(22), sda=Pin(21), freq=100000)  # 改用GPIO 22和21
+        # show() 只复制画面就返回，由背景线程传送变化的部分；来不及送的旧画面直接丢掉
+        oled = ThreadedSSD1306(128, 64, i2c)
+        log.info("OLED初始化成功")
+    except Exception as e:
+        log.error("OLED初始化失败: {}", e)
+        oled = None
 
 def update_display(motor1_speed, motor1_direction, motor2_speed, motor2_direction):
     """更新OLED显示"""
@@ -55,146 +102,140 @@ def update_display(motor1_speed, motor1_direction, motor2_speed, motor2_directio
         oled.text(f"{motor1_direction}", 0, 30)
         oled.text(f"M2:{motor2_speed}", 0, 40)
         oled.text(f"{motor2_direction}", 0, 50)
+        if PROFILE:
+            prof.draw(oled, 0, 40)  # 盖住马达2的那两行
         oled.show()
-        print("OLED显示已更新")
+        log.debug("OLED显示已更新")
     except Exception as e:
-        print(f"OLED显示更新失败: {e}")
-
-def read_joystick():
-    """读取第一个摇杆值"""
-    y = joystick_y.read()
-    print(f"马达1摇杆值: Y={y}")
-    return y
-
-def read_joystick2():
-    """读取第二个摇杆值"""
-    y = joystick2_y.read()
-    print(f"马达2摇杆值: Y={y}")
-    return y
-
-def stop_motor1():
-    """停止第一个马达"""
-    print("停止马达1")
-    ENA.duty(0)  # 关闭PWM输出
-    IN1.value(0)
-    IN2.value(0)
-
-def stop_motor2():
-    """停止第二个马达"""
-    print("停止马达2")
-    ENB.duty(0)  # 关闭PWM输出
-    IN3.value(0)
-    IN4.value(0)
-
-def control_motor1(y):
-    """控制第一个马达"""
-    if y < 2000 - THRESHOLD:  # 上
-        # 计算速度
-        y = max(0, min(y, 2000))
-        speed = int(((2000 - y) / 2000) ** 0.5 * 1023)
-        speed = max(0, min(speed, 1023))
-        print(f"马达1速度: {speed}")
-        
-        # 设置马达方向 - 正转
-        IN1.value(1)
-        IN2.value(0)
-        
-        # 设置PWM占空比
-        ENA.duty(speed)
-        return speed, "FORWARD"
-    elif y > 2000 + THRESHOLD:  # 下
-        # 计算速度
-        y = max(2000, min(y, 4000))
-        speed = int(((y - 2000) / 2000) ** 0.5 * 1023)
-        speed = max(0, min(speed, 1023))
-        print(f"马达1速度: {speed}")
-        
-        # 设置马达方向 - 反转
-        IN1.value(0)
-        IN2.value(1)
-        
-        # 设置PWM占空比
-        ENA.duty(speed)
-        return speed, "REVERSE"
-    else:
-        stop_motor1()
-        return 0, "STOP"
-
-def control_motor2(y):
-    """控制第二个马达"""
-    if y < 2000 - THRESHOLD:  # 上
-        # 计算速度
-        y = max(0, min(y, 2000))
-        speed = int(((2000 - y) / 2000) ** 0.5 * 1023)
-        speed = max(0, min(speed, 1023))
-        print(f"马达2速度: {speed}")
-        
-        # 设置马达方向 - 正转
-        IN3.value(1)
-        IN4.value(0)
-        
-        # 设置PWM占空比
-        ENB.duty(speed)
-        return speed, "FORWARD"
-    elif y > 2000 + THRESHOLD:  # 下
-        # 计算速度
-        y = max(2000, min(y, 4000))
-        speed = int(((y - 2000) / 2000) ** 0.5 * 1023)
-        speed = max(0, min(speed, 1023))
-        print(f"马达2速度: {speed}")
-        
-        # 设置马达方向 - 反转
-        IN3.value(0)
-        IN4.value(1)
-        
-        # 设置PWM占空比
-        ENB.duty(speed)
-        return speed, "REVERSE"
-    else:
-        stop_motor2()
-        return 0, "STOP"
+        log.error("OLED显示更新失败: {}", e)
+
+class LoopStats:
+    """统计控制回调的实际周期（频率）和抖动"""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.last = 0
+        self.count = 0
+        self.total = 0
+        self.min = 1 << 29
+        self.max = 0
+
+    def tick(self, now):
+        if self.count:
+            period = time.ticks_diff(now, self.last)
+            self.total += period
+            if period < self.min:
+                self.min = period
+            if period > self.max:
+                self.max = period
+        self.count += 1
+        self.last = now
+
+    def report(self):
+        if self.count < 2:
+            return
+        avg = self.total // (self.count - 1)
+        log.info("控制频率: {} Hz, 周期 {} us, 抖动 {}/+{} us",
+                 1000000 // avg, avg, self.min - avg, self.max - avg)
+
+# 两个 Y 轴由另一个计时器在背景采样，控制计时器读到的是最新的值
+sampler = Sampler(period_ms=SAMPLE_PERIOD_MS, timer_id=1)
+stick_y = sampler.add(joystick_y, MEDIAN_SIZE)
+stick2_y = sampler.add(joystick2_y, MEDIAN_SIZE)
+
+# 控制马达的两个 Y 轴，只用来在启动时校准中心值
+axes = [
+    Axis(stick_y, center=CENTER, threshold=THRESHOLD),
+    Axis(stick2_y, center=CENTER, threshold=THRESHOLD),
+]
+
+control_stats = LoopStats()
+
+def calibrate_joysticks():
+    """校准摇杆中心，让马达以实际的静止位置为零点（校准时不要碰摇杆）；两个轴一起取样"""
+    if not calibrate(axes):
+        log.warning("摇杆校准失败，使用预设中心值 {}", CENTER)
+    for i, (axis, motor) in enumerate(zip(axes, motors)):
+        motor.center = axis.center
+        # 读值跳动比阈值还大时放宽阈值，避免漂移造成马达误动
+        motor.threshold = max(THRESHOLD, axis.noise)
+        log.info("摇杆{}中心: {}", i + 1, axis.center)
+
+def stop_motors():
+    """停止所有马达"""
+    for i, motor in enumerate(motors):
+        log.debug("停止马达{}", i + 1)
+        motor.stop()
+
+def control_tick(timer):
+    """计时器回调：读取摇杆并更新马达（不打印、不配置内存）"""
+    now = time.ticks_us()
+    control_stats.tick(now)
+    motors[0].update(stick_y.read())
+    motors[1].update(stick2_y.read())
+    boottime.mark(boottime.OUTPUT)
+    if PROFILE:
+        prof.stop(P_CTRL, now)
 
 def main():
-    print("开始运行摇杆控制程序...")
-    print("使用L298N马达驱动模块")
-    print("马达1控制：使用第一个摇杆Y轴")
-    print("马达2控制：使用第二个摇杆Y轴")
-    print(f"摇杆阈值: {THRESHOLD}")
-    print("向上移动摇杆：正转")
-    print("向下移动摇杆：反转")
-    
-    # 显示初始信息
-    if oled is not None:
-        try:
-            oled.fill(0)
-            oled.text("Dual Motor", 0, 0)
-            oled.text("Control Ready", 0, 20)
-            oled.show()
-        except Exception as e:
-            print(f"OLED显示初始化失败: {e}")
-    time.sleep(2)
+    log.info("开始运行摇杆控制程序...")
+    log.info("使用L298N马达驱动模块")
+    log.info("马达1控制：使用第一个摇杆Y轴")
+    log.info("马达2控制：使用第二个摇杆Y轴")
+    log.info("摇杆阈值: {}", THRESHOLD)
+    log.info("向上移动摇杆：正转")
+    log.info("向下移动摇杆：反转")
     
     # 确保初始状态为停止
-    stop_motor1()
-    stop_motor2()
+    stop_motors()
+    
+    # 开机顺序以马达能动为先：校准后立刻开始控制，OLED 之后才初始化，不再显示 2 秒的开机画面
+    sampler.start()
+    calibrate_joysticks()
     
+    # 摇杆和马达由计时器以固定周期更新，显示在主循环中以较低频率刷新
+    # 注意：ESP32 的计时器回调是软中断；软件I2C 传送画面时回调会被延后，HARDWARE_I2C 则不会
+    control_timer = Timer(0)
+    control_timer.init(period=CONTROL_PERIOD_MS, mode=Timer.PERIODIC, callback=control_tick)
+    open_display()
+    boottime.mark(boottime.READY)
+
+    shown = None
+    last_report = time.ticks_ms()
     while True:
         try:
-            # 读取两个摇杆的Y值
-            motor1_y = read_joystick()
-            motor2_y = read_joystick2()
-            
-            # 控制两个马达
-            motor1_speed, motor1_dir = control_motor1(motor1_y)
-            motor2_speed, motor2_dir = control_motor2(motor2_y)
-            
-            # 更新显示
-            update_display(motor1_speed, motor1_dir, motor2_speed, motor2_dir)
-            
-            # 短暂延时
-            time.sleep(0.1)
+            # 速度和方向没有变化就不刷新显示
+            state = (motors[0].speed, motors[0].direction, motors[1].speed, motors[1].direction)
+            if state != shown or PROFILE:
+                if PROFILE:
+                    t = prof.start()
+                update_display(*state)
+                shown = state
+                if oled is not None:
+                    boottime.mark(boottime.FRAME)
+                if PROFILE:
+                    prof.stop(P_DISP, t)
+
+            boottime.report()  # 只在第一次打印开机时间
+
+            # 定期打印控制频率和抖动
+            now = time.ticks_ms()
+            if time.ticks_diff(now, last_report) >= REPORT_PERIOD_MS:
+                control_stats.report()
+                control_stats.reset()
+                log.info("摇杆采样占用 CPU {}‰", sampler.load())
+                if PROFILE:
+                    prof.dump()
+                    prof.reset()
+                if oled is not None:
+                    log.info("OLED: {} 帧, 平均每帧 {} bytes, 丢弃 {} 帧",
+                             oled.frames, oled.bytes_per_frame(), oled.dropped)
+                last_report = now
+
+            time.sleep_ms(DISPLAY_PERIOD_MS)
         except Exception as e:
-            print(f"运行错误: {e}")
+            log.exception(e, "运行错误")
             time.sleep(1)
 
 if __name__ == "__main__":
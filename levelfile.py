@@ -0,0 +1,204 @@
+# 讀取馬里奧的關卡檔（levels.bin，由 python -m tools.levels build 從 levels.txt 產生）
+# 關卡可以有很多個畫面寬，依 x 切成每 SEGMENT_WIDTH 一段，只載入鏡頭附近的段落。
+# 格式（little-endian）：
+#   檔頭      "MLV\x03"、關卡數 u16、每段最多平台數 u16、每段最多金幣數 u16、
+#             最大段落資料 u16、每關最多金幣數 u16、每關最多敵人數 u16
+#   關卡索引  每關一筆 (位移 u32, 大小 u16)，指到關卡檔頭
+#   關卡檔頭  寬度 u16、段落數 u16、金幣總數 u16、敵人數 u16，
+#             後面接段落索引 (位移 u32, 大小 u16)，再接每個敵人
+#             (種類 u8, x u16, y u8, 速度 i8, 巡邏範圍 lo u16, hi u16)
+#   段落      第一個金幣的編號 u16、平台數 u16、金幣數 u16，
+#             接著每個平台 (x u16, y u8, 寬 u8)，每個金幣 (x u16, y u8)；x 是關卡中的位置
+# 平台依左邊的 x 分段，寬度不超過 SEGMENT_WIDTH，所以鏡頭左邊再往前一段就涵蓋所有看得到的平台。
+# 敵人會走動，不分段：開關卡時全部載入 entities.Entities（依檔頭的最大數量預先配置）。
+# 開檔時依檔頭的最大值配置 SLOTS 段的物件、讀取緩衝區和空間索引，之後重複使用；
+# 每關只多一個記錄金幣是否收集的位元組陣列（一個金幣 1 bit），
+# 所以開機時間和記憶體不隨關卡數和關卡長度增加
+import struct
+from mario import Platform, Coin, Level, Grid, SCREEN_WIDTH, SCREEN_HEIGHT
+from entities import Entities
+
+MAGIC = b"MLV\x03"
+HEADER = "<4sHHHHHH"
+HEADER_SIZE = 16
+INDEX = "<IH"
+INDEX_SIZE = 6
+LEVEL = "<HHHH"
+LEVEL_SIZE = 8
+ENTITY = "<BHBbHH"
+ENTITY_SIZE = 9
+SEGMENT = "<HHH"
+SEGMENT_SIZE = 6
+PLATFORM = "<HBB"
+PLATFORM_SIZE = 4
+COIN = "<HB"
+COIN_SIZE = 3
+
+SEGMENT_WIDTH = 128
+SLOTS = 3  # 同時在記憶體裡的段落數：鏡頭左邊前一段加上畫面最多跨到的兩段
+
+class Segment:
+    """一個段落的物件（重複使用）"""
+    def __init__(self, max_platforms, max_coins):
+        self.number = -1  # 載入的段落編號，-1 表示空的
+        self.first_coin = 0
+        self.platforms = [Platform(0, 0, 0) for _ in range(max_platforms)]
+        self.coins = [Coin(0, 0) for _ in range(max_coins)]
+        self.n_platforms = 0
+        self.n_coins = 0
+
+class StreamLevel(Level):
+    """只把鏡頭附近的段落放在記憶體和空間索引裡的關卡；
+    碰撞、收集金幣和 visible() 的用法和 Level 相同，每幀用 follow() 告訴它鏡頭的位置"""
+    def __init__(self, path, max_platforms, max_coins, max_size, max_level_coins, max_entities):
+        self.path = path
+        self.width = SCREEN_WIDTH
+        self.height = SCREEN_HEIGHT
+        # 水平循環的索引只要涵蓋同時載入的段落
+        self.solid = Grid(SLOTS * SEGMENT_WIDTH, SCREEN_HEIGHT, wrap=True)
+        self.pickups = Grid(SLOTS * SEGMENT_WIDTH, SCREEN_HEIGHT, wrap=True)
+        self.slots = [Segment(max_platforms, max_coins) for _ in range(SLOTS)]
+        self.buffer = bytearray(max(max_size, INDEX_SIZE, LEVEL_SIZE))
+        self.collected = bytearray((max_level_coins + 7) // 8)
+        self.entities = Entities(max_entities)
+        self.offset = 0
+        self.segments = 0
+        self.coins_total = 0
+        self.remaining = 0
+        self.first = self.last = -1  # 目前載入的段落範圍
+        self.loads = 0  # 讀檔載入段落的次數
+
+    def _read(self, f, position):
+        # 讀 position 的索引指到的資料到 buffer
+        buf = self.buffer
+        view = memoryview(buf)
+        f.seek(position)
+        f.readinto(view[:INDEX_SIZE])
+        offset, size = struct.unpack_from(INDEX, buf)
+        if size > len(buf):
+            raise ValueError("關卡檔損壞")
+        f.seek(offset)
+        if f.readinto(view[:size]) != size:
+            raise ValueError("關卡檔損壞")
+        return offset
+
+    def open(self, f, position):
+        """換成 position 的索引指到的那一關，從頭開始"""
+        self.offset = self._read(f, position)
+        buf = self.buffer
+        self.width, self.segments, self.coins_total, count = struct.unpack_from(LEVEL, buf)
+        if (self.coins_total + 7) // 8 > len(self.collected) or count > self.entities.capacity:
+            raise ValueError("關卡檔損壞")
+        entities = self.entities
+        entities.clear()
+        pos = LEVEL_SIZE + self.segments * INDEX_SIZE
+        for _ in range(count):
+            kind, x, y, speed, lo, hi = struct.unpack_from(ENTITY, buf, pos)
+            entities.spawn(kind, x, y, speed, lo, hi)
+            pos += ENTITY_SIZE
+        for i in range(len(self.collected)):
+            self.collected[i] = 0
+        for slot in self.slots:
+            slot.number = -1
+        self.solid.clear()
+        self.pickups.clear()
+        self.remaining = self.coins_total
+        self.first = self.last = -1
+        self.follow(0)
+
+    def follow(self, x):
+        """鏡頭移到 x：載入看得到的段落（和左邊一段），卸下其他的；段落沒變時幾乎不花時間"""
+        first = (x - SEGMENT_WIDTH) // SEGMENT_WIDTH
+        last = (x + SCREEN_WIDTH - 1) // SEGMENT_WIDTH
+        if first < 0:
+            first = 0
+        if last >= self.segments:
+            last = self.segments - 1
+        if first == self.first and last == self.last:
+            return
+        for slot in self.slots:
+            if slot.number >= 0 and not first <= slot.number <= last:
+                self._unload(slot)
+        f = None
+        try:
+            for number in range(first, last + 1):
+                if any(slot.number == number for slot in self.slots):
+                    continue
+                if f is None:
+                    f = open(self.path, "rb")
+                for slot in self.slots:
+                    if slot.number < 0:
+                        self._load(f, slot, number)
+                        break
+        finally:
+            if f is not None:
+                f.close()
+        self.first = first
+        self.last = last
+
+    def active(self):
+        # 第 n 段的 x 上方可能有第 n-1 段的平台，所以最左邊載入的那一段不算（除非是第 0 段）
+        first = self.first + 1 if self.first > 0 else 0
+        return first * SEGMENT_WIDTH, (self.last + 1) * SEGMENT_WIDTH
+
+    def _load(self, f, slot, number):
+        self._read(f, self.offset + LEVEL_SIZE + number * INDEX_SIZE)
+        buf = self.buffer
+        first_coin, n_platforms, n_coins = struct.unpack_from(SEGMENT, buf)
+        if n_platforms > len(slot.platforms) or n_coins > len(slot.coins):
+            raise ValueError("關卡檔損壞")
+        pos = SEGMENT_SIZE
+        for i in range(n_platforms):
+            platform = slot.platforms[i]
+            platform.x, platform.y, platform.width = struct.unpack_from(PLATFORM, buf, pos)
+            self.solid.insert(platform)
+            pos += PLATFORM_SIZE
+        collected = self.collected
+        for i in range(n_coins):
+            coin = slot.coins[i]
+            coin.x, coin.y = struct.unpack_from(COIN, buf, pos)
+            n = first_coin + i
+            coin.number = n
+            coin.collected = bool(collected[n >> 3] & (1 << (n & 7)))
+            if not coin.collected:
+                self.pickups.insert(coin)
+            pos += COIN_SIZE
+        slot.number = number
+        slot.first_coin = first_coin
+        slot.n_platforms = n_platforms
+        slot.n_coins = n_coins
+        self.loads += 1
+
+    def collected_coin(self, coin):
+        # 收集到就記到位元組陣列，下次載入這一段時不會再出現
+        n = coin.number
+        self.collected[n >> 3] |= 1 << (n & 7)
+
+    def _unload(self, slot):
+        for i in range(slot.n_platforms):
+            self.solid.remove(slot.platforms[i])
+        for i in range(slot.n_coins):
+            coin = slot.coins[i]
+            if not coin.collected:
+                self.pickups.remove(coin)
+        slot.number = -1
+
+class LevelFile:
+    def __init__(self, path="levels.bin"):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[:4] != MAGIC:
+            raise ValueError("不是關卡檔: " + path)
+        (_, self.count, max_platforms, max_coins, max_size, max_level_coins,
+         max_entities) = struct.unpack(HEADER, header)
+        self.level = StreamLevel(path, max_platforms, max_coins, max_size, max_level_coins,
+                                 max_entities)
+
+    def load(self, number):
+        """載入第 number 關（從 1 開始），回傳 StreamLevel；每次都是同一個物件"""
+        if not 1 <= number <= self.count:
+            raise IndexError("沒有第 %d 關" % number)
+        with open(self.path, "rb") as f:
+            self.level.open(f, HEADER_SIZE + (number - 1) * INDEX_SIZE)
+        return self.level
@@ -0,0 +1,97 @@
+# 輕量的分級日誌
+# - 低於 level 的訊息在函式一開頭就返回，幾乎沒有成本
+# - 格式化延後：只有真的要印出或 dump 時才把參數代入 fmt（str.format 格式）
+# - 最近的訊息存在 RAM 的環形緩衝區，可以隨時 dump() 或在出錯時自動印出
+from array import array
+from compat import ticks_ms
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+NAMES = {DEBUG: "D", INFO: "I", WARNING: "W", ERROR: "E"}
+
+SIZE = 32  # 環形緩衝區大小
+
+_level = INFO  # 低於這個等級的訊息直接丟掉
+_echo = INFO   # 至少這個等級的訊息立刻印到序列埠
+_times = array('l', [0] * SIZE)
+_levels = bytearray(SIZE)
+_fmts = [None] * SIZE
+_args = [None] * SIZE
+_next = 0
+_count = 0
+
+def set_level(level, echo=None):
+    """設定記錄等級；echo 為立即印出的等級，預設和 level 相同"""
+    global _level, _echo
+    _level = level
+    _echo = level if echo is None else echo
+
+def enabled(level):
+    # 熱迴圈中可先用這個判斷，連參數都不用準備
+    return level >= _level
+
+def _format(fmt, args):
+    try:
+        return fmt.format(*args) if args else fmt
+    except Exception:
+        return fmt + " " + repr(args)
+
+def _emit(i):
+    print("[{} {}] {}".format(_times[i], NAMES.get(_levels[i], "?"),
+                              _format(_fmts[i], _args[i])))
+
+def log(level, fmt, *args):
+    global _next, _count
+    if level < _level:
+        return
+    i = _next
+    _times[i] = ticks_ms() & 0x3FFFFFFF
+    _levels[i] = level
+    _fmts[i] = fmt
+    _args[i] = args
+    _next = (i + 1) % SIZE
+    if _count < SIZE:
+        _count += 1
+    if level >= _echo:
+        _emit(i)
+
+def debug(fmt, *args):
+    if DEBUG >= _level:
+        log(DEBUG, fmt, *args)
+
+def info(fmt, *args):
+    if INFO >= _level:
+        log(INFO, fmt, *args)
+
+def warning(fmt, *args):
+    if WARNING >= _level:
+        log(WARNING, fmt, *args)
+
+def error(fmt, *args):
+    if ERROR >= _level:
+        log(ERROR, fmt, *args)
+
+def exception(e, fmt="錯誤", *args):
+    """記錄錯誤，並把緩衝區裡出錯前的訊息一起印出"""
+    log(ERROR, fmt + ": {}", *(args + (e,)))
+    dump()
+
+def dump():
+    """依時間順序印出緩衝區裡的訊息"""
+    print("---- log dump ({} 筆) ----".format(_count))
+    start = (_next - _count) % SIZE
+    for k in range(_count):
+        _emit((start + k) % SIZE)
+    print("---- end ----")
+
+def clear():
+    global _next, _count
+    _next = 0
+    _count = 0
+    for i in range(SIZE):
+        _fmts[i] = None
+        _args[i] = None
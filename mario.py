@@ -0,0 +1,258 @@
+# 馬里奧遊戲的邏輯（物件、物理和碰撞），不含畫面和輸入，板子上和電腦上都能用
+# 碰撞用均勻格子的空間索引：關卡建立時把平台和金幣登記到它們覆蓋的格子，
+# 每一步只檢查馬里奧附近格子裡的物件，關卡物件再多每一步的成本也差不多
+# 關卡可以比畫面寬，Camera 跟著馬里奧水平捲動，畫面只畫鏡頭範圍內的物件
+# 所有座標都是整數；馬里奧的垂直位置和速度用定點數（乘上 FP_ONE）計算，
+# MicroPython 上每個浮點運算結果都要配置記憶體，整數（小於 2**30）不用
+from compat import ticks_ms
+
+# 遊戲常量
+SCREEN_WIDTH = 128
+SCREEN_HEIGHT = 64
+GROUND_HEIGHT = 50
+MARIO_WIDTH = 8
+MARIO_HEIGHT = 8
+STEP_MS = 20  # 物理每一步的時間；GRAVITY、JUMP_FORCE、MOVE_SPEED 都是每一步的量
+FP_SHIFT = 4  # 定點數的小數位元數：1 像素 = 16 單位
+FP_ONE = 1 << FP_SHIFT
+GRAVITY = FP_ONE // 2   # 0.5 像素/步²（定點數）
+JUMP_FORCE = -6 * FP_ONE  # -6 像素/步（定點數）
+MOVE_SPEED = 2
+PLATFORM_HEIGHT = 4
+COIN_SIZE = 4
+CELL_SIZE = 16  # 空間索引每一格的邊長（像素）
+
+class GameObject:
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.stamp = 0  # Grid.query 用來去掉重複的物件
+
+    def collides_with(self, other):
+        return (self.x < other.x + other.width and
+                self.x + self.width > other.x and
+                self.y < other.y + other.height and
+                self.y + self.height > other.y)
+
+def to_pixel(value):
+    """定點數轉成像素，和 int() 一樣往 0 取整"""
+    return value >> FP_SHIFT if value >= 0 else -(-value >> FP_SHIFT)
+
+class Mario(GameObject):
+    # y 是給碰撞索引和畫面用的整數像素，fy 和 vy 是定點數
+    def __init__(self):
+        super().__init__(20, GROUND_HEIGHT - MARIO_HEIGHT, MARIO_WIDTH, MARIO_HEIGHT)
+        self.fy = self.y << FP_SHIFT
+        self.vy = 0
+        self.is_jumping = False
+        self.facing_right = True
+        self.score = 0
+        self.current_level = 1
+        self.last_jump_time = 0  # 添加跳躍冷卻時間記錄
+
+    def reset_position(self):
+        self.x = 20
+        self.y = GROUND_HEIGHT - MARIO_HEIGHT
+        self.fy = self.y << FP_SHIFT
+        self.vy = 0
+        self.is_jumping = False
+
+    def collides_with(self, other):
+        # 垂直方向用定點數比較，結果和用小數座標時一樣
+        return (self.x < other.x + other.width and
+                self.x + self.width > other.x and
+                self.fy < (other.y + other.height) << FP_SHIFT and
+                self.fy + (self.height << FP_SHIFT) > other.y << FP_SHIFT)
+
+    def update(self, level):
+        # 重力
+        self.vy += GRAVITY
+        fy = self.fy
+        new_y = fy + self.vy
+        height = self.height << FP_SHIFT
+
+        # 地面碰撞檢測
+        if new_y > (GROUND_HEIGHT - self.height) << FP_SHIFT:
+            new_y = (GROUND_HEIGHT - self.height) << FP_SHIFT
+            self.vy = 0
+            self.is_jumping = False
+
+        # 平台碰撞檢測：只看這一步掃過的範圍（原位置到新位置）附近的平台
+        top = (fy if fy < new_y else new_y) >> FP_SHIFT
+        sweep = (abs(new_y - fy) >> FP_SHIFT) + self.height + 1
+        for platform in level.solid.query(self.x, top, self.width, sweep):
+            if (self.x + self.width > platform.x and
+                self.x < platform.x + platform.width):
+                py = platform.y << FP_SHIFT
+                bottom = (platform.y + platform.height) << FP_SHIFT
+                # 從上方碰撞
+                if fy + height <= py and new_y + height > py:
+                    new_y = py - height
+                    self.vy = 0
+                    self.is_jumping = False
+                # 從下方碰撞
+                elif fy >= bottom and new_y < bottom:
+                    new_y = bottom
+                    self.vy = 0
+
+        self.fy = new_y
+        self.y = to_pixel(new_y)
+
+    def jump(self, now=None):
+        """now 是毫秒；沒給就用 ticks_ms()（world.World 用步數換算，重播時結果才會一樣）"""
+        current_time = ticks_ms() if now is None else now
+        # 添加跳躍冷卻時間（250毫秒）
+        if not self.is_jumping and current_time - self.last_jump_time > 250:
+            self.vy = JUMP_FORCE
+            self.is_jumping = True
+            self.last_jump_time = current_time
+
+    def move(self, direction, world_width=SCREEN_WIDTH):
+        new_x = self.x + direction * MOVE_SPEED
+        if 0 <= new_x <= world_width - self.width:
+            self.x = new_x
+        self.facing_right = direction > 0 if direction != 0 else self.facing_right
+
+class Platform(GameObject):
+    def __init__(self, x, y, width):
+        super().__init__(x, y, width, PLATFORM_HEIGHT)
+
+class Coin(GameObject):
+    def __init__(self, x, y):
+        super().__init__(x, y, COIN_SIZE, COIN_SIZE)
+        self.collected = False
+        self.number = 0  # 在關卡中的編號
+
+class Grid:
+    """均勻格子空間索引；超出範圍的座標算進最邊緣的格子
+    wrap=True 時水平方向循環（x 除以寬度取餘數），只要同時登記的物件都在
+    width 範圍內，就能用固定大小的格子索引任意寬的關卡"""
+    def __init__(self, width, height, cell=CELL_SIZE, wrap=False):
+        self.cell = cell
+        self.wrap = wrap
+        self.cols = max(1, (width + cell - 1) // cell)
+        self.rows = max(1, (height + cell - 1) // cell)
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+        self.stamp = 0
+        self.found = []  # query 的結果，每次查詢重複使用
+
+    def _span(self, start, size, count, wrap=False):
+        # 座標範圍 start~start+size 覆蓋的第一格和最後一格
+        first = start // self.cell
+        last = (start + size) // self.cell
+        if wrap:
+            if last - first >= count:
+                last = first + count - 1
+            return first, last
+        if first < 0:
+            first = 0
+        if last >= count:
+            last = count - 1
+        return first, last
+
+    def _cells(self, x, y, width, height):
+        cols = self.cols
+        c0, c1 = self._span(x, width, cols, self.wrap)
+        r0, r1 = self._span(y, height, self.rows)
+        cells = self.cells
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                yield cells[row * cols + col % cols]
+
+    def clear(self):
+        for cell in self.cells:
+            cell.clear()
+
+    def insert(self, obj):
+        for cell in self._cells(obj.x, obj.y, obj.width, obj.height):
+            cell.append(obj)
+
+    def remove(self, obj):
+        for cell in self._cells(obj.x, obj.y, obj.width, obj.height):
+            if obj in cell:
+                cell.remove(obj)
+
+    def query(self, x, y, width, height):
+        """和矩形重疊的格子裡的物件（不一定和矩形本身重疊）；
+        回傳的 list 下一次查詢會被覆蓋"""
+        self.stamp += 1
+        stamp = self.stamp
+        found = self.found
+        found.clear()
+        cols = self.cols
+        c0, c1 = self._span(x, width, cols, self.wrap)
+        r0, r1 = self._span(y, height, self.rows)
+        cells = self.cells
+        for row in range(r0, r1 + 1):
+            base = row * cols
+            for col in range(c0, c1 + 1):
+                for obj in cells[base + col % cols]:
+                    if obj.stamp != stamp:
+                        obj.stamp = stamp
+                        found.append(obj)
+        return found
+
+class Level:
+    """一關的平台和金幣，各有一個空間索引，並記錄還沒收集的金幣數"""
+    def __init__(self, platforms, coins, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, index=Grid):
+        self.platforms = platforms
+        self.coins = coins
+        self.width = width
+        self.height = height
+        self.solid = index(width, height)
+        self.pickups = index(width, height)
+        for platform in platforms:
+            self.solid.insert(platform)
+        self.remaining = 0
+        for coin in coins:
+            if not coin.collected:
+                self.pickups.insert(coin)
+                self.remaining += 1
+
+    def collect(self, mario):
+        """收集和馬里奧重疊的金幣，回傳這次收集的數量"""
+        count = 0
+        for coin in self.pickups.query(mario.x, mario.y, mario.width, mario.height):
+            if mario.collides_with(coin):
+                coin.collected = True
+                self.pickups.remove(coin)
+                self.collected_coin(coin)
+                count += 1
+        self.remaining -= count
+        return count
+
+    def collected_coin(self, coin):
+        """collect() 收集到 coin 之後呼叫（見 levelfile.StreamLevel）"""
+
+    def complete(self):
+        return self.remaining == 0
+
+    def follow(self, x):
+        """鏡頭移到 x；整關都在記憶體裡時不用做什麼（見 levelfile.StreamLevel）"""
+
+    def active(self):
+        """(左, 右)：這個範圍內的平台都在空間索引裡，會動的物件只在這裡面更新"""
+        return 0, self.width
+
+    def visible(self, x, width):
+        """鏡頭範圍 x~x+width 附近的 (平台, 金幣)，只是候選，畫的時候超出畫面的部分會被裁掉；
+        回傳的 list 下一次查詢會被覆蓋"""
+        return (self.solid.query(x, 0, width, self.height),
+                self.pickups.query(x, 0, width, self.height))
+
+class Camera:
+    """水平捲動的鏡頭：x 是畫面左邊在關卡中的位置，讓馬里奧保持在畫面中間"""
+    def __init__(self, width=SCREEN_WIDTH):
+        self.width = width
+        self.x = 0
+
+    def follow(self, mario, level_width):
+        x = mario.x + mario.width // 2 - self.width // 2
+        if x > level_width - self.width:
+            x = level_width - self.width
+        if x < 0:
+            x = 0
+        self.x = x
+        return x
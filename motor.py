@@ -0,0 +1,113 @@
+# L298N 类马达驱动
+# 摇杆 ADC 值通过预先计算的整数查找表转换成占空比，只有目标改变时才写引脚和 PWM
+from array import array
+
+FORWARD = "FORWARD"
+REVERSE = "REVERSE"
+STOP = "STOP"
+
+LUT_SHIFT = 3  # 查找表每格代表 8 个 ADC 单位
+
+def build_curve(curve="sqrt", span=2000, max_duty=1023, expo=0.5):
+    """预先计算 偏移量 -> 占空比 的查找表（只在初始化时用浮点运算）"""
+    size = (span >> LUT_SHIFT) + 1
+    table = array('H', [0] * size)
+    for i in range(size):
+        x = min(1.0, (i << LUT_SHIFT) / span)
+        if curve == "sqrt":
+            y = x ** 0.5
+        elif curve == "linear":
+            y = x
+        elif curve == "expo":
+            y = expo * x ** 3 + (1 - expo) * x
+        else:
+            raise ValueError("unknown curve: " + curve)
+        table[i] = int(y * max_duty)
+    return table
+
+class Motor:
+    """一个 L298N 通道：两个方向引脚加一个 PWM 使能引脚"""
+    def __init__(self, in_a, in_b, enable, center=2000, threshold=500, span=2000,
+                 curve="sqrt", slew=0, table=None):
+        self.in_a = in_a
+        self.in_b = in_b
+        self.enable = enable
+        self.center = center
+        self.threshold = threshold
+        self.span = span
+        self.table = table if table is not None else build_curve(curve, span)
+        self.slew = slew  # 每次更新占空比最多变化多少，0 表示不限制
+        self.direction = None
+        self.duty = -1
+        self.speed = 0
+
+    def target(self, y):
+        """摇杆值 -> 带正负号的占空比：正数正转，负数反转，0 停止
+        只返回一个小整数，不配置内存，update() 在计时器回调中也用它"""
+        offset = self.center - y
+        if offset > self.threshold:  # 上
+            sign = 1
+        elif -offset > self.threshold:  # 下
+            sign = -1
+            offset = -offset
+        else:
+            return 0
+        if offset > self.span:
+            offset = self.span
+        return sign * self.table[offset >> LUT_SHIFT]
+
+    def set(self, y):
+        """根据摇杆值控制马达，返回 (速度, 方向)"""
+        self.update(y)
+        return self.speed, self.direction
+
+    def update(self, y):
+        """和 set 相同但不返回结果，不配置内存，可以在计时器回调中使用"""
+        duty = self.target(y)
+        if duty > 0:
+            self.apply(FORWARD, duty)
+        elif duty < 0:
+            self.apply(REVERSE, -duty)
+        else:
+            self.apply(STOP, 0)
+
+    def drive(self, direction, duty):
+        """直接指定方向和占空比，返回 (速度, 方向)"""
+        self.apply(direction, duty)
+        return self.speed, self.direction
+
+    def apply(self, direction, duty):
+        if self.slew:
+            # 限制加速：方向改变时先减速到 0
+            current = self.speed if direction == self.direction else -self.speed
+            if duty - current > self.slew:
+                duty = current + self.slew
+            if current - duty > self.slew:
+                duty = current - self.slew
+            if duty < 0:
+                direction = self.direction
+                duty = -duty
+            if duty == 0:
+                direction = STOP
+        if direction != self.direction:
+            # 先关 PWM 再换方向
+            if self.duty != 0:
+                self.enable.duty(0)
+                self.duty = 0
+            if direction == FORWARD:
+                self.in_a.value(1)
+                self.in_b.value(0)
+            elif direction == REVERSE:
+                self.in_a.value(0)
+                self.in_b.value(1)
+            else:
+                self.in_a.value(0)
+                self.in_b.value(0)
+            self.direction = direction
+        if duty != self.duty:
+            self.enable.duty(duty)
+            self.duty = duty
+        self.speed = duty
+
+    def stop(self):
+        return self.drive(STOP, 0)
@@ -0,0 +1,50 @@
+# 量測馬里奧物理每一步配置多少記憶體、花多少時間（物理、收集金幣、鏡頭和載入段落，不含繪圖）
+# 在板子上執行：mpremote run physbench.py（需要先上傳 compat.py、mario.py、entities.py、levelfile.py、levels.bin）
+# MicroPython 的浮點數每個運算結果都要在 heap 配置一個物件，整數不用；
+# 量測時關掉垃圾回收，heap 增加的量就是配置的量
+# 電腦上的 CPython 會重複使用浮點數物件，配置的數字沒有意義，只能看時間；
+# 電腦上改用 python -m tools.floats 數每一步產生幾個浮點數（可以指定 git 版本）
+# 改版前後比較：上傳舊版本的 compat.py、mario.py、levelfile.py、levels.bin 再跑一次
+# （run() 只用到兩個版本都有的介面）
+import gc
+from compat import ticks_us, ticks_diff
+from mario import Mario, Camera, JUMP_FORCE
+from levelfile import LevelFile
+
+STEPS = 500
+
+def run(level, steps):
+    mario = Mario()
+    camera = Camera()
+    direction = 1
+    for step in range(steps):
+        if step % 40 == 0 and not mario.is_jumping:
+            mario.vy = JUMP_FORCE  # 不用 jump()：冷卻時間看真實時間
+            mario.is_jumping = True
+        if mario.x + mario.width + 2 > level.width or mario.x < 2:
+            direction = -direction
+        mario.move(direction, level.width)
+        mario.update(level)
+        mario.score += 100 * level.collect(mario)
+        level.follow(camera.follow(mario, level.width))
+
+def main(path="levels.bin"):
+    levels = LevelFile(path)
+    mem_alloc = getattr(gc, "mem_alloc", None)
+    print("關卡  us/步  bytes/步")
+    for number in range(1, levels.count + 1):
+        level = levels.load(number)
+        run(level, 10)  # 先跑幾步，段落載入的緩衝區不算在內
+        level = levels.load(number)
+        gc.collect()
+        gc.disable()
+        before = mem_alloc() if mem_alloc else 0
+        start = ticks_us()
+        run(level, STEPS)
+        us = ticks_diff(ticks_us(), start)
+        allocated = (mem_alloc() - before) if mem_alloc else 0
+        gc.enable()
+        print("%4d  %5d  %8d" % (number, us // STEPS, allocated // STEPS))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# 分階段計時（馬里奧、五子棋和馬達控制三支程式用）
+# - 用 ticks_us 量每個階段（輸入、邏輯、繪圖、傳送 ...）的時間，累計次數、總和、最小、最大
+#   和固定區間的直方圖（<32us、<64us ... <32ms、更久，共 BUCKETS 格）
+# - 所有數字存在預先配置的 array 裡，start()/stop() 不配置記憶體，計時器回調裡也能用
+# - 結果可以畫在 OLED 上（draw()，用 toggle() 開關）或印到序列埠（dump()）
+# - 程式裡用 PROFILE = const(0) 包住呼叫：if PROFILE: ...
+#   MicroPython 編譯時會把 if 0 的區塊整個拿掉，關掉時完全沒有成本，可以留在正式版
+# 累計值存在 32 位元的 array('l') 裡，不會變成大整數，但一個階段的總時間超過 2**31 us（約 35 分鐘）
+# 就溢位：MicroPython 會繞回負數（平均值變成錯的），電腦上的 CPython 會丟出 OverflowError，
+# 所以要定期 dump 再 reset
+from array import array
+from compat import ticks_us, ticks_diff
+
+BUCKETS = 12
+BUCKET_SHIFT = 5  # 第一格的上限 2**5 = 32us，之後每格加倍
+
+def bucket(us):
+    """us 落在直方圖的第幾格"""
+    us >>= BUCKET_SHIFT
+    b = 0
+    while us and b < BUCKETS - 1:
+        us >>= 1
+        b += 1
+    return b
+
+class Profiler:
+    """names 是各階段的名稱（畫在 OLED 上只顯示前 4 個字），階段用編號 0、1、2 ... 指定
+    用法：
+        t = prof.start()
+        讀輸入
+        t = prof.stop(INPUT, t)   # stop 回傳現在的時間，下一個階段接著量
+        更新遊戲
+        prof.stop(LOGIC, t)"""
+    def __init__(self, names):
+        self.names = names
+        n = len(names)
+        self.count = array('l', [0] * n)
+        self.total = array('l', [0] * n)
+        self.low = array('l', [0] * n)
+        self.high = array('l', [0] * n)
+        self.hist = array('l', [0] * (n * BUCKETS))
+        self.overlay = False
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self.names)):
+            self.count[i] = 0
+            self.total[i] = 0
+            self.low[i] = 0x3FFFFFFF
+            self.high[i] = 0
+        for i in range(len(self.hist)):
+            self.hist[i] = 0
+
+    def start(self):
+        return ticks_us()
+
+    def stop(self, stage, start):
+        """把 start 到現在的時間記到 stage，回傳現在的時間"""
+        now = ticks_us()
+        us = ticks_diff(now, start)
+        self.count[stage] += 1
+        self.total[stage] += us
+        if us < self.low[stage]:
+            self.low[stage] = us
+        if us > self.high[stage]:
+            self.high[stage] = us
+        self.hist[stage * BUCKETS + bucket(us)] += 1
+        return now
+
+    def average(self, stage):
+        n = self.count[stage]
+        return self.total[stage] // n if n else 0
+
+    def toggle(self):
+        self.overlay = not self.overlay
+        return self.overlay
+
+    def draw(self, fb, x=0, y=0):
+        """在 fb 上畫每個階段的平均和最大時間（us），背景先塗黑；overlay 關掉時不畫"""
+        if not self.overlay:
+            return
+        fb.fill_rect(x, y, 120, 8 * len(self.names) + 8, 0)
+        fb.text("us   avg   max", x, y, 1)
+        for i, name in enumerate(self.names):
+            fb.text("%-4s%5d %5d" % (name[:4], self.average(i), self.high[i]), x, y + 8 * (i + 1), 1)
+
+    def dump(self):
+        """印出每個階段的統計和直方圖"""
+        bounds = " ".join("<%d" % (1 << (BUCKET_SHIFT + b)) for b in range(BUCKETS - 1))
+        print("---- profile (us) ----")
+        print("stage     n    min    avg    max | " + bounds + " 更久")
+        for i, name in enumerate(self.names):
+            n = self.count[i]
+            row = self.hist[i * BUCKETS:(i + 1) * BUCKETS]
+            print("%-6s %5d %6d %6d %6d | %s" % (name, n, self.low[i] if n else 0, self.average(i),
+                                                   self.high[i], " ".join(str(c) for c in row)))
+        print("---- end ----")
@@ -0,0 +1,113 @@
+# 馬里奧遊戲的錄製和重播
+# 錄製檔（.rec，little-endian）：
+#   檔頭  "MRC\x01"、levels.bin 的 CRC32 u32、每幾步記一次狀態 u16
+#   之後每一步一個位元組：低 3 位元是 world 的輸入（RIGHT、LEFT、JUMP），
+#   最高位元 HASH_FLAG 表示這一步之後接著 4 bytes 的狀態 CRC32（World.hash()）
+# 每步只要 1 byte（加上每 hash_every 步 4 bytes），板子上也錄得起來；
+# 重播不需要畫面和計時，照順序把位元組交給 World.step() 並比對狀態（python -m tools.replay）
+# hash_every 預設 1：每一步都比對，重播時狀態一不一樣就停在那一步。
+# 板子上錄的時候改成稀疏一點（例如 50）：每步 5 bytes 要 250 B/s（一分鐘 15 KB）的快閃記憶體，
+# 算一次 hash 也要一步物理約 1/5 的時間（電腦上量的）；代價是重播時要到下一個記錄的步
+# 才會發現不一樣，只知道是在哪 50 步裡開始不同
+import binascii
+import struct
+from world import World, INPUT_MASK
+
+MAGIC = b"MRC\x01"
+HEADER = "<4sIH"
+HEADER_SIZE = 10
+HASH_FLAG = 0x80
+HASH = "<I"
+HASH_SIZE = 4
+
+def file_crc(path, chunk=256):
+    """檔案的 CRC32（錄製檔記下關卡檔的，重播時用來確認是同一份關卡）"""
+    buf = bytearray(chunk)
+    view = memoryview(buf)
+    crc = 0
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                return crc
+            crc = binascii.crc32(view[:n], crc)
+
+class Recorder:
+    """用法：每次 world.step(value) 之後呼叫 record(value, world)，結束時 close()
+    flush_every：每幾步寫進檔案一次（0 表示只在緩衝區滿了和呼叫 flush()、close() 時寫），
+    板子突然斷電時最多丟掉這麼多步"""
+    def __init__(self, path, levels_path="levels.bin", hash_every=1, size=256, flush_every=0):
+        self.hash_every = hash_every
+        self.flush_every = flush_every
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.length = 0
+        self.ticks = 0
+        self.file = open(path, "wb")
+        self.file.write(struct.pack(HEADER, MAGIC, file_crc(levels_path), hash_every))
+
+    def record(self, value, world):
+        if self.length + 1 + HASH_SIZE > len(self.buffer):
+            self._write()
+        self.ticks += 1
+        if self.hash_every and world.tick % self.hash_every == 0:
+            self.buffer[self.length] = value | HASH_FLAG
+            struct.pack_into(HASH, self.buffer, self.length + 1, world.hash())
+            self.length += 1 + HASH_SIZE
+        else:
+            self.buffer[self.length] = value
+            self.length += 1
+        if self.flush_every and self.ticks % self.flush_every == 0:
+            self.flush()
+
+    def _write(self):
+        if self.length:
+            self.file.write(self.view[:self.length])
+            self.length = 0
+
+    def flush(self):
+        """緩衝區寫進檔案，並讓檔案系統寫到快閃記憶體"""
+        self._write()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+class ReplayError(ValueError):
+    pass
+
+def read(path):
+    """讀錄製檔，回傳 (levels.bin 的 CRC32, hash_every, 資料 bytes)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER_SIZE or data[:4] != MAGIC:
+        raise ReplayError("不是錄製檔: " + path)
+    _, crc, hash_every = struct.unpack_from(HEADER, data)
+    return crc, hash_every, memoryview(data)[HEADER_SIZE:]
+
+def replay(data, levels, step=None):
+    """用關卡檔 levels（LevelFile）重播錄製的資料，逐步比對狀態
+    step(world, value, event) 每一步之後呼叫（可以不給）
+    回傳 (步數, 比對的次數)；狀態不一樣時丟出 ReplayError，訊息裡有第一個不一樣的步數"""
+    world = World(levels)
+    checked = 0
+    pos = 0
+    end = len(data)
+    while pos < end:
+        value = data[pos]
+        pos += 1
+        event = world.step(value & INPUT_MASK)
+        if step is not None:
+            step(world, value, event)
+        if value & HASH_FLAG:
+            if pos + HASH_SIZE > end:
+                raise ReplayError("錄製檔不完整")
+            expected = struct.unpack_from(HASH, data, pos)[0]
+            pos += HASH_SIZE
+            actual = world.hash()
+            if actual != expected:
+                raise ReplayError("第 %d 步的狀態不同（錄製 %08x，重播 %08x）" % (
+                    world.tick, expected, actual))
+            checked += 1
+    return world.tick, checked
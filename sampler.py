@@ -0,0 +1,120 @@
+# 多通道 ADC 背景取樣（五支程式共用）
+# - 計時器每 period_ms 把所有通道各讀 burst 次，存進每個通道的環形緩衝區
+# - 每存一個值就更新濾波結果：中位數（排序好的副本，插入時只移動幾格）或一階 IIR（整數移位）
+# - 中位數的窗口長度由每支程式決定：窗口越長越能排除雜訊，但推動搖桿後要多等幾次取樣才反應；
+#   長度 1 就是不濾波，直接用最新的讀值（讀值本來就穩定的程式用這個，不增加延遲）
+# - 主迴圈用 Channel.read() 直接拿濾波後的值，不用等、不用排序；
+#   Channel 的用法和 ADC 一樣，可以直接交給 joystick.Axis
+# - 計時器回調裡不配置記憶體（ESP32 的計時器回調是軟中斷，在主程式的位元組碼之間執行）
+from array import array
+from machine import Timer
+from compat import ticks_us, ticks_diff
+
+MEDIAN = 0
+IIR = 1
+
+class Channel:
+    """一個 ADC 通道的環形緩衝區和濾波值；read() 回傳濾波後的值"""
+    def __init__(self, adc, size=5, mode=MEDIAN, shift=2):
+        self.adc = adc
+        self.size = size
+        self.mode = mode
+        self.shift = shift  # IIR：每次往新值靠近 1/2**shift
+        self.ring = array('H', [0] * size)
+        self.sorted = array('H', [0] * size)
+        self.index = 0
+        self.fill(adc.read())
+
+    def fill(self, raw):
+        """緩衝區全部填成 raw（開始取樣前用目前的讀值，濾波值不會從 0 慢慢爬上來）"""
+        for i in range(self.size):
+            self.ring[i] = raw
+            self.sorted[i] = raw
+        self.acc = raw << self.shift
+        self.raw = raw
+        self.value = raw
+
+    def push(self, raw):
+        ring = self.ring
+        i = self.index
+        old = ring[i]
+        ring[i] = raw
+        i += 1
+        self.index = 0 if i == self.size else i
+        self.raw = raw
+        if self.size == 1 and self.mode == MEDIAN:
+            self.value = raw
+            return
+        if self.mode == IIR:
+            self.acc += raw - (self.acc >> self.shift)
+            self.value = self.acc >> self.shift
+            return
+        # 在排序好的副本裡把舊值換成新值，再往左或往右移到正確的位置
+        s = self.sorted
+        n = self.size
+        j = 0
+        while s[j] != old:
+            j += 1
+        if raw > old:
+            while j + 1 < n and s[j + 1] < raw:
+                s[j] = s[j + 1]
+                j += 1
+        else:
+            while j > 0 and s[j - 1] > raw:
+                s[j] = s[j - 1]
+                j -= 1
+        s[j] = raw
+        self.value = s[n >> 1]
+
+    def read(self):
+        return self.value
+
+class Sampler:
+    """用法：
+        sampler = Sampler(period_ms=4)
+        vrx = sampler.add(ADC(Pin(34)))   # 回傳 Channel，用法和 ADC 一樣
+        sampler.start()"""
+    def __init__(self, period_ms=4, burst=1, timer_id=1):
+        self.period_ms = period_ms
+        self.burst = burst
+        self.timer_id = timer_id
+        self.channels = []
+        self.timer = None
+        self.ticks = 0    # 回調次數
+        self.busy_us = 0  # 回調花的總時間
+
+    def add(self, adc, size=5, mode=MEDIAN, shift=2):
+        channel = Channel(adc, size, mode, shift)
+        self.channels.append(channel)
+        return channel
+
+    def update(self, timer=None):
+        """讀所有通道各 burst 次；start() 之後由計時器呼叫，沒有計時器時也可以在主迴圈呼叫"""
+        start = ticks_us()
+        burst = self.burst
+        for channel in self.channels:
+            adc = channel.adc
+            for _ in range(burst):
+                channel.push(adc.read())
+        self.ticks += 1
+        self.busy_us += ticks_diff(ticks_us(), start)
+
+    def start(self):
+        for channel in self.channels:
+            channel.fill(channel.adc.read())
+        self.timer = Timer(self.timer_id)
+        self.timer.init(period=self.period_ms, mode=Timer.PERIODIC, callback=self.update)
+
+    def stop(self):
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+
+    def load(self):
+        """上次呼叫以來回調佔用的 CPU 比例（千分比）；計數歸零，回調裡的整數才不會變成大整數"""
+        ticks = self.ticks
+        busy = self.busy_us
+        self.ticks = self.busy_us = 0
+        if not ticks:
+            return 0
+        return busy // (ticks * self.period_ms)
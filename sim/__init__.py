@@ -0,0 +1,101 @@
+# 在電腦上模擬 ESP32 + SSD1306，讓所有腳本不用板子也能執行、測試和量測
+#
+# 程式裡使用：
+#   import sim
+#   clock = sim.install(limit_ms=5000)          # 虛擬時鐘，5 秒後停止
+#   sim.board.set_adc(34, sim.signals.sine(2048, 1800, 1000))
+#   sim.run_script("joystickfinal.py")
+#
+# 命令列：
+#   python -m sim joystickfinal.py --limit 5000 --adc 35=step:2048:0:1000 --frames out/
+import gc
+import importlib
+import os
+import runpy
+import sys
+import time
+
+from sim.clock import Clock, StopSimulation
+from sim.machine import board
+from sim import signals
+
+# 依相依順序載入
+MODULES = ("micropython", "framebuf", "machine", "ssd1306", "uasyncio", "_thread")
+TIME_FUNCS = ("sleep", "sleep_ms", "sleep_us", "ticks_ms", "ticks_us", "ticks_cpu",
+              "ticks_diff", "ticks_add")
+HEAP_SIZE = 111168  # ESP32 MicroPython 開機後大約的 heap 大小
+
+_saved_time = {}
+_saved_modules = {}  # 被模擬模組蓋掉的原本模組（例如 CPython 自己的 _thread）
+
+def _mem_alloc():
+    import tracemalloc
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+def install(speed=None, limit_ms=None, read_cost_us=1, cpu_scale=0):
+    """裝上模擬模組並把 time 的函式換成虛擬時鐘，回傳時鐘"""
+    clock = Clock(speed, limit_ms, read_cost_us, cpu_scale)
+    board.__init__()
+    board.clock = clock
+    for name in MODULES:
+        original = sys.modules.get(name)
+        if original is not None and not original.__name__.startswith("sim."):
+            _saved_modules[name] = original
+        sys.modules[name] = importlib.import_module("sim." + name)
+    sys.modules["uasyncio"].new_event_loop()
+    for name in TIME_FUNCS:
+        if name not in _saved_time:
+            _saved_time[name] = getattr(time, name, None)
+        setattr(time, name, getattr(clock, name))
+    sys.modules["utime"] = time
+    if not hasattr(gc, "mem_free"):
+        gc.mem_alloc = _mem_alloc
+        gc.mem_free = lambda: HEAP_SIZE - _mem_alloc()
+    return clock
+
+def uninstall():
+    """還原 time 模組和 sys.modules"""
+    threads = sys.modules.get("_thread")
+    if threads is not None and hasattr(threads, "stop_all"):
+        threads.stop_all()
+    for name, func in _saved_time.items():
+        if func is None:
+            if hasattr(time, name):
+                delattr(time, name)
+        else:
+            setattr(time, name, func)
+    _saved_time.clear()
+    for name in MODULES + ("utime",):
+        sys.modules.pop(name, None)
+    sys.modules.update(_saved_modules)
+    _saved_modules.clear()
+    board.clock = None
+
+def forget_modules(directory):
+    # 讓 directory 裡的模組在模擬環境下重新 import（拿到虛擬的 time 函式）
+    directory = os.path.abspath(directory)
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.dirname(os.path.abspath(path)) == directory:
+            del sys.modules[name]
+
+def run_script(path, run_name="__main__"):
+    """在已安裝的模擬環境中執行腳本，直到虛擬時間用完；回傳腳本的全域變數（若有）
+    執行期間的工作目錄是腳本所在的目錄（板子上程式和資料檔都放在根目錄）"""
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    forget_modules(directory)
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        return runpy.run_path(path, run_name=run_name)
+    except StopSimulation:
+        return None
+    finally:
+        os.chdir(cwd)
+
+def panel(addr=0x3C):
+    """目前的 SSD1306 面板（沒有就回傳 None）"""
+    return board.i2c_devices.get(addr)
@@ -0,0 +1,85 @@
+# 命令列：在模擬器中執行一支腳本
+#   python -m sim joystickcrea.py --limit 5000 --adc 34=step:2048:4000:500 --pin 27=trace:0=1,800=0,900=1
+#   python -m sim 初二信37賴承熹_joystick_extra.py --frames out --format png --scale 4
+import argparse
+import os
+import sys
+from time import perf_counter
+
+import sim
+from sim import image, signals
+
+def parse_assignments(items):
+    result = {}
+    for item in items or ():
+        pin, _, text = item.partition("=")
+        result[int(pin)] = signals.parse(text)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sim", description="在電腦上模擬執行 ESP32 腳本")
+    parser.add_argument("script")
+    parser.add_argument("--limit", type=int, default=10000, help="虛擬時間上限（毫秒）")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="和真實時間的比例，例如 1 為即時；不指定則不等待")
+    parser.add_argument("--cpu-scale", type=float, default=0,
+                        help="把電腦上的計算時間乘上這個倍數算進虛擬時間（估計板子上的耗時）")
+    parser.add_argument("--adc", action="append", metavar="PIN=SIGNAL", help="ADC 輸入訊號")
+    parser.add_argument("--pin", action="append", metavar="PIN=SIGNAL", help="數位輸入訊號")
+    parser.add_argument("--frames", metavar="DIR", help="把每個畫面存到這個目錄")
+    parser.add_argument("--frame-every", type=int, default=0, metavar="MS",
+                        help="兩張存檔畫面之間最少相隔的虛擬毫秒")
+    parser.add_argument("--format", choices=("pgm", "png"), default="pgm")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--show", action="store_true", help="結束時在終端機印出最後的畫面")
+    parser.add_argument("--no-bus-timing", action="store_true", help="I2C 傳輸不佔虛擬時間")
+    args = parser.parse_args(argv)
+
+    clock = sim.install(speed=args.speed, limit_ms=args.limit, cpu_scale=args.cpu_scale)
+    board = sim.board
+    board.bus_timing = not args.no_bus_timing
+    board.record_events = False
+    for pin, signal in parse_assignments(args.adc).items():
+        board.set_adc(pin, signal)
+    for pin, signal in parse_assignments(args.pin).items():
+        board.set_pin(pin, signal)
+
+    saved = [0, -1]  # 已存張數、上一張的時間
+    if args.frames:
+        args.frames = os.path.abspath(args.frames)  # 腳本執行時工作目錄會換成腳本所在的目錄
+        os.makedirs(args.frames, exist_ok=True)
+
+    def on_frame(panel):
+        now = clock.millis()
+        if saved[1] >= 0 and now - saved[1] < args.frame_every:
+            return
+        name = os.path.join(args.frames, "frame_%05d_%07dms.%s" % (saved[0], now, args.format))
+        image.save(name, panel.ram, panel.width, panel.pages * 8, args.scale)
+        saved[0] += 1
+        saved[1] = now
+
+    if args.frames:
+        board.on_frame = on_frame
+
+    start = perf_counter()
+    try:
+        sim.run_script(args.script)
+    finally:
+        real = perf_counter() - start
+        virtual = clock.millis()
+        print("--- 模擬結束 ---", file=sys.stderr)
+        print("虛擬時間 %d ms，實際 %.3f s（%.1f 倍速）" % (
+            virtual, real, virtual / 1000 / real if real else 0), file=sys.stderr)
+        panel = sim.panel()
+        if panel is not None:
+            print("OLED 畫面更新 %d 次，資料 %d bytes，命令 %d bytes" % (
+                panel.frames, panel.data_bytes, panel.command_bytes), file=sys.stderr)
+        counts = ", ".join("%s=%d" % item for item in sorted(board.counts.items()))
+        print("I/O 次數：" + counts, file=sys.stderr)
+        if args.frames:
+            print("已存 %d 張畫面到 %s" % (saved[0], args.frames), file=sys.stderr)
+        if args.show and panel is not None:
+            print(image.to_text(panel.ram, panel.width, panel.pages * 8))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# 模擬 MicroPython 的 _thread
+# 每個執行緒是一條真的主機執行緒，但同一時間只讓一條在跑（主執行緒交棒才會動），
+# 所以結果和單執行緒一樣固定：
+# - 執行緒被當成時鐘上的計時器，到了它的時間，主執行緒把棒子交給它並等它交回
+# - 執行緒裡的 sleep、ticks 讀取和 I2C 傳輸不推進共用的時鐘，
+#   而是讓它停到「現在 + 耗時」再繼續，期間主執行緒照常執行
+#   （相當於硬體 I2C 等傳輸時放開 GIL；板子上的執行緒不會真的平行執行 Python 程式）
+# - 鎖拿不到時交回棒子，等持有者放開後再排回時鐘
+import threading
+import traceback
+
+from sim.machine import board
+
+_yielded = threading.Event()  # 執行緒把棒子交回主執行緒
+_threads = []
+
+class _Abort(BaseException):
+    """模擬結束時讓還在等待的執行緒退出"""
+
+class SimThread:
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.resume = threading.Event()
+        self.abort = False
+        self.done = False
+        self.due_us = board.clock.now_us
+        self.host = threading.Thread(target=self._main, daemon=True)
+
+    def start(self):
+        _threads.append(self)
+        self.host.start()
+        board.clock.add_timer(self)
+
+    def _main(self):
+        clock = board.clock
+        clock.threads[threading.get_ident()] = self
+        self.resume.wait()
+        self.resume.clear()
+        try:
+            if not self.abort:
+                self.func(*self.args, **self.kwargs)
+        except (SystemExit, _Abort):
+            pass
+        except BaseException:
+            print("Unhandled exception in thread started by", self.func)
+            traceback.print_exc()
+        finally:
+            self.done = True
+            clock.threads.pop(threading.get_ident(), None)
+            _yielded.set()
+
+    def fire(self):
+        # 由主執行緒的時鐘呼叫：讓這條執行緒跑到它下一次等待為止
+        board.clock.remove_timer(self)
+        _yielded.clear()
+        self.resume.set()
+        _yielded.wait()
+
+    def pause(self, us):
+        # 在這條執行緒裡呼叫：us 微秒之後再繼續
+        clock = board.clock
+        self.due_us = clock.now_us + max(0, us)
+        clock.add_timer(self)
+        self._yield()
+
+    def block(self):
+        # 在這條執行緒裡呼叫：等別人把它排回時鐘（放開鎖時）
+        self._yield()
+
+    def _yield(self):
+        _yielded.set()
+        self.resume.wait()
+        self.resume.clear()
+        if self.abort:
+            raise _Abort()
+
+def _current():
+    clock = board.clock
+    return clock.threads.get(threading.get_ident()) if clock is not None else None
+
+class LockType:
+    def __init__(self):
+        self._locked = False
+        self._waiters = []
+
+    def acquire(self, waitflag=1, timeout=-1):
+        if not self._locked:
+            self._locked = True
+            return True
+        if not waitflag:
+            return False
+        clock = board.clock
+        deadline = None if timeout < 0 else clock.now_us + int(timeout * 1000000)
+        me = _current()
+        while self._locked:
+            if deadline is not None and clock.now_us >= deadline:
+                return False
+            if me is None or deadline is not None:
+                # 主執行緒（或有逾時）：推進時間讓其他執行緒有機會放開
+                clock.advance(clock.watch_step_us)
+            else:
+                self._waiters.append(me)
+                me.block()
+        self._locked = True
+        return True
+
+    def release(self):
+        if not self._locked:
+            raise RuntimeError("release unlocked lock")
+        self._locked = False
+        clock = board.clock
+        for waiter in self._waiters:
+            waiter.due_us = clock.now_us
+            clock.add_timer(waiter)
+        self._waiters.clear()
+
+    def locked(self):
+        return self._locked
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+def allocate_lock():
+    return LockType()
+
+def start_new_thread(func, args, kwargs=None):
+    thread = SimThread(func, tuple(args), kwargs or {})
+    thread.start()
+    return id(thread)
+
+def get_ident():
+    return threading.get_ident()
+
+def exit():
+    raise SystemExit()
+
+def stack_size(size=None):
+    return 0
+
+def stop_all():
+    """模擬結束時呼叫：讓所有還沒結束的執行緒退出"""
+    for thread in _threads:
+        if not thread.done:
+            thread.abort = True
+            _yielded.clear()
+            thread.resume.set()
+            _yielded.wait(1)
+    _threads.clear()
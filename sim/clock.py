@@ -0,0 +1,144 @@
+# 模擬用的虛擬時鐘
+# sleep 只推進虛擬時間，不真的等待（或依 speed 等比例等待），
+# ticks_* 讀到的都是虛擬時間，所以每次執行結果都一樣
+import time as _time
+from _thread import get_ident as _get_ident
+
+_real_sleep = _time.sleep
+_real_perf = _time.perf_counter
+
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD // 2
+
+class StopSimulation(BaseException):
+    """虛擬時間到了設定的上限；繼承 BaseException，腳本裡的 except Exception 攔不到"""
+
+class Clock:
+    def __init__(self, speed=None, limit_ms=None, read_cost_us=1, cpu_scale=0):
+        # speed=None：sleep 立即返回；speed=1.0：照真實時間等待；speed=10：快十倍
+        # limit_ms：虛擬時間超過就丟出 StopSimulation
+        # read_cost_us：每次讀 ticks 推進的虛擬時間，讓忙等迴圈也能前進
+        # cpu_scale：大於 0 時，兩次讀 ticks 之間電腦實際花的時間乘上這個倍數
+        #   也算進虛擬時間（用來估計板子上的計算耗時，結果不再完全固定）
+        self.now_us = 0
+        self.speed = speed
+        self.limit_us = None if limit_ms is None else limit_ms * 1000
+        self.read_cost_us = read_cost_us
+        self.timers = []     # 依時間觸發的回呼（machine.Timer）
+        self.watchers = []   # 每次時間前進都要檢查的物件（Pin.irq）
+        self.watch_step_us = 1000
+        self.threads = {}    # 主機執行緒 id -> sim._thread 的執行緒
+        self._firing = False
+        self._real_start = _real_perf()
+        self.cpu_scale = cpu_scale
+        self._last_read = _real_perf()
+
+    # ---- MicroPython time 模組的函式 ----
+    def _read(self):
+        cost = self.read_cost_us
+        if self.cpu_scale:
+            now = _real_perf()
+            cost += int((now - self._last_read) * 1000000 * self.cpu_scale)
+            self._last_read = now
+        self.advance(cost)
+
+    def ticks_us(self):
+        self._read()
+        return self.now_us & TICKS_MAX
+
+    def ticks_ms(self):
+        self._read()
+        return (self.now_us // 1000) & TICKS_MAX
+
+    def ticks_cpu(self):
+        return self.ticks_us()
+
+    @staticmethod
+    def ticks_diff(a, b):
+        return ((a - b + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+    @staticmethod
+    def ticks_add(a, b):
+        return (a + b) & TICKS_MAX
+
+    def sleep(self, seconds):
+        self.advance(int(seconds * 1000000))
+
+    def sleep_ms(self, ms):
+        self.advance(int(ms) * 1000)
+
+    def sleep_us(self, us):
+        self.advance(int(us))
+
+    def time(self):
+        return self.now_us // 1000000
+
+    def time_ns(self):
+        return self.now_us * 1000
+
+    # ---- 虛擬時間 ----
+    def millis(self):
+        # 不推進時間的讀取，給模擬器自己用
+        return self.now_us // 1000
+
+    def advance(self, us):
+        if self.threads:
+            # 模擬的 _thread 執行緒不推進共用的時鐘，只是自己停 us 微秒
+            thread = self.threads.get(_get_ident())
+            if thread is not None:
+                thread.pause(us)
+                return
+        target = self.now_us + max(0, us)
+        if self.limit_us is not None and target > self.limit_us:
+            target = self.limit_us
+        if not self._firing:
+            self._firing = True
+            try:
+                self._run_until(target)
+            finally:
+                self._firing = False
+        if target > self.now_us:
+            self.now_us = target
+        if self.speed:
+            # 依 speed 換算真實時間，讓人看得到動畫
+            ahead = self.now_us / 1000000 / self.speed - (_real_perf() - self._real_start)
+            if ahead > 0:
+                _real_sleep(ahead)
+        if self.limit_us is not None and self.now_us >= self.limit_us:
+            raise StopSimulation()
+
+    def _run_until(self, target):
+        # 依序觸發期間內到期的計時器和腳位變化
+        while True:
+            due = target
+            timer = None
+            for t in self.timers:
+                if t.due_us <= due:
+                    due = t.due_us
+                    timer = t
+            if self.watchers:
+                step = self.now_us + self.watch_step_us
+                if step < due:
+                    due = step
+                    timer = None
+            if due > self.now_us:
+                self.now_us = due
+            for w in self.watchers:
+                w.poll(self.now_us)
+            if timer is not None:
+                timer.fire()
+            elif due >= target:
+                return
+
+    def add_timer(self, timer):
+        if timer not in self.timers:
+            self.timers.append(timer)
+
+    def remove_timer(self, timer):
+        if timer in self.timers:
+            self.timers.remove(timer)
+
+    def add_watcher(self, watcher):
+        if watcher not in self.watchers:
+            self.watchers.append(watcher)
@@ -0,0 +1,196 @@
+# MicroPython framebuf 模組的純 Python 版本
+# 支援 MONO_VLSB、MONO_HLSB、MONO_HMSB 三種單色格式
+# text() 用 5x7 字型畫在 8x8 的格子裡，和板子上的字型外觀相近但不完全相同
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+MVLSB = MONO_VLSB
+
+# 5x7 字型，ASCII 32~126，每個字 5 欄，每欄低位元在上
+FONT = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12"
+    "2313086462" "3649552250" "0005030000" "001c224100" "0041221c00"
+    "082a1c2a08" "08083e0808" "0050300000" "0808080808" "0060600000"
+    "2010080402" "3e5149453e" "00427f4000" "4261514946" "2141454b31"
+    "1814127f10" "2745454539" "3c4a494930" "0171090503" "3649494936"
+    "064949291e" "0036360000" "0056360000" "0008142241" "1414141414"
+    "4122140800" "0201510906" "324979413e" "7e1111117e" "7f49494936"
+    "3e41414122" "7f4141221c" "7f49494941" "7f09090101" "3e41415132"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040"
+    "7f0204027f" "7f0408107f" "3e4141413e" "7f09090906" "3e4151215e"
+    "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f"
+    "7f2018207f" "6314081463" "0304780403" "6151494543" "00007f4141"
+    "0204081020" "41417f0000" "0402010204" "4040404040" "0001020400"
+    "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418"
+    "087e090102" "081454543c" "7f08040478" "00447d4000" "2040443d00"
+    "007f102844" "00417f4000" "7c04180478" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020"
+    "3c4040207c" "1c2040201c" "3c4030403c" "4428102844" "0c5050503c"
+    "4464544c44" "0008364100" "00007f0000" "0041360800" "08082a1c08"
+)
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, format, stride=None):
+        self.buf = buf
+        self.width = width
+        self.height = height
+        self.format = format
+        self.stride = width if stride is None else stride
+        if format == MONO_VLSB:
+            need = ((height + 7) >> 3) * self.stride
+        else:
+            need = ((self.stride + 7) >> 3) * height
+        if len(buf) < need:
+            raise ValueError("buffer too small")
+
+    # ---- 像素存取 ----
+    def _locate(self, x, y):
+        if self.format == MONO_VLSB:
+            return (y >> 3) * self.stride + x, y & 7
+        index = y * ((self.stride + 7) >> 3) + (x >> 3)
+        if self.format == MONO_HLSB:
+            return index, 7 - (x & 7)
+        return index, x & 7
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        index, bit = self._locate(x, y)
+        if c is None:
+            return (self.buf[index] >> bit) & 1
+        if c & 1:
+            self.buf[index] |= 1 << bit
+        else:
+            self.buf[index] &= ~(1 << bit) & 0xFF
+
+    # ---- 繪圖 ----
+    def fill(self, c):
+        value = 0xFF if c & 1 else 0
+        self.buf[:] = bytes([value]) * len(self.buf)
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        if self.format == MONO_VLSB:
+            # 每一頁（8 列）用一個位元遮罩整欄處理
+            buf = self.buf
+            for page in range(y0 >> 3, ((y1 - 1) >> 3) + 1):
+                top = max(y0, page * 8) - page * 8
+                bottom = min(y1, page * 8 + 8) - page * 8
+                mask = ((1 << bottom) - 1) & ~((1 << top) - 1)
+                base = page * self.stride
+                if c & 1:
+                    for i in range(base + x0, base + x1):
+                        buf[i] |= mask
+                else:
+                    inv = ~mask & 0xFF
+                    for i in range(base + x0, base + x1):
+                        buf[i] &= inv
+            return
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                self.pixel(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.fill_rect(x, y, w, 1, c)
+        self.fill_rect(x, y + h - 1, w, 1, c)
+        self.fill_rect(x, y, 1, h, c)
+        self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x0, y0, x1, y1, c):
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x0, y0, c)
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def text(self, s, x, y, c=1):
+        for ch in str(s):
+            code = ord(ch)
+            if 32 <= code <= 126:
+                glyph = FONT[(code - 32) * 5:(code - 31) * 5]
+                for col in range(5):
+                    bits = glyph[col]
+                    for row in range(7):
+                        if bits >> row & 1:
+                            self.pixel(x + 1 + col, y + row, c)
+            x += 8
+
+    def scroll(self, xstep, ystep):
+        w = self.width
+        h = self.height
+        pixels = [[self.pixel(x, y) for x in range(w)] for y in range(h)]
+        for y in range(h):
+            for x in range(w):
+                sx = x - xstep
+                sy = y - ystep
+                if 0 <= sx < w and 0 <= sy < h:
+                    self.pixel(x, y, pixels[sy][sx])
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            fbuf = FrameBuffer(*fbuf)
+        if (key == -1 and palette is None and x == 0 and y == 0 and
+                fbuf.format == self.format and fbuf.width == self.width and
+                fbuf.height == self.height and fbuf.stride == self.stride):
+            # 同尺寸同格式整張複製
+            self.buf[:len(fbuf.buf)] = fbuf.buf
+            return
+        if palette is None and fbuf.format == MONO_HLSB and self.format == MONO_VLSB:
+            self._blit_hlsb(fbuf, x, y, key)
+            return
+        for sy in range(max(0, -y), min(fbuf.height, self.height - y)):
+            for sx in range(max(0, -x), min(fbuf.width, self.width - x)):
+                c = fbuf.pixel(sx, sy)
+                if c == key:
+                    continue
+                if palette is not None:
+                    c = palette.pixel(c, 0)
+                self.pixel(x + sx, y + sy, c)
+
+    def _blit_hlsb(self, fbuf, x, y, key):
+        # 點陣圖（MONO_HLSB）畫到螢幕緩衝區（MONO_VLSB）：直接做位元運算，不逐點呼叫 pixel()
+        src = fbuf.buf
+        src_stride = (fbuf.stride + 7) >> 3
+        dst = self.buf
+        x0 = max(0, -x)
+        x1 = min(fbuf.width, self.width - x)
+        for sy in range(max(0, -y), min(fbuf.height, self.height - y)):
+            dy = y + sy
+            base = (dy >> 3) * self.stride + x
+            bit = 1 << (dy & 7)
+            inv = ~bit & 0xFF
+            row = sy * src_stride
+            for sx in range(x0, x1):
+                c = (src[row + (sx >> 3)] >> (7 - (sx & 7))) & 1
+                if c == key:
+                    continue
+                if c:
+                    dst[base + sx] |= bit
+                else:
+                    dst[base + sx] &= inv
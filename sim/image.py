@@ -0,0 +1,57 @@
+# 把 SSD1306 的顯示記憶體（MONO_VLSB）存成 PGM 或 PNG
+import struct
+import zlib
+
+def to_rows(ram, width=128, height=64, scale=1):
+    # 轉成灰階列資料，亮點 255、暗點 0
+    rows = []
+    for y in range(height):
+        page = (y >> 3) * width
+        bit = y & 7
+        row = bytearray()
+        for x in range(width):
+            value = 255 if ram[page + x] >> bit & 1 else 0
+            row.extend(bytes([value]) * scale)
+        for _ in range(scale):
+            rows.append(bytes(row))
+    return rows
+
+def save_pgm(path, ram, width=128, height=64, scale=1):
+    rows = to_rows(ram, width, height, scale)
+    with open(path, "wb") as f:
+        f.write(b"P5\n%d %d\n255\n" % (width * scale, height * scale))
+        for row in rows:
+            f.write(row)
+
+def save_png(path, ram, width=128, height=64, scale=1):
+    rows = to_rows(ram, width, height, scale)
+    raw = b"".join(b"\x00" + row for row in rows)
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width * scale, height * scale, 8, 0, 0, 0, 0)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", header))
+        f.write(chunk(b"IDAT", zlib.compress(raw, 9)))
+        f.write(chunk(b"IEND", b""))
+
+def save(path, ram, width=128, height=64, scale=1):
+    if path.endswith(".png"):
+        save_png(path, ram, width, height, scale)
+    else:
+        save_pgm(path, ram, width, height, scale)
+
+def to_text(ram, width=128, height=64):
+    # 在終端機上預覽：兩列像素合成一個字元
+    lines = []
+    for y in range(0, height, 2):
+        line = []
+        for x in range(width):
+            top = ram[(y >> 3) * width + x] >> (y & 7) & 1
+            bottom = ram[((y + 1) >> 3) * width + x] >> ((y + 1) & 7) & 1
+            line.append(" ▀▄█"[top | bottom << 1])
+        lines.append("".join(line).rstrip())
+    return "\n".join(lines)
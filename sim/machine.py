@@ -0,0 +1,295 @@
+# MicroPython machine 模組的模擬版本
+# ADC 和輸入腳位的值來自 board 裡設定的訊號，輸出腳位和 PWM 的每次改變都會記錄下來
+from sim import signals
+
+class Board:
+    """模擬板子的全部狀態"""
+    def __init__(self):
+        self.clock = None
+        self.adc_signals = {}    # 腳位編號 -> f(ms) -> 0~4095
+        self.pin_signals = {}    # 腳位編號 -> f(ms) -> 0/1
+        self.i2c_devices = {}    # 位址 -> 裝置（需要 write(data) 方法）
+        self.events = []         # (微秒, 種類, 腳位, 值)
+        self.record_events = True
+        self.counts = {}         # 種類 -> 次數
+        self.pins = {}
+        self.pwms = {}
+        self.bus_timing = True   # I2C 傳輸依位元數和頻率推進虛擬時間
+        self.on_frame = None     # 任何面板傳完一個畫面時呼叫 on_frame(panel)
+
+    def now_ms(self):
+        return self.clock.millis() if self.clock else 0
+
+    def record(self, kind, pin, value):
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        if self.record_events:
+            self.events.append((self.clock.now_us if self.clock else 0, kind, pin, value))
+
+    def set_adc(self, pin, signal):
+        self.adc_signals[pin] = signals.const(signal) if isinstance(signal, int) else signal
+
+    def set_pin(self, pin, signal):
+        self.pin_signals[pin] = signals.const(signal) if isinstance(signal, int) else signal
+
+    def output(self, pin):
+        """輸出腳位目前的值"""
+        p = self.pins.get(pin)
+        return None if p is None else p._value
+
+    def pwm(self, pin):
+        return self.pwms.get(pin)
+
+board = Board()
+
+def _pin_id(pin):
+    return pin.id if isinstance(pin, Pin) else pin
+
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 2
+    PULL_DOWN = 1
+    IRQ_FALLING = 2
+    IRQ_RISING = 1
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        self._value = 0 if value is None else value
+        self._handler = None
+        self._trigger = 0
+        self._last = None
+        board.pins[id] = self
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if mode != -1:
+            self.mode = mode
+        if pull != -1:
+            self.pull = pull
+        if value is not None:
+            self.value(value)
+
+    def _input(self):
+        signal = board.pin_signals.get(self.id)
+        if signal is not None:
+            return 1 if signal(board.now_ms()) else 0
+        return 1 if self.pull == Pin.PULL_UP else 0
+
+    def value(self, v=None):
+        if v is None:
+            if self.mode == Pin.OUT:
+                return self._value
+            return self._input()
+        v = 1 if v else 0
+        if v != self._value:
+            self._value = v
+            board.record("pin", self.id, v)
+        else:
+            board.counts["pin_same"] = board.counts.get("pin_same", 0) + 1
+
+    __call__ = value
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def irq(self, handler=None, trigger=3, hard=False):
+        self._handler = handler
+        self._trigger = trigger
+        self._last = self._input()
+        if board.clock is not None:
+            board.clock.add_watcher(self)
+
+    def poll(self, now_us):
+        # 由時鐘呼叫：輸入值改變時觸發中斷
+        if self._handler is None:
+            return
+        v = self._input()
+        if v != self._last:
+            self._last = v
+            if (v and self._trigger & Pin.IRQ_RISING) or (not v and self._trigger & Pin.IRQ_FALLING):
+                self._handler(self)
+
+class ADC:
+    ATTN_0DB = 0
+    ATTN_2_5DB = 1
+    ATTN_6DB = 2
+    ATTN_11DB = 3
+    WIDTH_9BIT = 0
+    WIDTH_10BIT = 1
+    WIDTH_11BIT = 2
+    WIDTH_12BIT = 3
+
+    def __init__(self, pin, atten=None):
+        self.pin = _pin_id(pin)
+        self.bits = 12
+
+    def atten(self, atten):
+        pass
+
+    def width(self, width):
+        self.bits = 9 + width
+
+    def read(self):
+        board.counts["adc"] = board.counts.get("adc", 0) + 1
+        signal = board.adc_signals.get(self.pin)
+        value = 2048 if signal is None else signal(board.now_ms())
+        value = max(0, min(4095, int(value)))
+        return value >> (12 - self.bits)
+
+    def read_u16(self):
+        signal = board.adc_signals.get(self.pin)
+        value = 2048 if signal is None else signal(board.now_ms())
+        return max(0, min(4095, int(value))) << 4
+
+class PWM:
+    def __init__(self, pin, freq=None, duty=None):
+        self.pin = _pin_id(pin)
+        self._freq = 0
+        self._duty = 0
+        board.pwms[self.pin] = self
+        if freq is not None:
+            self.freq(freq)
+        if duty is not None:
+            self.duty(duty)
+
+    def freq(self, f=None):
+        if f is None:
+            return self._freq
+        if f != self._freq:
+            self._freq = f
+            board.record("pwm_freq", self.pin, f)
+
+    def duty(self, d=None):
+        if d is None:
+            return self._duty
+        if d != self._duty:
+            self._duty = d
+            board.record("pwm_duty", self.pin, d)
+        else:
+            board.counts["pwm_same"] = board.counts.get("pwm_same", 0) + 1
+
+    def duty_u16(self, d=None):
+        if d is None:
+            return self._duty << 6
+        self.duty(d >> 6)
+
+    def deinit(self):
+        self.duty(0)
+
+class I2C:
+    def __init__(self, id=-1, scl=None, sda=None, freq=400000, timeout=50000):
+        self.freq = freq
+        self.bytes_written = 0
+        self.transactions = 0
+
+    def scan(self):
+        return sorted(board.i2c_devices)
+
+    def _transfer(self, nbytes):
+        # 每個位元組 8 位元加 1 個 ACK，再加上位址位元組
+        self.transactions += 1
+        self.bytes_written += nbytes + 1
+        board.counts["i2c_bytes"] = board.counts.get("i2c_bytes", 0) + nbytes + 1
+        if board.bus_timing and board.clock is not None:
+            board.clock.advance((nbytes + 1) * 9 * 1000000 // self.freq)
+
+    def _device(self, addr):
+        device = board.i2c_devices.get(addr)
+        if device is None:
+            raise OSError(19)  # ENODEV
+        return device
+
+    def writeto(self, addr, buf, stop=True):
+        device = self._device(addr)
+        device.write(buf)
+        self._transfer(len(buf))
+        return 1
+
+    def writevto(self, addr, vector, stop=True):
+        device = self._device(addr)
+        if hasattr(device, "writev"):
+            device.writev(vector)
+        else:
+            device.write(b"".join(bytes(b) for b in vector))
+        self._transfer(sum(len(b) for b in vector))
+        return len(vector)
+
+    def readfrom(self, addr, n, stop=True):
+        self._device(addr)
+        return bytes(n)
+
+    def readfrom_mem(self, addr, memaddr, n, addrsize=8):
+        self._device(addr)
+        return bytes(n)
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self.writeto(addr, bytes([memaddr]) + bytes(buf))
+
+class SoftI2C(I2C):
+    def __init__(self, scl=None, sda=None, freq=100000, timeout=50000):
+        super().__init__(-1, scl, sda, freq, timeout)
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self.id = id
+        self.period_us = 0
+        self.mode = Timer.PERIODIC
+        self.callback = None
+        self.due_us = 0
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, period=-1, callback=None, freq=-1):
+        if freq > 0:
+            self.period_us = 1000000 // freq
+        else:
+            self.period_us = max(1, period) * 1000
+        self.mode = mode
+        self.callback = callback
+        clock = board.clock
+        self.due_us = clock.now_us + self.period_us
+        clock.add_timer(self)
+
+    def fire(self):
+        clock = board.clock
+        if self.mode == Timer.PERIODIC:
+            self.due_us += self.period_us
+        else:
+            clock.remove_timer(self)
+        if self.callback is not None:
+            self.callback(self)
+
+    def deinit(self):
+        board.clock.remove_timer(self)
+
+def disable_irq():
+    return 1
+
+def enable_irq(state=1):
+    pass
+
+def freq(hz=None):
+    return 240000000
+
+def idle():
+    board.clock.advance(100)
+
+def lightsleep(ms=0):
+    board.clock.sleep_ms(ms)
+
+def unique_id():
+    return b"\x00\x00\x00\x00\x00\x01"
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+def reset_cause():
+    return 1
@@ -0,0 +1,29 @@
+# MicroPython micropython 模組的模擬版本
+
+def const(value):
+    return value
+
+def native(f):
+    return f
+
+def viper(f):
+    return f
+
+def schedule(func, arg):
+    func(arg)
+    return True
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+def mem_info(verbose=False):
+    print("mem_info: (simulator)")
+
+def opt_level(level=None):
+    return 0
+
+def heap_lock():
+    return 0
+
+def heap_unlock():
+    return 0
@@ -0,0 +1,82 @@
+# 可腳本化的輸入訊號：每個訊號都是 f(毫秒) -> 數值
+# 用在 ADC 讀值（0~4095）或輸入腳位（0/1）
+import math
+
+def const(value):
+    return lambda t: value
+
+def step(before, after, at_ms):
+    return lambda t: before if t < at_ms else after
+
+def square(low, high, period_ms, duty=0.5):
+    on_ms = period_ms * duty
+    return lambda t: high if (t % period_ms) < on_ms else low
+
+def sine(center, amplitude, period_ms):
+    return lambda t: int(center + amplitude * math.sin(2 * math.pi * t / period_ms))
+
+def ramp(start, end, duration_ms):
+    def f(t):
+        if t >= duration_ms:
+            return end
+        return int(start + (end - start) * t / duration_ms)
+    return f
+
+def trace(points, default=0):
+    # points: [(開始毫秒, 數值), ...]，依時間排序，每段維持到下一個點
+    points = sorted(points)
+    def f(t):
+        value = default
+        for at, v in points:
+            if at > t:
+                break
+            value = v
+        return value
+    return f
+
+def noise(base, amplitude, seed=1):
+    # 固定種子的雜訊，同一時間點每次讀到的值都一樣
+    def f(t):
+        x = (int(t) * 1103515245 + seed * 12345) & 0x7FFFFFFF
+        x ^= x >> 13
+        x = (x * 1103515245 + 12345) & 0x7FFFFFFF
+        return base + (x % (2 * amplitude + 1)) - amplitude
+    return f
+
+def add(*signals):
+    return lambda t: sum(s(t) for s in signals)
+
+def clamp(signal, low=0, high=4095):
+    return lambda t: max(low, min(high, signal(t)))
+
+def parse(text):
+    """命令列格式：
+    2048                      定值
+    step:2048:4000:500        500 ms 時從 2048 跳到 4000
+    square:0:4095:1000        週期 1000 ms 的方波
+    sine:2048:1800:2000       中心 2048、振幅 1800、週期 2000 ms
+    ramp:0:4095:3000          3000 ms 內從 0 線性變到 4095
+    trace:0=2048,500=4000     在指定時間切換數值
+    noise:2048:50             雜訊
+    """
+    kind, _, rest = text.partition(":")
+    if not rest:
+        return const(int(kind))
+    if kind == "trace":
+        points = []
+        for item in rest.split(","):
+            at, value = item.split("=")
+            points.append((float(at), int(value)))
+        return trace(points)
+    args = [float(a) for a in rest.split(":")]
+    if kind == "step":
+        return step(int(args[0]), int(args[1]), args[2])
+    if kind == "square":
+        return square(int(args[0]), int(args[1]), *args[2:])
+    if kind == "sine":
+        return clamp(sine(*args))
+    if kind == "ramp":
+        return ramp(int(args[0]), int(args[1]), args[2])
+    if kind == "noise":
+        return clamp(noise(int(args[0]), int(args[1]), *[int(a) for a in args[2:]]))
+    raise ValueError("unknown signal: " + text)
@@ -0,0 +1,219 @@
+# ssd1306 驅動的模擬版本（介面和 micropython-lib 的 ssd1306.py 相同）
+# 驅動透過模擬的 I2C 送出命令和資料，由 Panel 解碼後寫進面板自己的顯示記憶體，
+# 所以擷取到的畫面就是實際會顯示在 OLED 上的內容
+from micropython import const
+import framebuf
+from sim.machine import board
+
+SET_CONTRAST = const(0x81)
+SET_ENTIRE_ON = const(0xA4)
+SET_NORM_INV = const(0xA6)
+SET_DISP = const(0xAE)
+SET_MEM_ADDR = const(0x20)
+SET_COL_ADDR = const(0x21)
+SET_PAGE_ADDR = const(0x22)
+SET_DISP_START_LINE = const(0x40)
+SET_SEG_REMAP = const(0xA0)
+SET_MUX_RATIO = const(0xA8)
+SET_IREF_SELECT = const(0xAD)
+SET_COM_OUT_DIR = const(0xC0)
+SET_DISP_OFFSET = const(0xD3)
+SET_COM_PIN_CFG = const(0xDA)
+SET_DISP_CLK_DIV = const(0xD5)
+SET_PRECHARGE = const(0xD9)
+SET_VCOM_DESEL = const(0xDB)
+SET_CHARGE_PUMP = const(0x8D)
+
+# 帶參數的命令：命令 -> 參數個數
+_CMD_ARGS = {
+    0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1, 0xAD: 1,
+    0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1,
+}
+
+class Panel:
+    """SSD1306 面板：解碼 I2C 命令，維護 128x64 的顯示記憶體"""
+    def __init__(self, width=128, height=64):
+        self.width = width
+        self.pages = height // 8
+        self.ram = bytearray(width * self.pages)
+        self.col = 0
+        self.page = 0
+        self.col_start = 0
+        self.col_end = width - 1
+        self.page_start = 0
+        self.page_end = self.pages - 1
+        self.on = False
+        self.inverted = False
+        self.contrast = 0x7F
+        self._cmd = None
+        self._args = []
+        self.data_bytes = 0
+        self.command_bytes = 0
+        self.frames = 0
+        self.on_frame = None  # 每次資料傳輸結束後呼叫 on_frame(panel)
+
+    def write(self, data):
+        self.writev((data,))
+
+    def writev(self, parts):
+        # 每個控制位元組：Co=1 表示後面只跟一個位元組，之後又是控制位元組；
+        # Co=0 表示這次傳輸剩下的全部都是資料（D/C#=1）或命令
+        control = None
+        data = commands = 0
+        for part in parts:
+            j = 0
+            n = len(part)
+            while j < n:
+                if control is None:
+                    control = part[j]
+                    j += 1
+                    continue
+                end = n if not control & 0x80 else j + 1
+                if control & 0x40:
+                    self._data_block(part, j, end)
+                    data += end - j
+                else:
+                    for k in range(j, end):
+                        self._command(part[k])
+                    commands += end - j
+                j = end
+                if control & 0x80:
+                    control = None
+        self.command_bytes += commands
+        if data:
+            self.data_bytes += data
+            self.frames += 1
+            hook = self.on_frame or board.on_frame
+            if hook is not None:
+                hook(self)
+
+    def _command(self, b):
+        if self._cmd is not None:
+            self._args.append(b)
+            if len(self._args) < _CMD_ARGS[self._cmd]:
+                return
+            cmd, args = self._cmd, self._args
+            self._cmd = None
+            self._args = []
+            if cmd == SET_COL_ADDR:
+                self.col_start, self.col_end = args
+                self.col = self.col_start
+            elif cmd == SET_PAGE_ADDR:
+                self.page_start, self.page_end = args
+                self.page = self.page_start
+            elif cmd == SET_CONTRAST:
+                self.contrast = args[0]
+            return
+        if b in _CMD_ARGS:
+            self._cmd = b
+            self._args = []
+        elif b & 0xFE == SET_DISP:
+            self.on = bool(b & 1)
+        elif b & 0xFE == SET_NORM_INV:
+            self.inverted = bool(b & 1)
+
+    def _data_block(self, data, start, end):
+        # 水平定址模式：寫完一欄往右，到視窗右邊換下一頁；一次複製一整段
+        view = memoryview(data)
+        while start < end:
+            take = min(self.col_end - self.col + 1, end - start)
+            if self.page < self.pages and self.col < self.width:
+                offset = self.page * self.width + self.col
+                self.ram[offset:offset + take] = view[start:start + take]
+            start += take
+            self.col += take
+            if self.col > self.col_end:
+                self.col = self.col_start
+                self.page = self.page_start if self.page >= self.page_end else self.page + 1
+
+    def pixel(self, x, y):
+        return (self.ram[(y >> 3) * self.width + x] >> (y & 7)) & 1
+
+    def snapshot(self):
+        return bytes(self.ram)
+
+class SSD1306(framebuf.FrameBuffer):
+    def __init__(self, width, height, external_vcc):
+        self.width = width
+        self.height = height
+        self.external_vcc = external_vcc
+        self.pages = self.height // 8
+        self.buffer = bytearray(self.pages * self.width)
+        super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
+        self.init_display()
+
+    def init_display(self):
+        for cmd in (
+            SET_DISP,
+            SET_MEM_ADDR, 0x00,
+            SET_DISP_START_LINE,
+            SET_SEG_REMAP | 0x01,
+            SET_MUX_RATIO, self.height - 1,
+            SET_COM_OUT_DIR | 0x08,
+            SET_DISP_OFFSET, 0x00,
+            SET_COM_PIN_CFG, 0x02 if self.width > 2 * self.height else 0x12,
+            SET_DISP_CLK_DIV, 0x80,
+            SET_PRECHARGE, 0x22 if self.external_vcc else 0xF1,
+            SET_VCOM_DESEL, 0x30,
+            SET_CONTRAST, 0xFF,
+            SET_ENTIRE_ON,
+            SET_NORM_INV,
+            SET_IREF_SELECT, 0x30,
+            SET_CHARGE_PUMP, 0x10 if self.external_vcc else 0x14,
+            SET_DISP | 0x01,
+        ):
+            self.write_cmd(cmd)
+        self.fill(0)
+        self.show()
+
+    def poweroff(self):
+        self.write_cmd(SET_DISP)
+
+    def poweron(self):
+        self.write_cmd(SET_DISP | 0x01)
+
+    def contrast(self, contrast):
+        self.write_cmd(SET_CONTRAST)
+        self.write_cmd(contrast)
+
+    def invert(self, invert):
+        self.write_cmd(SET_NORM_INV | (invert & 1))
+
+    def rotate(self, rotate):
+        self.write_cmd(SET_COM_OUT_DIR | ((rotate & 1) << 3))
+        self.write_cmd(SET_SEG_REMAP | (rotate & 1))
+
+    def show(self):
+        x0 = 0
+        x1 = self.width - 1
+        if self.width != 128:
+            col_offset = (128 - self.width) // 2
+            x0 += col_offset
+            x1 += col_offset
+        self.write_cmd(SET_COL_ADDR)
+        self.write_cmd(x0)
+        self.write_cmd(x1)
+        self.write_cmd(SET_PAGE_ADDR)
+        self.write_cmd(0)
+        self.write_cmd(self.pages - 1)
+        self.write_data(self.buffer)
+
+class SSD1306_I2C(SSD1306):
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
+        self.i2c = i2c
+        self.addr = addr
+        self.temp = bytearray(2)
+        self.write_list = [b"\x40", None]  # Co=0, D/C#=1
+        if addr not in board.i2c_devices:
+            board.i2c_devices[addr] = Panel(width, height)
+        self.panel = board.i2c_devices[addr]
+        super().__init__(width, height, external_vcc)
+
+    def write_cmd(self, cmd):
+        self.temp[0] = 0x80  # Co=1, D/C#=0
+        self.temp[1] = cmd
+        self.i2c.writeto(self.addr, self.temp)
+
+    def write_data(self, buf):
+        self.write_list[1] = buf
+        self.i2c.writevto(self.addr, self.write_list)
@@ -0,0 +1,267 @@
+# uasyncio 的模擬版本：排程器跑在虛擬時鐘上，
+# 所有任務都沒事做時直接把時間跳到下一個要醒來的任務
+import heapq
+import sys
+from collections import deque
+from sim.machine import board
+
+class CancelledError(BaseException):
+    pass
+
+class TimeoutError(Exception):
+    pass
+
+class _Sleep:
+    def __init__(self, us):
+        self.us = us
+
+    def __await__(self):
+        yield self
+
+class _Wait:
+    # 等待某個 Event 或 Task
+    def __init__(self, target):
+        self.target = target
+
+class Task:
+    def __init__(self, coro):
+        self.coro = coro
+        self.finished = False
+        self.result = None
+        self.exception = None
+        self.waiters = []
+        self.retrieved = False
+        self._throw = None
+
+    def done(self):
+        return self.finished
+
+    def cancel(self):
+        if self.finished:
+            return False
+        self._throw = CancelledError()
+        _loop.wake(self)
+        return True
+
+    def __await__(self):
+        if not self.finished:
+            yield _Wait(self)
+        self.retrieved = True
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+class Event:
+    def __init__(self):
+        self.state = False
+        self.waiters = []
+
+    def is_set(self):
+        return self.state
+
+    def set(self):
+        self.state = True
+        waiters, self.waiters = self.waiters, []
+        for task in waiters:
+            _loop.wake(task)
+
+    def clear(self):
+        self.state = False
+
+    async def wait(self):
+        if not self.state:
+            await _WaitAwaitable(self)
+        return True
+
+class ThreadSafeFlag(Event):
+    async def wait(self):
+        if not self.state:
+            await _WaitAwaitable(self)
+        self.state = False
+
+class _WaitAwaitable:
+    def __init__(self, target):
+        self.target = target
+
+    def __await__(self):
+        yield _Wait(self.target)
+
+class Lock:
+    def __init__(self):
+        self.locked_ = False
+        self.event = Event()
+
+    def locked(self):
+        return self.locked_
+
+    async def acquire(self):
+        while self.locked_:
+            self.event.clear()
+            await self.event.wait()
+        self.locked_ = True
+
+    def release(self):
+        self.locked_ = False
+        self.event.set()
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *args):
+        self.release()
+
+class Loop:
+    def __init__(self):
+        self.ready = deque()
+        self.sleeping = []
+        self.seq = 0
+        self.current = None
+
+    def clock(self):
+        return board.clock
+
+    def create_task(self, coro):
+        task = coro if isinstance(coro, Task) else Task(coro)
+        self.ready.append(task)
+        return task
+
+    def wake(self, task):
+        self.sleeping = [s for s in self.sleeping if s[2] is not task]
+        heapq.heapify(self.sleeping)
+        if task not in self.ready:
+            self.ready.append(task)
+
+    def _step(self, task):
+        self.current = task
+        try:
+            if task._throw is not None:
+                exc, task._throw = task._throw, None
+                request = task.coro.throw(exc)
+            else:
+                request = task.coro.send(None)
+        except StopIteration as e:
+            self._finish(task, e.value, None)
+            return
+        except CancelledError as e:
+            self._finish(task, None, e)
+            return
+        except Exception as e:
+            self._finish(task, None, e)
+            return
+        finally:
+            self.current = None
+        if isinstance(request, _Sleep):
+            if request.us <= 0:
+                self.ready.append(task)
+            else:
+                self.seq += 1
+                heapq.heappush(self.sleeping, (self.clock().now_us + request.us, self.seq, task))
+        elif isinstance(request, _Wait):
+            target = request.target
+            if isinstance(target, Task) and target.finished:
+                self.ready.append(task)
+            elif isinstance(target, Event) and target.state:
+                self.ready.append(task)
+            else:
+                target.waiters.append(task)
+        else:
+            self.ready.append(task)
+
+    def _finish(self, task, result, exception):
+        task.finished = True
+        task.result = result
+        task.exception = exception
+        for waiter in task.waiters:
+            self.wake(waiter)
+        if exception is not None and not task.waiters and not isinstance(exception, CancelledError):
+            # 和 uasyncio 一樣：沒人等待的任務出錯時印出來
+            print("Task exception wasn't retrieved", file=sys.stderr)
+            sys.excepthook(type(exception), exception, exception.__traceback__)
+
+    def run_until_complete(self, main):
+        if not isinstance(main, Task):
+            main = self.create_task(main)
+        clock = self.clock()
+        while not main.finished:
+            if self.ready:
+                self._step(self.ready.popleft())
+                continue
+            if self.sleeping:
+                wake_us = self.sleeping[0][0]
+                if wake_us > clock.now_us:
+                    clock.advance(wake_us - clock.now_us)
+                while self.sleeping and self.sleeping[0][0] <= clock.now_us:
+                    self.ready.append(heapq.heappop(self.sleeping)[2])
+                continue
+            if clock.timers or clock.watchers:
+                # 只剩計時器或中斷可能喚醒任務
+                clock.advance(1000)
+                continue
+            raise RuntimeError("all tasks are waiting and nothing can wake them")
+        main.retrieved = True
+        if main.exception is not None:
+            raise main.exception
+        return main.result
+
+    def run_forever(self):
+        forever = Event()
+        self.run_until_complete(forever.wait())
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+_loop = Loop()
+
+def get_event_loop():
+    return _loop
+
+def new_event_loop():
+    global _loop
+    _loop = Loop()
+    return _loop
+
+def create_task(coro):
+    return _loop.create_task(coro)
+
+def current_task():
+    return _loop.current
+
+def run(coro):
+    return _loop.run_until_complete(coro)
+
+def sleep_ms(ms):
+    return _Sleep(int(ms) * 1000)
+
+def sleep(seconds):
+    return _Sleep(int(seconds * 1000000))
+
+async def gather(*aws, return_exceptions=False):
+    tasks = [a if isinstance(a, Task) else create_task(a) for a in aws]
+    results = []
+    for task in tasks:
+        try:
+            results.append(await task)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
+
+async def wait_for_ms(aw, timeout_ms):
+    task = aw if isinstance(aw, Task) else create_task(aw)
+    clock = board.clock
+    deadline = clock.now_us + int(timeout_ms) * 1000
+    while not task.finished:
+        if clock.now_us >= deadline:
+            task.cancel()
+            raise TimeoutError()
+        await sleep_ms(1)
+    return await task
+
+async def wait_for(aw, timeout):
+    if timeout is None:
+        return await aw
+    return await wait_for_ms(aw, timeout * 1000)
@@ -0,0 +1,154 @@
+# 1 位元點陣圖（sprite）
+# - 點陣用字串寫（# 為亮點），開機時轉成 MONO_HLSB 的 framebuf.FrameBuffer，
+#   之後每幀只要一次 blit（C 實作），透明色 0 不會蓋掉背景
+# - 朝左的圖由朝右的左右翻轉產生，不用另外畫
+# - 平台寬度不固定，每種寬度第一次用到時畫好一張存起來（最多 PLATFORM_CACHE 種）
+import framebuf
+
+TRANSPARENT = 0
+PLATFORM_CACHE = 16
+
+class Sprite:
+    def __init__(self, width, height, buf):
+        self.width = width
+        self.height = height
+        self.buf = buf
+        self.fb = framebuf.FrameBuffer(buf, width, height, framebuf.MONO_HLSB)
+
+    def draw(self, target, x, y):
+        target.blit(self.fb, x, y, TRANSPARENT)
+
+def from_rows(rows):
+    """字串列表（每列一樣長）轉成 Sprite"""
+    width = len(rows[0])
+    stride = (width + 7) >> 3
+    buf = bytearray(stride * len(rows))
+    for y, row in enumerate(rows):
+        for x, ch in enumerate(row):
+            if ch == "#":
+                buf[y * stride + (x >> 3)] |= 0x80 >> (x & 7)
+    return Sprite(width, len(rows), buf)
+
+def mirror(sprite):
+    """左右翻轉"""
+    width = sprite.width
+    stride = (width + 7) >> 3
+    buf = bytearray(len(sprite.buf))
+    src = sprite.buf
+    for y in range(sprite.height):
+        base = y * stride
+        for x in range(width):
+            if src[base + (x >> 3)] & (0x80 >> (x & 7)):
+                mx = width - 1 - x
+                buf[base + (mx >> 3)] |= 0x80 >> (mx & 7)
+    return Sprite(width, sprite.height, buf)
+
+# ---- 馬里奧遊戲的圖 ----
+MARIO_STAND = (
+    "..###...",
+    ".######.",
+    ".##.#...",
+    ".#####..",
+    "..##....",
+    ".####...",
+    ".#..#...",
+    ".##.##..",
+)
+MARIO_WALK = (
+    "..###...",
+    ".######.",
+    ".##.#...",
+    ".#####..",
+    "..##....",
+    ".####...",
+    "##...#..",
+    "#....##.",
+)
+MARIO_JUMP = (
+    "..###..#",
+    ".######.",
+    ".##.#...",
+    ".#####..",
+    "#.##....",
+    ".####...",
+    "..#..#..",
+    ".##...#.",
+)
+COIN_FRAMES = (
+    (".##.",
+     "#..#",
+     "#..#",
+     ".##."),
+    (".#..",
+     ".#..",
+     ".#..",
+     ".#.."),
+)
+WALKER = (  # 敵人的圖依 entities 的種類排
+    "..####..",
+    ".######.",
+    "#.#..#.#",
+    "########",
+    ".######.",
+    "..#..#..",
+    ".##..##.",
+    "##....##",
+)
+FLYER = (
+    "#......#",
+    "##.##.##",
+    ".######.",
+    "..#..#..",
+    "..####..",
+    "...##...",
+    "........",
+    "........",
+)
+SHOT = (
+    "........",
+    "........",
+    "........",
+    "..####..",
+    "..####..",
+    "........",
+    "........",
+    "........",
+)
+BRICK = (  # 平台的花紋，寬度不夠時重複
+    "########",
+    "#...#...",
+    "#.#...#.",
+    "########",
+)
+
+class GameSprites:
+    """馬里奧遊戲用到的所有圖，建立一次之後重複使用"""
+    def __init__(self):
+        right = [from_rows(rows) for rows in (MARIO_STAND, MARIO_WALK, MARIO_JUMP)]
+        self.mario_right = right
+        self.mario_left = [mirror(s) for s in right]
+        self.coins = [from_rows(rows) for rows in COIN_FRAMES]
+        # 依 entities 的種類編號（FREE 不用畫），直接給 Entities.draw() 用
+        self.enemies = [None] + [from_rows(rows).fb for rows in (WALKER, FLYER, SHOT)]
+        self.platforms = {}  # 寬度 -> Sprite
+
+    def mario(self, mario):
+        """依方向、是否在空中和走過的距離選一張"""
+        frames = self.mario_right if mario.facing_right else self.mario_left
+        if mario.is_jumping:
+            return frames[2].fb
+        return frames[(mario.x >> 2) & 1].fb
+
+    def coin(self, tick):
+        return self.coins[(tick >> 3) & 1].fb
+
+    def platform(self, width):
+        sprite = self.platforms.get(width)
+        if sprite is None:
+            if len(self.platforms) >= PLATFORM_CACHE:
+                self.platforms.clear()
+            rows = [(row * (width // len(row) + 1))[:width] for row in BRICK]
+            rows = [row[:-1] + "#" for row in rows]  # 右邊收邊
+            sprite = from_rows(rows)
+            self.platforms[width] = sprite
+        return sprite.fb
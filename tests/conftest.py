@@ -0,0 +1,24 @@
+# 測試共用的設定：把專案根目錄加進 sys.path，並提供模擬器的虛擬時鐘
+#   python -m pytest tests
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import sim  # noqa: E402
+
+@pytest.fixture
+def clock(request):
+    """裝上模擬器並重新 import 專案模組（拿到虛擬的 ticks_ms），回傳虛擬時鐘；
+    測試模組裡的 CPU_SCALE 是電腦上計算時間算進虛擬時間的倍數（預設 0，不算）"""
+    clock = sim.install(cpu_scale=getattr(request.module, "CPU_SCALE", 0))
+    sim.forget_modules(ROOT)
+    try:
+        yield clock
+    finally:
+        sim.uninstall()
+        sim.forget_modules(ROOT)
@@ -0,0 +1,37 @@
+# 按鈕事件：在模擬器裡用腳位訊號按下放開，主迴圈每 20 ms 呼叫一次 update()
+#   python -m pytest tests
+from sim import signals
+from sim.machine import board
+
+PIN = 27
+PERIOD_MS = 20
+
+def events(clock, pressed, until_ms, period_ms=PERIOD_MS):
+    """pressed：[(開始毫秒, 結束毫秒), ...] 按住的時間；回傳 until_ms 之前的事件種類"""
+    from machine import Pin
+    from button import Button, ButtonQueue, NAMES
+    points = [(0, 1)]
+    for start, end in pressed:
+        points += [(start, 0), (end, 1)]
+    board.set_pin(PIN, signals.trace(points))
+    queue = ButtonQueue()
+    Button(Pin(PIN, Pin.IN, Pin.PULL_UP), queue, 1)
+    kinds = []
+    while clock.millis() < until_ms:
+        clock.sleep_ms(period_ms)
+        queue.update()
+        event = queue.get()
+        while event is not None:
+            kinds.append(NAMES[event[1]])
+            event = queue.get()
+    return kinds
+
+def test_short_press_clicks(clock):
+    assert events(clock, [(100, 300)], 600) == ["PRESS", "RELEASE", "CLICK"]
+
+def test_long_press_does_not_click(clock):
+    assert events(clock, [(100, 1500)], 2000) == ["PRESS", "LONG_PRESS", "RELEASE"]
+
+def test_long_press_seen_only_on_release(clock):
+    # 主迴圈忙到放開之後才呼叫 update()：放開時補送長按，不是 CLICK
+    assert events(clock, [(100, 1200)], 3000, period_ms=1300) == ["PRESS", "RELEASE", "LONG_PRESS"]
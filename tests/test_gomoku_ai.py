@@ -0,0 +1,42 @@
+# 五子棋電腦的時間預算：在模擬器裡跑（電腦上的計算時間乘上 CPU_SCALE 算進虛擬時間），
+# 每次 think() 不能超過時間片太多，整步也不能超過預算太多
+#   python -m pytest tests
+CPU_SCALE = 10   # 板子大約比電腦慢這麼多倍（conftest.py 的 clock 會用到）
+SLICE_MS = 50    # 和 joystickcrea.py 的 AI_SLICE_MS 相同
+BUDGET_MS = 1500
+SLACK_MS = 25    # 檢查時間之間最多多跑一個節點
+
+def midgame_ai():
+    from gomoku_board import BitBoard
+    from gomoku_ai import GomokuAI
+    board = BitBoard(15)
+    for i, (x, y) in enumerate(((7, 7), (8, 8), (7, 8), (8, 7), (6, 9), (9, 6))):
+        board.place_stone(x, y, 1 + i % 2)
+    return GomokuAI(board, budget_ms=BUDGET_MS)
+
+def test_think_stays_within_slice(clock):
+    ai = midgame_ai()
+    ai.start(1)
+    start = clock.now_us
+    slices = []
+    move = None
+    while move is None:
+        before = clock.now_us
+        move = ai.think(SLICE_MS)
+        slices.append((clock.now_us - before) / 1000)
+    total = (clock.now_us - start) / 1000
+    assert max(slices) <= SLICE_MS + SLACK_MS, slices
+    assert total <= BUDGET_MS + SLACK_MS
+    assert len(slices) > 1  # 預算比時間片長，一定要分好幾次
+
+def test_full_board_has_no_move(clock):
+    ai = midgame_ai()
+    board = ai.board
+    assert ai.choose_move(1) is not None
+    for y in range(board.size):
+        for x in range(board.size):
+            if not board.get(x, y):
+                board.place_stone(x, y, 1 + (x + y) % 2)
+    # 不能回傳上一次想出來的（已經有棋子的）位置
+    from gomoku_ai import NO_MOVE
+    assert ai.choose_move(2) == NO_MOVE
@@ -0,0 +1,20 @@
+# 關卡檔檢查：python -m tools.levels 打包之前要擋下的錯誤
+#   python -m pytest tests
+from tools import levels
+
+LEVEL = "level\ncoin 40 30\n"
+
+def errors(text):
+    return levels.validate(levels.parse(LEVEL + text))[0]
+
+def test_patrol_inside_level():
+    assert errors("walker 10 42 0 100\n") == []
+
+def test_patrol_starts_outside_level():
+    assert len(errors("walker 10 42 -5 100\n")) == 1
+
+def test_patrol_ends_outside_level():
+    assert len(errors("walker 10 42 0 9999\n")) == 1
+
+def test_patrol_must_contain_enemy():
+    assert len(errors("walker 10 42 0 12\n")) == 1
@@ -0,0 +1,113 @@
+# 不會卡住主迴圈的蜂鳴器音序器
+# 音符先放進佇列，由硬體計時器回呼或 asyncio 任務逐一播放
+from array import array
+from machine import Timer
+from compat import ticks_ms, ticks_diff, ticks_add
+
+# MicroPython 的 uasyncio（有 sleep_ms；電腦上由模擬器 sim/uasyncio.py 提供），不退回 CPython 的 asyncio
+import uasyncio as asyncio
+
+NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+def note_freq(name):
+    # "A4" -> 440，"C#5" -> 554；"R" 代表休止
+    if name == "R":
+        return 0
+    semitone = NOTE_NAMES.index(name[:-1]) + (int(name[-1]) + 1) * 12
+    return int(440 * 2 ** ((semitone - 69) / 12) + 0.5)
+
+def parse(text):
+    # 旋律格式："音名:毫秒" 以空白分隔，例如 "A4:50 C5:50 R:100"
+    # 也可直接寫頻率，例如 "1000:30"
+    melody = []
+    for item in text.split():
+        name, ms = item.split(":")
+        freq = int(name) if name.isdigit() else note_freq(name)
+        melody.append((freq, int(ms)))
+    return tuple(melody)
+
+# 內建音效
+MOVE_MELODY = parse("A4:50 C5:50 E5:50")  # 落子音效：上升的音階
+WIN_MELODY = parse("C5:100 E5:100 G5:100 C6:200 R:100 C6:200 C6:200")  # 獲勝音效
+
+class ToneSequencer:
+    """把 (頻率, 毫秒) 音符排進佇列，不用 sleep 就能播放"""
+    def __init__(self, pwm, queue_size=32, volume=512):
+        self.pwm = pwm
+        self.volume = volume
+        self.size = queue_size
+        self.freqs = array('H', [0] * queue_size)
+        self.lengths = array('H', [0] * queue_size)
+        self.head = 0  # 下一個要播的音符
+        self.tail = 0  # 下一個空位
+        self.playing = False
+        self.note_end = 0
+        self.timer = None
+        self.wake = None  # asyncio 模式下，有新音符時喚醒 run()
+        self._tick_cb = self._tick  # 預先綁定，避免計時器回呼時配置記憶體
+
+    def play(self, melody, interrupt=False):
+        # 排入一段旋律；interrupt=True 會先停掉正在播的
+        if interrupt:
+            self.stop()
+        for freq, ms in melody:
+            nxt = (self.tail + 1) % self.size
+            if nxt == self.head:
+                break  # 佇列滿了，丟掉剩下的音符
+            self.freqs[self.tail] = freq
+            self.lengths[self.tail] = ms
+            self.tail = nxt
+        if self.wake is not None:
+            self.wake.set()
+
+    def stop(self):
+        self.head = self.tail
+        self.playing = False
+        self.pwm.duty(0)
+
+    def busy(self):
+        return self.playing or self.head != self.tail
+
+    def update(self):
+        # 檢查目前的音符是否播完，播完就換下一個
+        now = ticks_ms()
+        if self.playing and ticks_diff(now, self.note_end) < 0:
+            return
+        if self.head == self.tail:
+            if self.playing:
+                self.playing = False
+                self.pwm.duty(0)  # 停止發聲
+            return
+        freq = self.freqs[self.head]
+        self.note_end = ticks_add(now, self.lengths[self.head])
+        self.head = (self.head + 1) % self.size
+        if freq:
+            self.pwm.freq(freq)
+            self.pwm.duty(self.volume)
+        else:
+            self.pwm.duty(0)  # 休止
+        self.playing = True
+
+    def _tick(self, timer):
+        self.update()
+
+    def start_timer(self, timer_id=0, period_ms=5):
+        # 用硬體計時器定期推進音序
+        self.timer = Timer(timer_id)
+        self.timer.init(period=period_ms, mode=Timer.PERIODIC, callback=self._tick_cb)
+
+    def stop_timer(self):
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+
+    async def run(self):
+        # asyncio 版本：當作任務執行，只在換音符時醒來，沒有聲音時等待 play()
+        self.wake = asyncio.Event()
+        while True:
+            self.update()
+            if self.playing:
+                await asyncio.sleep_ms(max(1, ticks_diff(self.note_end, ticks_ms())))
+            else:
+                self.wake.clear()
+                await self.wake.wait()
@@ -0,0 +1,5 @@
+# 在電腦上使用的工具（不用上傳到板子）
+#   python -m tools.levels   關卡文字檔和 levels.bin 的轉換、檢查
+#   python -m tools.replay   馬里奧遊戲錄製檔的重播、比對和重播速度
+#   python -m tools.build    把板子上用的模組預先編譯成 .mpy（需要 mpy-cross）
+#   python -m tools.floats   數馬里奧物理每一步產生幾個浮點數，比較不同的 git 版本
@@ -0,0 +1,122 @@
+# 把板子上用的模組預先編譯成 .mpy（在電腦上執行，需要和板子上 MicroPython 同版本的 mpy-cross）
+#   python -m tools.build                          編譯五支程式 import 到的所有模組，放到 build/
+#   python -m tools.build --app joystickfinal      程式本身也編譯，另外產生開機時執行它的 main.py
+#   python -m tools.build --list                   只列出會編譯哪些模組
+# 板子上 import .mpy 不用再解析和編譯原始碼（mario、gomoku_ai 這種大模組在 ESP32 上要幾百毫秒），
+# 編譯時也不會佔用一大塊 RAM。把 build/ 裡的檔案複製到板子的根目錄（例如 mpremote cp build/* :），
+# 並刪掉板子上同名的 .py：兩個都在的時候 MicroPython 會先載入 .py。
+# display.py 用了 @micropython.viper，要用 --march 指定晶片（ESP32 是 xtensawin）。
+# 要編譯的模組從各程式的 import 一路找下去，只包含專案根目錄裡的模組
+import argparse
+import ast
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APPS = ("初二信37賴承熹_joystick_X", "初二信37賴承熹_joystick_Xy", "初二信37賴承熹_joystick_extra",
+        "joystickfinal", "joystickcrea")
+
+MAIN = """# 由 tools/build.py 產生：開機時執行預先編譯的 {app}.mpy
+app = __import__("{app}")
+if hasattr(app, "main"):
+    app.main()
+"""
+
+class BuildError(Exception):
+    pass
+
+def imports(name):
+    """模組 name 直接 import 的專案模組"""
+    path = os.path.join(ROOT, name + ".py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for module in names:
+            module = module.split(".")[0]
+            if os.path.exists(os.path.join(ROOT, module + ".py")):
+                found.add(module)
+    return found
+
+def modules(apps):
+    """apps 用到的所有專案模組（不含 apps 本身），依名稱排序"""
+    seen = set()
+    todo = list(apps)
+    while todo:
+        for module in imports(todo.pop()):
+            if module not in seen:
+                seen.add(module)
+                todo.append(module)
+    return sorted(seen - set(apps))
+
+def compiler():
+    """mpy-cross 的命令：PATH 上的執行檔，或 pip install mpy-cross 裝的模組"""
+    path = shutil.which("mpy-cross")
+    if path:
+        return [path]
+    if importlib.util.find_spec("mpy_cross") is not None:
+        return [sys.executable, "-m", "mpy_cross"]
+    raise BuildError("找不到 mpy-cross（pip install mpy-cross，版本要和板子上的 MicroPython 相同）")
+
+def compile_module(command, name, output, march):
+    source = os.path.join(ROOT, name + ".py")
+    target = os.path.join(output, name + ".mpy")
+    args = command + ["-o", target, "-s", name + ".py"]
+    if march:
+        args.append("-march=" + march)
+    done = subprocess.run(args + [source], capture_output=True, text=True)
+    if done.returncode:
+        raise BuildError("%s 編譯失敗：%s" % (name, (done.stderr or done.stdout).strip()))
+    return os.path.getsize(source), os.path.getsize(target)
+
+def build(output, app=None, march="xtensawin"):
+    """編譯到 output，回傳 [(模組, .py 大小, .mpy 大小)]"""
+    names = modules([app] if app else APPS)
+    if app:
+        names.append(app)
+    command = compiler()
+    os.makedirs(output, exist_ok=True)
+    results = [(name,) + compile_module(command, name, output, march) for name in names]
+    main = os.path.join(output, "main.py")
+    if app:
+        with open(main, "w", encoding="utf-8") as f:
+            f.write(MAIN.format(app=app))
+    elif os.path.exists(main):
+        os.remove(main)  # 上一次 --app 留下的
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.build", description="預先編譯成 .mpy")
+    parser.add_argument("--output", default=os.path.join(ROOT, "build"), help="輸出目錄")
+    parser.add_argument("--app", choices=APPS, help="也編譯這支程式，並產生執行它的 main.py")
+    parser.add_argument("--march", default="xtensawin",
+                        help="晶片架構（viper/native 程式碼需要），空字串表示不指定")
+    parser.add_argument("--list", action="store_true", help="只列出要編譯的模組")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in modules([args.app] if args.app else APPS):
+            print(name)
+        return 0
+    try:
+        results = build(args.output, args.app, args.march)
+    except BuildError as e:
+        print("錯誤：%s" % e, file=sys.stderr)
+        return 1
+    for name, source, target in results:
+        print("%-32s %6d -> %6d bytes" % (name, source, target))
+    print("%d 個模組 -> %s" % (len(results), args.output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# 數馬里奧物理每一步產生幾個浮點數（在電腦上執行，可以指定 git 版本，比較改版前後）
+#   python -m tools.floats                 目前的工作目錄
+#   python -m tools.floats 5d8396a .       舊版本（浮點數物理）和目前的版本
+# 跑的是 physbench.py 的 run()：物理、收集金幣、鏡頭和載入段落，不含繪圖。
+# MicroPython（ESP32）的每個浮點數運算結果都要在 heap 配置一個物件，一個物件占一個 16 位元組的
+# GC 區塊；CPython 會重複使用浮點數物件，量不到 heap 的差別，所以這裡改成數運算結果的個數：
+# 把 mario 模組裡是浮點數的常量（GRAVITY 等）換成會計數的 float 子類別，
+# 從它們算出來的結果也是這個子類別，每產生一個就加一。
+# 程式碼裡其他地方產生的浮點數（浮點數字面值、整數的 / 除法）不會被數到，兩個版本的物理都沒有
+# 每個版本在自己的 python 行程裡跑（舊版本用 git archive 取出到暫存目錄，配上目前的 physbench.py）；
+# 時間是電腦上另外跑一次、不計數時的時間，只能比較兩個版本，不代表板子上的速度
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from time import perf_counter_ns
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLOAT_BYTES = 16  # ESP32 上一個浮點數物件（型別指標 + double）占的 GC 區塊
+STEPS_PER_S = 50  # mario.STEP_MS = 20
+CONSTANTS = ("GRAVITY", "JUMP_FORCE", "MOVE_SPEED")
+
+class Counted(float):
+    """運算結果也是 Counted 的 float，每產生一個 count 加一"""
+    count = 0
+
+def _counting(name):
+    op = getattr(float, name)
+
+    def method(self, *args):
+        result = op(self, *args)
+        if type(result) is float:
+            Counted.count += 1
+            return Counted(result)
+        return result
+    return method
+
+for _name in ("__add__", "__radd__", "__sub__", "__rsub__", "__mul__", "__rmul__",
+              "__truediv__", "__rtruediv__", "__floordiv__", "__rfloordiv__",
+              "__mod__", "__rmod__", "__neg__", "__pos__", "__abs__"):
+    setattr(Counted, _name, _counting(_name))
+
+def measure(path, levels_path):
+    """在目前的行程裡量 path 目錄的版本，回傳 [(關卡, 浮點數/步, 電腦上 us/步)]"""
+    sys.path.insert(0, path)
+    import mario
+    import physbench
+    from levelfile import LevelFile
+    levels = LevelFile(levels_path)
+    originals = {name: getattr(mario, name) for name in CONSTANTS}
+    results = []
+    for number in range(1, levels.count + 1):
+        level = levels.load(number)
+        physbench.run(level, 10)  # 和 physbench 一樣先跑幾步
+        level = levels.load(number)
+        start = perf_counter_ns()
+        physbench.run(level, physbench.STEPS)
+        ns = perf_counter_ns() - start
+        for name, value in originals.items():
+            if isinstance(value, float):
+                setattr(mario, name, Counted(value))
+        level = levels.load(number)
+        Counted.count = 0
+        physbench.run(level, physbench.STEPS)
+        for name, value in originals.items():
+            setattr(mario, name, value)
+        results.append((number, Counted.count / physbench.STEPS, ns / 1000 / physbench.STEPS))
+    return results
+
+def export(revision, directory):
+    """把 revision 的檔案取出到 directory，再放進目前的 physbench.py"""
+    archive = subprocess.run(["git", "archive", revision], cwd=ROOT, capture_output=True)
+    if archive.returncode:
+        raise SystemExit("git archive %s 失敗：%s" % (revision, archive.stderr.decode().strip()))
+    subprocess.run(["tar", "-x", "-C", directory], input=archive.stdout, check=True)
+    shutil.copy(os.path.join(ROOT, "physbench.py"), directory)
+
+def run_revision(revision):
+    """在另一個行程裡量 revision（"." 是工作目錄），回傳 measure() 的結果"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = ROOT
+        if revision != ".":
+            export(revision, directory)
+            path = directory
+        done = subprocess.run([sys.executable, "-m", "tools.floats", "--measure", path],
+                              cwd=ROOT, capture_output=True, text=True)
+    if done.returncode:
+        raise SystemExit("%s 量測失敗：\n%s" % (revision, done.stderr.strip()))
+    return [tuple(float(v) for v in line.split()) for line in done.stdout.splitlines()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.floats",
+                                     description="數馬里奧物理每一步產生幾個浮點數")
+    parser.add_argument("revisions", nargs="*", default=["."],
+                        help="git 版本，\".\" 是工作目錄（預設）")
+    parser.add_argument("--measure", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        os.chdir(args.measure)
+        for number, floats, us in measure(args.measure, "levels.bin"):
+            print(number, floats, us)
+        return 0
+    print("%-10s %4s  %8s  %8s  %7s  %7s" % ("版本", "關卡", "浮點數/步", "bytes/步", "KB/s", "us/步"))
+    for revision in args.revisions:
+        for number, floats, us in run_revision(revision):
+            size = floats * FLOAT_BYTES
+            print("%-10s %4d  %8.2f  %8.1f  %7.2f  %7.2f" % (
+                revision, number, floats, size, size * STEPS_PER_S / 1024, us))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+# 馬里奧關卡檔工具
+#   python -m tools.levels build levels.txt -o levels.bin   文字定義轉成板子用的 levels.bin
+#   python -m tools.levels check levels.txt levels.bin      檢查（.bin 會用板子上的讀取程式逐關載入）
+#   python -m tools.levels dump levels.bin                  把 levels.bin 轉回文字
+# 文字格式見 levels.txt；格式定義在 levelfile.py
+import argparse
+import os
+import struct
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import entities  # noqa: E402  （要先把專案根目錄加進 sys.path）
+import levelfile  # noqa: E402
+from mario import SCREEN_WIDTH, GROUND_HEIGHT, PLATFORM_HEIGHT, COIN_SIZE, FP_SHIFT  # noqa: E402
+
+MAX_U16 = 0xFFFF
+ENEMY_KINDS = {"walker": entities.WALKER, "flyer": entities.FLYER}
+ENEMY_NAMES = {kind: name for name, kind in ENEMY_KINDS.items()}
+
+class LevelError(ValueError):
+    pass
+
+class LevelDef:
+    def __init__(self, line, width=SCREEN_WIDTH):
+        self.line = line
+        self.width = width
+        self.platforms = []  # (x, y, 寬, 行號)
+        self.coins = []      # (x, y, 行號)
+        self.enemies = []    # (種類, x, y, 速度, lo, hi, 行號)
+
+def parse(text, name="<levels>"):
+    """解析文字格式，回傳 LevelDef 的 list；格式錯誤丟出 LevelError"""
+    levels = []
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.split("#", 1)[0].split()
+        if not line:
+            continue
+        where = "%s:%d" % (name, number)
+        kind, args = line[0], line[1:]
+        try:
+            values = [int(v) for v in args]
+        except ValueError:
+            raise LevelError("%s: 座標必須是整數: %s" % (where, raw.strip()))
+        if kind == "level" and len(values) <= 1:
+            levels.append(LevelDef(number, *values))
+        elif kind == "platform" and len(values) == 3:
+            if not levels:
+                raise LevelError("%s: 第一個 level 之前不能有物件" % where)
+            levels[-1].platforms.append((values[0], values[1], values[2], number))
+        elif kind == "coin" and len(values) == 2:
+            if not levels:
+                raise LevelError("%s: 第一個 level 之前不能有物件" % where)
+            levels[-1].coins.append((values[0], values[1], number))
+        elif kind in ENEMY_KINDS and len(values) in (4, 5):
+            # walker/flyer x y lo hi [速度]：在 lo~hi 之間巡邏，速度預設 1（負數先往左）
+            if not levels:
+                raise LevelError("%s: 第一個 level 之前不能有物件" % where)
+            speed = values[4] if len(values) == 5 else 1
+            levels[-1].enemies.append((ENEMY_KINDS[kind], values[0], values[1], speed,
+                                       values[2], values[3], number))
+        else:
+            raise LevelError("%s: 看不懂這一行: %s" % (where, raw.strip()))
+    return levels
+
+def _overlap(ax, ay, aw, ah, bx, by, bw, bh):
+    return ax < bx + bw and ax + aw > bx and ay < by + bh and ay + ah > by
+
+def validate(levels, name="<levels>"):
+    """回傳 (錯誤, 警告)，都是訊息的 list"""
+    errors = []
+    warnings = []
+    if not levels:
+        errors.append("%s: 沒有任何關卡" % name)
+    if len(levels) > MAX_U16:
+        errors.append("%s: 關卡太多" % name)
+    for i, level in enumerate(levels, 1):
+        where = "%s:%d（第 %d 關）" % (name, level.line, i)
+        if not SCREEN_WIDTH <= level.width <= MAX_U16:
+            errors.append("%s: 寬度必須在 %d~%d 之間" % (where, SCREEN_WIDTH, MAX_U16))
+        if not level.coins:
+            errors.append("%s: 沒有金幣，一開始就會過關" % where)
+        if len(level.platforms) > MAX_U16 or len(level.coins) > MAX_U16 or len(level.enemies) > MAX_U16:
+            errors.append("%s: 物件太多" % where)
+        for x, y, w, line in level.platforms:
+            at = "%s:%d" % (name, line)
+            if not 1 <= w <= levelfile.SEGMENT_WIDTH:
+                errors.append("%s: 平台寬度必須在 1~%d 之間" % (at, levelfile.SEGMENT_WIDTH))
+            if x < 0 or x + w > level.width:
+                errors.append("%s: 平台超出關卡左右邊界" % at)
+            if y < 0 or y + PLATFORM_HEIGHT > GROUND_HEIGHT:
+                errors.append("%s: 平台必須在地面（y=%d）以上" % (at, GROUND_HEIGHT))
+        for x, y, line in level.coins:
+            at = "%s:%d" % (name, line)
+            if x < 0 or x + COIN_SIZE > level.width:
+                errors.append("%s: 金幣超出關卡左右邊界" % at)
+            if y < 0 or y + COIN_SIZE > GROUND_HEIGHT:
+                errors.append("%s: 金幣必須在地面（y=%d）以上" % (at, GROUND_HEIGHT))
+            for px, py, pw, _ in level.platforms:
+                if _overlap(x, y, COIN_SIZE, COIN_SIZE, px, py, pw, PLATFORM_HEIGHT):
+                    warnings.append("%s: 金幣和平台重疊，可能拿不到" % at)
+                    break
+        size = entities.ENEMY_SIZE
+        for _, x, y, speed, lo, hi, line in level.enemies:
+            at = "%s:%d" % (name, line)
+            if not (0 <= lo <= x and x + size <= hi <= level.width):
+                errors.append("%s: 巡邏範圍必須在關卡內並包含敵人" % at)
+            if y < 0 or y + size > GROUND_HEIGHT:
+                errors.append("%s: 敵人必須在地面（y=%d）以上" % (at, GROUND_HEIGHT))
+            if not -127 <= speed <= 127:
+                errors.append("%s: 速度必須在 -127~127 之間" % at)
+    return errors, warnings
+
+def pack(levels):
+    """把 LevelDef 轉成 levels.bin 的內容"""
+    seg_width = levelfile.SEGMENT_WIDTH
+    blocks = []   # 每關 (關卡檔頭, [段落資料, ...])
+    max_platforms = max_coins = max_size = max_enemies = 0
+    for level in levels:
+        count = (level.width + seg_width - 1) // seg_width
+        platforms = [[] for _ in range(count)]
+        coins = [[] for _ in range(count)]
+        for x, y, w, _ in level.platforms:
+            platforms[min(x // seg_width, count - 1)].append((x, y, w))
+        for x, y, _ in level.coins:
+            coins[min(x // seg_width, count - 1)].append((x, y))
+        segments = []
+        first_coin = 0
+        for seg_platforms, seg_coins in zip(platforms, coins):
+            parts = [struct.pack(levelfile.SEGMENT, first_coin, len(seg_platforms), len(seg_coins))]
+            parts.extend(struct.pack(levelfile.PLATFORM, *p) for p in seg_platforms)
+            parts.extend(struct.pack(levelfile.COIN, *c) for c in seg_coins)
+            segments.append(b"".join(parts))
+            first_coin += len(seg_coins)
+            max_platforms = max(max_platforms, len(seg_platforms))
+            max_coins = max(max_coins, len(seg_coins))
+        head = struct.pack(levelfile.LEVEL, level.width, count, len(level.coins), len(level.enemies))
+        enemies = b"".join(struct.pack(levelfile.ENTITY, kind, x, y, speed, lo, hi)
+                           for kind, x, y, speed, lo, hi, _ in level.enemies)
+        max_size = max(max_size, len(head) + levelfile.INDEX_SIZE * count + len(enemies),
+                       *map(len, segments))
+        max_enemies = max(max_enemies, len(level.enemies))
+        blocks.append((head, segments, enemies))
+    if max_size > MAX_U16:
+        raise LevelError("單一段落的資料超過 %d bytes" % MAX_U16)
+    header = struct.pack(levelfile.HEADER, levelfile.MAGIC, len(levels), max_platforms,
+                         max_coins, max_size, max(len(l.coins) for l in levels), max_enemies)
+    # 先排所有關卡檔頭（含段落索引和敵人），再排段落資料
+    offset = levelfile.HEADER_SIZE + levelfile.INDEX_SIZE * len(blocks)
+    heads = []
+    for head, segments, enemies in blocks:
+        size = len(head) + levelfile.INDEX_SIZE * len(segments) + len(enemies)
+        heads.append((offset, size))
+        offset += size
+    out = [header]
+    out.extend(struct.pack(levelfile.INDEX, position, size) for position, size in heads)
+    for head, segments, enemies in blocks:
+        out.append(head)
+        for segment in segments:
+            out.append(struct.pack(levelfile.INDEX, offset, len(segment)))
+            offset += len(segment)
+        out.append(enemies)
+    for _, segments, _ in blocks:
+        out.extend(segments)
+    return b"".join(out)
+
+def unpack(path):
+    """用板子上的讀取程式逐關載入，鏡頭從頭掃到尾收集所有段落的物件，轉回 LevelDef"""
+    reader = levelfile.LevelFile(path)
+    levels = []
+    for number in range(1, reader.count + 1):
+        level = reader.load(number)
+        result = LevelDef(number, level.width)
+        store = level.entities  # 載入後還沒走動，就是關卡檔裡的位置
+        result.enemies = [(store.kind[i], store.x[i], store.fy[i] >> FP_SHIFT, store.vx[i],
+                           store.lo[i], store.hi[i], number) for i in range(store.top)]
+        seen = set()
+        for x in range(0, level.width, levelfile.SEGMENT_WIDTH):
+            level.follow(x)
+            for slot in level.slots:
+                if slot.number < 0 or slot.number in seen:
+                    continue
+                seen.add(slot.number)
+                result.platforms.extend((slot.number, p.x, p.y, p.width)
+                                        for p in slot.platforms[:slot.n_platforms])
+                result.coins.extend((slot.number, c.x, c.y) for c in slot.coins[:slot.n_coins])
+        # 依段落排序後去掉段落編號，順序和 pack 寫入的一樣
+        result.platforms = [p[1:] + (number,) for p in sorted(result.platforms, key=lambda p: p[0])]
+        result.coins = [c[1:] + (number,) for c in sorted(result.coins, key=lambda c: c[0])]
+        levels.append(result)
+    return levels
+
+def segment_order(levels):
+    """依段落重新排列物件（和 levels.bin 裡的順序相同），用來比較"""
+    seg_width = levelfile.SEGMENT_WIDTH
+    for level in levels:
+        last = (level.width - 1) // seg_width
+        level.platforms.sort(key=lambda p: min(p[0] // seg_width, last))
+        level.coins.sort(key=lambda c: min(c[0] // seg_width, last))
+    return levels
+
+def to_text(levels):
+    lines = []
+    for i, level in enumerate(levels, 1):
+        lines.append("# 第 %d 關" % i)
+        lines.append("level" if level.width == SCREEN_WIDTH else "level %d" % level.width)
+        lines.extend("platform %d %d %d" % p[:3] for p in level.platforms)
+        lines.extend("coin %d %d" % c[:2] for c in level.coins)
+        for kind, x, y, speed, lo, hi, _ in level.enemies:
+            line = "%s %d %d %d %d" % (ENEMY_NAMES[kind], x, y, lo, hi)
+            lines.append(line if speed == 1 else line + " %d" % speed)
+        lines.append("")
+    return "\n".join(lines)
+
+def load(path):
+    if path.endswith(".bin"):
+        return unpack(path)
+    with open(path, encoding="utf-8") as f:
+        return parse(f.read(), path)
+
+def report(levels, name):
+    errors, warnings = validate(levels, name)
+    for message in warnings:
+        print("警告：" + message, file=sys.stderr)
+    for message in errors:
+        print("錯誤：" + message, file=sys.stderr)
+    return not errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.levels", description="馬里奧關卡檔工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="文字定義轉成 levels.bin")
+    build.add_argument("source")
+    build.add_argument("-o", "--output", help="輸出檔（預設和來源同名，副檔名 .bin）")
+    check = sub.add_parser("check", help="檢查文字定義或 levels.bin")
+    check.add_argument("files", nargs="+")
+    dump = sub.add_parser("dump", help="把 levels.bin 轉回文字")
+    dump.add_argument("file")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            levels = load(args.source)
+            if not report(levels, args.source):
+                return 1
+            data = pack(levels)
+            output = args.output or os.path.splitext(args.source)[0] + ".bin"
+            with open(output, "wb") as f:
+                f.write(data)
+            # 寫完用讀取程式載入一次，確認和來源一樣
+            if to_text(unpack(output)) != to_text(segment_order(levels)):
+                print("錯誤：%s 讀回來的內容和來源不同" % output, file=sys.stderr)
+                return 1
+            print("%s：%d 關，%d bytes" % (output, len(levels), len(data)))
+        elif args.command == "check":
+            ok = True
+            for path in args.files:
+                levels = load(path)
+                ok = report(levels, path) and ok
+                print("%s：%d 關，平台 %d 個，金幣 %d 個，敵人 %d 個" % (
+                    path, len(levels), sum(len(l.platforms) for l in levels),
+                    sum(len(l.coins) for l in levels), sum(len(l.enemies) for l in levels)))
+            return 0 if ok else 1
+        else:
+            sys.stdout.write(to_text(load(args.file)))
+    except (ValueError, IndexError, OSError) as e:
+        print("錯誤：%s" % e, file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
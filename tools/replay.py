@@ -0,0 +1,100 @@
+# 馬里奧遊戲的重播工具（在電腦上執行，不用畫面、不等時間，能跑多快就跑多快）
+#   python -m tools.replay check replays/bot.rec              重播並比對每個記錄的狀態，印出每秒幾步
+#   python -m tools.replay record out.rec --ticks 20000       用固定種子的自動玩家錄一段
+#   python -m tools.replay check a.rec b.rec --repeat 5       量測重播速度（取最快的一次）
+# 錄製檔可以在板子上錄（初二信37賴承熹_joystick_extra.py 的 RECORD_FILE），也可以用 record 產生。
+# replays/ 裡的錄製檔是回歸測試：改了物理或關卡之後 check 失敗，表示遊戲結果變了；
+# 如果是故意的，重新錄一次：
+#   python -m tools.replay record replays/bot.rec --ticks 20000 --seed 1
+# 這裡錄的檔案每一步都記狀態（--hash-every 1），重播時每一步都比對
+import argparse
+import os
+import random
+import sys
+from time import perf_counter_ns
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import replay  # noqa: E402  （要先把專案根目錄加進 sys.path）
+import world  # noqa: E402
+from levelfile import LevelFile  # noqa: E402
+
+def bot(seed):
+    """自動玩家：大多往右走，偶爾停下或往回走，隨機跳；每次產生一步的輸入"""
+    rnd = random.Random(seed)
+    while True:
+        direction = rnd.choice((1, 1, 1, 0, -1))
+        for _ in range(rnd.randrange(10, 80)):
+            yield world.encode(direction, rnd.random() < 0.08)
+
+def record(path, levels_path, ticks, seed, hash_every):
+    levels = LevelFile(levels_path)
+    game = world.World(levels)
+    recorder = replay.Recorder(path, levels_path, hash_every)
+    inputs = bot(seed)
+    events = {world.LEVEL_DONE: 0, world.GAME_DONE: 0}
+    try:
+        for _ in range(ticks):
+            value = next(inputs)
+            event = game.step(value)
+            if event:
+                events[event] += 1
+            recorder.record(value, game)
+    finally:
+        recorder.close()
+    return events
+
+def check(path, levels_path, repeat):
+    """重播 repeat 次，回傳 (步數, 比對次數, 最快一次的每秒步數)"""
+    crc, hash_every, data = replay.read(path)
+    if crc != replay.file_crc(levels_path):
+        print("警告：%s 是用另一份關卡檔錄的" % path, file=sys.stderr)
+    levels = LevelFile(levels_path)
+    best = None
+    for _ in range(repeat):
+        start = perf_counter_ns()
+        ticks, checked = replay.replay(data, levels)
+        elapsed = perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return ticks, checked, ticks * 1e9 / best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.replay", description="馬里奧遊戲的重播工具")
+    parser.add_argument("--levels", default=os.path.join(ROOT, "levels.bin"), help="關卡檔")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="用自動玩家錄一段")
+    rec.add_argument("output")
+    rec.add_argument("--ticks", type=int, default=20000, help="步數（每步 20 ms）")
+    rec.add_argument("--seed", type=int, default=1)
+    rec.add_argument("--hash-every", type=int, default=1, help="每幾步記一次狀態（預設每一步）")
+    chk = sub.add_parser("check", help="重播並比對狀態")
+    chk.add_argument("files", nargs="+")
+    chk.add_argument("--repeat", type=int, default=1, help="重複幾次取最快的一次")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "record":
+            events = record(args.output, args.levels, args.ticks, args.seed, args.hash_every)
+            print("%s：%d 步，%d bytes，過關 %d 次，全破 %d 次" % (
+                args.output, args.ticks, os.path.getsize(args.output),
+                events[world.LEVEL_DONE], events[world.GAME_DONE]))
+            return 0
+        ok = True
+        for path in args.files:
+            try:
+                ticks, checked, speed = check(path, args.levels, args.repeat)
+            except replay.ReplayError as e:
+                print("%s：失敗，%s" % (path, e), file=sys.stderr)
+                ok = False
+                continue
+            print("%s：%d 步，比對 %d 次狀態都相同，重播 %.0f 步/秒（即時的 %.0f 倍）" % (
+                path, ticks, checked, speed, speed * world.STEP_MS / 1000))
+        return 0 if ok else 1
+    except (ValueError, OSError) as e:
+        print("錯誤：%s" % e, file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
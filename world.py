@@ -0,0 +1,106 @@
+# 一場馬里奧遊戲的全部狀態和每一步的規則，不含畫面、輸入裝置和計時
+# 遊戲主程式每幀讀一次搖桿，把輸入編成一個位元組交給 step()；
+# 同樣的關卡檔和同樣的位元組序列一定得到同樣的結果（replay.py 靠這點重播和比對）
+# - 時間只用步數算（tick * STEP_MS），不讀 ticks_ms()
+# - 鏡頭和段落載入每一步都更新，碰撞看到的平台不受畫面幀率影響
+import binascii
+import struct
+from mario import Mario, Camera, STEP_MS, JUMP_FORCE
+
+# 每一步的輸入（一個位元組）
+RIGHT = 0x01
+LEFT = 0x02
+JUMP = 0x04
+INPUT_MASK = 0x07
+
+# step() 回傳的事件
+NONE = 0
+LEVEL_DONE = 1  # 過關，已經換到下一關
+GAME_DONE = 2   # 最後一關也過了，已經回到第一關
+
+STOMP_SCORE = 200
+STATE = "<IHhhhBIH"  # 步數、關卡、x、fy、vy、旗標、分數、剩下的金幣
+STATE_SIZE = struct.calcsize(STATE)
+
+def encode(direction, jump):
+    """搖桿方向（-1、0、1）和是否要跳轉成一個位元組"""
+    value = RIGHT if direction > 0 else LEFT if direction < 0 else 0
+    return value | JUMP if jump else value
+
+class World:
+    def __init__(self, levels):
+        self.levels = levels
+        self.total = levels.count
+        self.mario = Mario()
+        self.camera = Camera()  # 關卡比畫面寬時跟著馬里奧捲動
+        self.state = bytearray(STATE_SIZE)
+        self.restart()
+
+    def restart(self):
+        """從第一關、0 分重新開始"""
+        mario = self.mario
+        mario.current_level = 1
+        mario.score = 0
+        mario.last_jump_time = -1000
+        mario.facing_right = True
+        mario.reset_position()
+        self.tick = 0
+        self._enter(1)
+
+    def _enter(self, number):
+        mario = self.mario
+        mario.current_level = number
+        mario.reset_position()
+        self.level = self.levels.load(number)
+        self.level.follow(self.camera.follow(mario, self.level.width))
+
+    def step(self, value):
+        """用輸入 value 前進一個物理步，回傳事件（NONE、LEVEL_DONE、GAME_DONE）"""
+        mario = self.mario
+        level = self.level
+        self.tick += 1
+        if value & JUMP:
+            mario.jump(self.tick * STEP_MS)
+        mario.move(1 if value & RIGHT else -1 if value & LEFT else 0, level.width)
+        mario.update(level)
+
+        # 檢測金幣收集（只看馬里奧附近格子裡的金幣）
+        mario.score += 100 * level.collect(mario)
+
+        # 敵人移動；踩到敵人打倒它並彈起來，從旁邊碰到回到起點
+        enemies = level.entities
+        enemies.step(level)
+        hit = enemies.hit(mario)
+        if hit >= 0:
+            if enemies.stomped(hit, mario):
+                enemies.kill(hit)
+                mario.score += STOMP_SCORE
+                mario.vy = JUMP_FORCE // 2
+            else:
+                mario.reset_position()
+
+        # 鏡頭跟著馬里奧，並載入鏡頭附近的關卡段落
+        level.follow(self.camera.follow(mario, level.width))
+
+        if not level.complete():
+            return NONE
+        if mario.current_level < self.total:
+            self._enter(mario.current_level + 1)
+            return LEVEL_DONE
+        mario.score = 0
+        self._enter(1)
+        return GAME_DONE
+
+    def hash(self):
+        """整個遊戲狀態的 CRC32（馬里奧、關卡進度、收集過的金幣和所有敵人）"""
+        mario = self.mario
+        level = self.level
+        flags = (1 if mario.is_jumping else 0) | (2 if mario.facing_right else 0)
+        struct.pack_into(STATE, self.state, 0, self.tick, mario.current_level, mario.x,
+                         mario.fy, mario.vy, flags, mario.score, level.remaining)
+        crc = binascii.crc32(self.state)
+        crc = binascii.crc32(level.collected, crc)  # 收集金幣時就會記進去
+        enemies = level.entities
+        for column in (enemies.kind, enemies.x, enemies.fy, enemies.vx, enemies.vy):
+            crc = binascii.crc32(column, crc)
+        return crc
@@ -1,5 +1,8 @@
+import boottime  # 最先 import，記下程式開始的時間
 from machine import Pin, ADC
 from time import sleep
+from joystick import Axis
+from sampler import Sampler
 
 # 設定 LED 腳位
 led_up = Pin(5, Pin.OUT)    # D1
@@ -11,8 +14,16 @@ led_right = Pin(2, Pin.OUT) # D4
 joystick_x = ADC(Pin(34))  
 
 # 閾值設定
-CENTER = 2048     # 中心值 (12位ADC，範圍0-4095)
+CENTER = 2048     # 預設中心值 (12位ADC，範圍0-4095)，開機時會重新校準
 THRESHOLD = 1000   # 靈敏度範圍（可調）
+MEDIAN_SIZE = 1    # 中位數窗口長度，1 表示不濾波（這支程式原本就直接讀 ADC）
+
+# 計時器每 4 ms 讀一次 ADC，poll() 拿最新的值
+sampler = Sampler(period_ms=4)
+x_axis = Axis(sampler.add(joystick_x, MEDIAN_SIZE), center=CENTER, threshold=THRESHOLD)
+sampler.start()
+x_axis.calibrate()  # 開機時不要碰搖桿
+boottime.mark(boottime.READY)
 
 def clear_leds():
     led_up.off()
@@ -21,17 +32,19 @@ def clear_leds():
     led_right.off()
 
 while True:
-    x_val = joystick_x.read()  # 讀取 0~1023 的值
+    dx = x_axis.poll()  # 讀取搖桿方向：-1 左、0 中間、1 右
 
     clear_leds()  # 每次 loop 先熄滅全部 LED
 
-    if x_val < CENTER - THRESHOLD:
+    if dx < 0:
         led_left.on()
-    elif x_val > CENTER + THRESHOLD:
+    elif dx > 0:
         led_right.on()
     else:
         # 你可以擴展成用 Y 軸做上下
         pass
+    boottime.mark(boottime.OUTPUT)
+    boottime.report()  # 只在第一次印出開機時間
 
     # 延遲一點避免太快
     sleep(0.1)
\ No newline at end of file
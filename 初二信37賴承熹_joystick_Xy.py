@@ -1,5 +1,12 @@
+import boottime  # 最先 import，記下程式開始的時間
 from machine import Pin, ADC
 from time import sleep
+from joystick import Axis, calibrate
+from sampler import Sampler
+import log
+
+# 日誌等級：除錯時用 log.DEBUG 才會印出每次的讀值，正式使用保持 log.INFO
+log.set_level(log.INFO)
 
 # 設定 LED 腳位
 led_up = Pin(5, Pin.OUT)    # GPIO5
@@ -18,8 +25,14 @@ vrx.width(ADC.WIDTH_12BIT)  # 設置解析度為 12 位 (0-4095)
 vry.width(ADC.WIDTH_12BIT)  # 設置解析度為 12 位 (0-4095)
 
 # 閾值設定
-CENTER = 2048     # 中心值 (12位ADC，範圍0-4095)
+CENTER = 2048     # 預設中心值 (12位ADC，範圍0-4095)，開機時會重新校準
 THRESHOLD = 1000  # 靈敏度範圍（可調）
+MEDIAN_SIZE = 5   # 取最近幾次讀值的中位數（排除極端值），1 表示不濾波
+
+# 計時器每 4 ms 讀一次兩個軸，取最近 MEDIAN_SIZE 次的中位數，主迴圈讀值不用等
+sampler = Sampler(period_ms=4)
+x_axis = Axis(sampler.add(vrx, MEDIAN_SIZE), center=CENTER, threshold=THRESHOLD)
+y_axis = Axis(sampler.add(vry, MEDIAN_SIZE), center=CENTER, threshold=THRESHOLD)
 
 def clear_leds():
     """關閉所有 LED"""
@@ -28,65 +41,63 @@ def clear_leds():
     led_left.off()
     led_right.off()
 
-def get_smooth_value(adc):
-    """讀取多次 ADC 值並返回平均值"""
-    values = []
-    for _ in range(5):  # 讀取5次
-        values.append(adc.read())
-        sleep(0.01)
-    
-    # 排除極端值
-    values.sort()
-    return values[2]  # 返回中間值
+def get_smooth_value(axis):
+    """取背景取樣的中位數（排除極端值），返回方向 -1、0 或 1"""
+    return axis.poll()
 
-def control_leds(x_val, y_val):
-    """根據搖桿位置控制 LED"""
+def control_leds(x_dir, y_dir):
+    """根據搖桿方向控制 LED"""
     clear_leds()
     
-    # 顯示詳細資訊
-    print("-" * 40)
-    print("X軸: {}, Y軸: {}".format(x_val, y_val))
+    # 顯示詳細資訊（只在除錯等級才格式化和印出）
+    log.debug("X軸: {}, Y軸: {}", x_axis.raw, y_axis.raw)
     
     # 控制左右 LED (X軸)
-    if x_val < CENTER - THRESHOLD:
+    if x_dir < 0:
         led_left.on()
-        print("左")
-    elif x_val > CENTER + THRESHOLD:
+        log.debug("左")
+    elif x_dir > 0:
         led_right.on()
-        print("右")
+        log.debug("右")
         
     # 控制上下 LED (Y軸)
-    if y_val < CENTER - THRESHOLD:
+    if y_dir < 0:
         led_up.on()
-        print("上")
-    elif y_val > CENTER + THRESHOLD:
+        log.debug("上")
+    elif y_dir > 0:
         led_down.on()
-        print("下")
+        log.debug("下")
 
-print("程式開始運行！")
-print("請確認接線：")
-print("VRx -> GPIO34")
-print("VRy -> GPIO35")
-print("VCC -> 3.3V")
-print("GND -> GND")
+log.info("程式開始運行！")
+log.info("請確認接線：")
+log.info("VRx -> GPIO34")
+log.info("VRy -> GPIO35")
+log.info("VCC -> 3.3V")
+log.info("GND -> GND")
 
-# 等待搖桿穩定
-print("等待搖桿穩定...")
-sleep(2)
+# 校準搖桿中心（開機時不要碰搖桿）：兩個軸一起取樣 16 次，不必先等搖桿穩定，
+# 跳動太大時 calibrate 會放寬死區
+sampler.start()
+if not calibrate((x_axis, y_axis)):
+    log.warning("搖桿校準失敗，使用預設中心值 {}", CENTER)
+log.info("搖桿中心: X={}, Y={}", x_axis.center, y_axis.center)
+boottime.mark(boottime.READY)
 
 # 主循環
 while True:
     try:
         # 讀取搖桿值
-        x = get_smooth_value(vrx)
-        y = get_smooth_value(vry)
+        x = get_smooth_value(x_axis)
+        y = get_smooth_value(y_axis)
         
         # 控制 LED
         control_leds(x, y)
+        boottime.mark(boottime.OUTPUT)
+        boottime.report()  # 只在第一次印出開機時間
         
-        # 延遲
-        sleep(0.1)
+        # 延遲（讀值不用再等取樣，LED 反應更快）
+        sleep(0.02)
         
     except Exception as e:
-        print("錯誤：", e)
+        log.exception(e, "錯誤")
         sleep(1) 
\ No newline at end of file
@@ -1,212 +1,75 @@
+import boottime  # 最先 import，記下程式開始的時間
 from machine import Pin, ADC, I2C
-from time import sleep, ticks_ms
-from ssd1306 import SSD1306_I2C
+from micropython import const
+from time import sleep, ticks_us, ticks_diff
+from display import ThreadedSSD1306
+from joystick import Axis, calibrate
+from sampler import Sampler
+from button import Button, ButtonQueue, PRESS
+from gameloop import FixedStep
+from mario import SCREEN_WIDTH, GROUND_HEIGHT, STEP_MS
+from levelfile import LevelFile
+from world import World, LEVEL_DONE, GAME_DONE, encode
+from replay import Recorder
+from sprites import GameSprites, TRANSPARENT
+from profiler import Profiler
+import log
+
+# 分階段計時：改成 const(1) 才會編進去；往下推搖桿切換 OLED 上的統計，DEBUG 等級時每秒印出
+PROFILE = const(0)
+P_INPUT = const(0)
+P_LOGIC = const(1)
+P_RENDER = const(2)
+P_WAIT = const(3)
+if PROFILE:
+    prof = Profiler(("input", "logic", "render", "wait"))
 
 # 設定 OLED (I2C)
 i2c = I2C(0, scl=Pin(22), sda=Pin(21), freq=400000)
-oled = SSD1306_I2C(128, 64, i2c)
+oled = ThreadedSSD1306(128, 64, i2c)  # show() 交給背景執行緒傳送，只送最新一幀中有變化的部分
 
 # 設定搖桿輸入
 vrx = ADC(Pin(34))
 vry = ADC(Pin(35))
 button = Pin(27, Pin.IN, Pin.PULL_UP)  # 跳躍按鈕
 
+# 按鈕用中斷記錄，畫面更新期間的短按也不會漏掉
+buttons = ButtonQueue()
+Button(button, buttons, 1)
+
 # 設定 ADC 參數
 vrx.atten(ADC.ATTN_11DB)
 vry.atten(ADC.ATTN_11DB)
 vrx.width(ADC.WIDTH_12BIT)
 vry.width(ADC.WIDTH_12BIT)
 
-# 遊戲常量
-SCREEN_WIDTH = 128
-SCREEN_HEIGHT = 64
-GROUND_HEIGHT = 50
-MARIO_WIDTH = 8
-MARIO_HEIGHT = 8
-GRAVITY = 0.5
-JUMP_FORCE = -6
-MOVE_SPEED = 2
-PLATFORM_HEIGHT = 4
-COIN_SIZE = 4
-TOTAL_LEVELS = 5
+# 設成檔名（例如 "session.rec"）就把每一步的輸入錄到快閃記憶體，
+# 之後在電腦上用 python -m tools.replay check session.rec 重播
+RECORD_FILE = None
+RECORD_FLUSH_TICKS = 250  # 錄製時每幾步寫進快閃記憶體一次（約 5 秒），斷電最多丟掉這一段
+RECORD_HASH_EVERY = 50    # 每幾步記一次狀態：每步都記檔案大 5 倍，也多花時間算 hash（見 replay.py）
 
 # 搖桿靈敏度設置
 JOYSTICK_DEAD_ZONE = 300  # 中立區域大小
-JOYSTICK_CENTER = 2048    # 中心值
-JOYSTICK_THRESHOLD_HIGH = JOYSTICK_CENTER + 1000  # 高閾值
-JOYSTICK_THRESHOLD_LOW = JOYSTICK_CENTER - 1000   # 低閾值
-
-class GameObject:
-    def __init__(self, x, y, width, height):
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
-    
-    def collides_with(self, other):
-        return (self.x < other.x + other.width and
-                self.x + self.width > other.x and
-                self.y < other.y + other.height and
-                self.y + self.height > other.y)
-
-class Mario(GameObject):
-    def __init__(self):
-        super().__init__(20, GROUND_HEIGHT - MARIO_HEIGHT, MARIO_WIDTH, MARIO_HEIGHT)
-        self.vy = 0
-        self.is_jumping = False
-        self.facing_right = True
-        self.score = 0
-        self.current_level = 1
-        self.last_jump_time = 0  # 添加跳躍冷卻時間記錄
-    
-    def reset_position(self):
-        self.x = 20
-        self.y = GROUND_HEIGHT - MARIO_HEIGHT
-        self.vy = 0
-        self.is_jumping = False
-    
-    def update(self, platforms):
-        # 重力
-        self.vy += GRAVITY
-        new_y = self.y + self.vy
-        
-        # 地面碰撞檢測
-        if new_y > GROUND_HEIGHT - self.height:
-            new_y = GROUND_HEIGHT - self.height
-            self.vy = 0
-            self.is_jumping = False
-        
-        # 平台碰撞檢測
-        for platform in platforms:
-            if (self.x + self.width > platform.x and 
-                self.x < platform.x + platform.width):
-                # 從上方碰撞
-                if (self.y + self.height <= platform.y and 
-                    new_y + self.height > platform.y):
-                    new_y = platform.y - self.height
-                    self.vy = 0
-                    self.is_jumping = False
-                # 從下方碰撞
-                elif (self.y >= platform.y + platform.height and 
-                      new_y < platform.y + platform.height):
-                    new_y = platform.y + platform.height
-                    self.vy = 0
-        
-        self.y = new_y
-    
-    def jump(self):
-        current_time = ticks_ms()
-        # 添加跳躍冷卻時間（250毫秒）
-        if not self.is_jumping and current_time - self.last_jump_time > 250:
-            self.vy = JUMP_FORCE
-            self.is_jumping = True
-            self.last_jump_time = current_time
-    
-    def move(self, direction):
-        new_x = self.x + direction * MOVE_SPEED
-        if 0 <= new_x <= SCREEN_WIDTH - self.width:
-            self.x = new_x
-        self.facing_right = direction > 0 if direction != 0 else self.facing_right
-
-class Platform(GameObject):
-    def __init__(self, x, y, width):
-        super().__init__(x, y, width, PLATFORM_HEIGHT)
-
-class Coin(GameObject):
-    def __init__(self, x, y):
-        super().__init__(x, y, COIN_SIZE, COIN_SIZE)
-        self.collected = False
-
-def create_level(level):
-    platforms = []
-    coins = []
-    
-    if level == 1:
-        # 第一關：簡單的平台配置
-        platforms = [
-            Platform(30, 40, 30),
-            Platform(80, 30, 30),
-            Platform(20, 20, 20),
-        ]
-        coins = [
-            Coin(40, 30),
-            Coin(90, 20),
-            Coin(35, 10),
-        ]
-    
-    elif level == 2:
-        # 第二關：階梯式平台
-        platforms = [
-            Platform(20, 40, 20),
-            Platform(50, 30, 20),
-            Platform(80, 20, 20),
-            Platform(110, 10, 15),
-        ]
-        coins = [
-            Coin(25, 30),
-            Coin(55, 20),
-            Coin(85, 10),
-            Coin(115, 0),
-        ]
-    
-    elif level == 3:
-        # 第三關：交錯平台
-        platforms = [
-            Platform(10, 40, 20),
-            Platform(40, 30, 20),
-            Platform(70, 40, 20),
-            Platform(100, 30, 20),
-        ]
-        coins = [
-            Coin(15, 30),
-            Coin(45, 20),
-            Coin(75, 30),
-            Coin(105, 20),
-        ]
-    
-    elif level == 4:
-        # 第四關：高低起伏
-        platforms = [
-            Platform(20, 35, 25),
-            Platform(55, 20, 25),
-            Platform(90, 35, 25),
-        ]
-        coins = [
-            Coin(30, 25),
-            Coin(65, 10),
-            Coin(100, 25),
-            Coin(45, 45),
-            Coin(80, 45),
-        ]
-    
-    elif level == 5:
-        # 第五關：最終關卡
-        platforms = [
-            Platform(20, 40, 15),
-            Platform(45, 30, 15),
-            Platform(70, 20, 15),
-            Platform(95, 30, 15),
-            Platform(120, 40, 8),
-        ]
-        coins = [
-            Coin(25, 30),
-            Coin(50, 20),
-            Coin(75, 10),
-            Coin(100, 20),
-            Coin(122, 30),
-        ]
-    
-    return platforms, coins
-
-def check_level_complete(coins):
-    return all(coin.collected for coin in coins)
-
-def show_level_start(level):
+JOYSTICK_CENTER = 2048    # 預設中心值，開機時會重新校準
+JOYSTICK_THRESHOLD = 1000       # 左右移動的閾值
+JOYSTICK_JUMP_THRESHOLD = 1200  # 跳躍需要推得更用力
+JOYSTICK_MEDIAN_SIZE = 1  # 取最近幾次讀值的中位數；有中立區域和閾值就夠穩定，1 表示不濾波、不增加延遲
+
+# 計時器每 4 ms 在背景讀兩個軸，get_input() 拿最新的值
+sampler = Sampler(period_ms=4)
+stick_x = Axis(sampler.add(vrx, JOYSTICK_MEDIAN_SIZE), center=JOYSTICK_CENTER,
+               dead_zone=JOYSTICK_DEAD_ZONE, threshold=JOYSTICK_THRESHOLD)
+stick_y = Axis(sampler.add(vry, JOYSTICK_MEDIAN_SIZE), center=JOYSTICK_CENTER,
+               dead_zone=JOYSTICK_DEAD_ZONE, threshold=JOYSTICK_JUMP_THRESHOLD)
+
+def show_level_start(level, wait=2):
     oled.fill(0)
     oled.text("Level " + str(level), 40, 20)
     oled.text("Ready!", 45, 35)
     oled.show()
-    sleep(2)
+    if wait:
+        sleep(wait)
 
 def show_game_complete():
     oled.fill(0)
@@ -215,101 +78,163 @@ def show_game_complete():
     oled.show()
     sleep(3)
 
-def draw_game(mario, platforms, coins):
+def draw_game(mario, level, camera_x, tick):
     oled.fill(0)
     
     # 繪製地面
     oled.hline(0, GROUND_HEIGHT, SCREEN_WIDTH, 1)
     
+    # 只畫鏡頭範圍內的平台和金幣（座標減掉鏡頭位置），每個物件一次 blit；座標都是整數
+    platforms, coins = level.visible(camera_x, SCREEN_WIDTH)
+    
     # 繪製平台
     for platform in platforms:
-        oled.rect(int(platform.x), int(platform.y), 
-                 platform.width, platform.height, 1)
+        oled.blit(art.platform(platform.width), platform.x - camera_x, platform.y, TRANSPARENT)
     
-    # 繪製金幣
+    # 繪製金幣（轉動動畫）
+    coin_image = art.coin(tick)
     for coin in coins:
         if not coin.collected:
-            oled.rect(int(coin.x), int(coin.y), 
-                     coin.width, coin.height, 1)
+            oled.blit(coin_image, coin.x - camera_x, coin.y, TRANSPARENT)
     
-    # 繪製馬里奧
-    if mario.facing_right:
-        oled.rect(int(mario.x), int(mario.y), 
-                 mario.width, mario.height, 1)
-    else:
-        oled.fill_rect(int(mario.x), int(mario.y), 
-                      mario.width, mario.height, 1)
+    # 繪製敵人（存在 level.entities 的 array 欄位裡）
+    level.entities.draw(oled, art.enemies, camera_x, SCREEN_WIDTH, TRANSPARENT)
+    
+    # 繪製馬里奧（依方向、走路和跳躍換圖）
+    oled.blit(art.mario(mario), mario.x - camera_x, mario.y, TRANSPARENT)
     
     # 顯示分數和關卡
     oled.text(f"L{mario.current_level} S:{mario.score}", 0, 0)
     
+    if PROFILE:
+        prof.draw(oled, 0, 8)
+    
     oled.show()
 
 def get_input():
-    x = vrx.read()
-    y = vry.read()
-    
-    # 水平移動判斷（加入死區）
-    if abs(x - JOYSTICK_CENTER) < JOYSTICK_DEAD_ZONE:
-        dx = 0
-    else:
-        dx = -1 if x < JOYSTICK_THRESHOLD_LOW else 1 if x > JOYSTICK_THRESHOLD_HIGH else 0
-    
-    # 跳躍判斷（加入死區和更高的閾值）
-    should_jump = y < JOYSTICK_THRESHOLD_LOW - 200  # 需要推得更用力才會跳躍
-    
-    return dx, should_jump
+    # 死區和閾值都在校準時算進查找表，這裡只要查表
+    dx = stick_x.poll()
+    should_jump = stick_y.poll() < 0  # 向上推跳躍
+
+    # 按下跳躍按鈕也會跳
+    buttons.update()
+    event = buttons.get()
+    while event is not None:
+        if event[1] == PRESS:
+            should_jump = True
+        event = buttons.get()
 
-# 初始化遊戲
-mario = Mario()
-platforms, coins = create_level(mario.current_level)
-
-print("馬里奧遊戲開始！")
-print("使用搖桿左右移動，向上推跳躍")  # 更新提示文字
-show_level_start(mario.current_level)
+    return dx, should_jump
 
-# 遊戲主循環
-while True:
-    try:
-        # 處理輸入
-        direction, should_jump = get_input()
-        if should_jump:  # 改用搖桿Y軸控制跳躍
-            mario.jump()
+# 開機時先送出第一關的畫面，下面的準備工作在它顯示的時候做
+# （畫面由背景執行緒傳送，和校準同時進行），做完就開始，不再另外等 2 秒
+show_level_start(1, 0)
+boottime.mark(boottime.FRAME)
+
+# 點陣圖開機時建好一次
+art = GameSprites()
+
+# 關卡放在 levels.bin（由 levels.txt 產生），開機時只讀檔頭
+levels = LevelFile("levels.bin")
+
+# 校準搖桿中心（開機時不要碰搖桿），兩個軸一起取樣
+sampler.start()
+if not calibrate((stick_x, stick_y)):
+    log.warning("搖桿校準失敗，使用預設中心值")
+
+# 初始化遊戲（遊戲規則都在 World 裡，這裡只管輸入、畫面和計時）
+world = World(levels)
+mario = world.mario
+recorder = (Recorder(RECORD_FILE, hash_every=RECORD_HASH_EVERY, flush_every=RECORD_FLUSH_TICKS)
+            if RECORD_FILE else None)
+boottime.mark(boottime.READY)
+
+log.info("馬里奧遊戲開始！")
+log.info("使用搖桿左右移動，向上推或按按鈕跳躍")  # 更新提示文字
+
+# 遊戲主循環：物理以固定步長前進，畫面慢的時候多跑幾步追上，不會讓遊戲變慢
+loop = FixedStep(STEP_MS)
+draw_us = draws = 0  # 繪圖時間統計（含 show() 交給背景的複製）
+jump = False  # 要跳但還沒有物理步處理
+pushed_down = False
+try:
+    while True:
+        try:
+            if PROFILE:
+                t = prof.start()
         
-        # 更新遊戲狀態
-        mario.move(direction)
-        mario.update(platforms)
+            # 處理輸入（向上推搖桿或按按鈕跳躍），跳躍交給這一幀的第一個物理步
+            direction, should_jump = get_input()
+            jump = jump or should_jump
+            if PROFILE:
+                if stick_y.direction > 0 and not pushed_down:
+                    prof.toggle()
+                pushed_down = stick_y.direction > 0
+                t = prof.stop(P_INPUT, t)
         
-        # 檢測金幣收集
-        for coin in coins:
-            if not coin.collected and mario.collides_with(coin):
-                coin.collected = True
-                mario.score += 100
+            # 更新遊戲狀態
+            for _ in range(loop.begin()):
+                value = encode(direction, jump)
+                jump = False
+                event = world.step(value)
+                if recorder:
+                    recorder.record(value, world)
+                if event:
+                    break
+            else:
+                event = 0
+            boottime.mark(boottime.OUTPUT)
         
-        # 檢查關卡完成
-        if check_level_complete(coins):
-            if mario.current_level < TOTAL_LEVELS:
-                mario.current_level += 1
-                mario.reset_position()
-                platforms, coins = create_level(mario.current_level)
+            # 過關：顯示下一關或全破的畫面（錄製中就趁這時寫到檔案）
+            if event and recorder:
+                recorder.flush()
+            if event == LEVEL_DONE:
                 show_level_start(mario.current_level)
-            else:
+                loop.reset()  # 關卡畫面停的時間不算進物理
+            elif event == GAME_DONE:
                 show_game_complete()
-                mario.current_level = 1
-                mario.score = 0
-                mario.reset_position()
-                platforms, coins = create_level(mario.current_level)
                 show_level_start(mario.current_level)
+                loop.reset()
+            if PROFILE:
+                t = prof.stop(P_LOGIC, t) if not event else prof.start()  # 關卡畫面不算
         
-        # 更新顯示
-        draw_game(mario, platforms, coins)
+            # 更新顯示（落後時跳過繪圖）
+            if loop.render_due():
+                start = ticks_us()
+                draw_game(mario, world.level, world.camera.x, loop.steps)
+                draw_us += ticks_diff(ticks_us(), start)
+                draws += 1
+                if PROFILE:
+                    t = prof.stop(P_RENDER, t)
         
-        sleep(0.02)
+            window = loop.wait()
+            if PROFILE:
+                prof.stop(P_WAIT, t)
+            if window and log.enabled(log.DEBUG):
+                log.debug("FPS {}, 物理 {} 步/秒, 超時 {} 幀, 跳過 {} 幀, 繪圖平均 {} us, "
+                          "每幀配置 {} bytes, GC {}.{:02d} 次/秒",
+                          loop.fps, loop.steps_per_s, loop.window_overruns, loop.skipped,
+                          draw_us // draws if draws else 0, loop.alloc_per_frame,
+                          loop.gc_per_s // 100, loop.gc_per_s % 100)
+                draw_us = draws = 0
+                if PROFILE:
+                    prof.dump()
+            if PROFILE:
+                if window:
+                    prof.reset()
+            boottime.report()
         
-    except Exception as e:
-        print("錯誤：", e)
-        oled.fill(0)
-        oled.text("Error:", 0, 0)
-        oled.text(str(e), 0, 20)
-        oled.show()
-        sleep(1) 
\ No newline at end of file
+        except Exception as e:
+            log.exception(e, "錯誤")
+            oled.fill(0)
+            oled.text("Error:", 0, 0)
+            oled.text(str(e), 0, 20)
+            oled.show()
+            sleep(1)
+            loop.reset()
+finally:
+    # 離開主循環（Ctrl-C 或上面沒接住的錯誤）時把錄製檔寫完關好，停止背景取樣和顯示執行緒
+    if recorder:
+        recorder.close()
+    sampler.stop()
+    oled.stop()